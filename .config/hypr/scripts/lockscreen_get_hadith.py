@@ -1,39 +1,61 @@
 #!/usr/bin/env python3
-import json
-import textwrap
+import os
 import random
-import urllib.request
-import urllib.error
+import sys
+
+# Shared Thawrah modules live next to the Waybar scripts
+sys.path.insert(0, os.path.expanduser("~/.config/waybar/scripts"))
 
 # Configuration
 MAX_LENGTH = 300  # Skip verses longer than this characters (too big for screen)
-WRAP_WIDTH = 60   # Wrap text after 60 chars
+SOURCE = "mixed"  # "quran", "hadith" or "mixed" (alternates at random)
+HADITH_TAGS = []  # Only show hadith with these tags, e.g. ["nawawi40"]
+
+# Until the local corpus exists (fetched by a detached `quran_corpus.py fetch`): one of these.
+# The lock screen itself never waits on the network
+FALLBACK_AYAHS = [
+    ("Verily, with hardship comes ease.", "Ash-Sharh", 94, 6),
+    ("So remember Me; I will remember you. And be grateful to Me and do not deny Me.", "Al-Baqarah", 2, 152),
+    ("O you who have believed, seek help through patience and prayer. Indeed, Allah is with the patient.", "Al-Baqarah", 2, 153),
+]
 
 def get_quran_ayah():
+    # Random ayah from the local, pre-wrapped corpus: no network, a single mmap read
+    try:
+        import quran_corpus
+
+        corpus = quran_corpus.load()
+        if not corpus:
+            quran_corpus.fetch_in_background()  # Detached; this lock shows a fallback
+        picked = corpus.random(MAX_LENGTH) if corpus else None
+        if picked:
+            surah, number, text, _ = picked
+            return f'"{text}"\n\n— Surah {quran_corpus.surah_name(surah)} [{surah}:{number}]'
+    except Exception:
+        pass
+
+    # Corpus missing (or still being fetched)
+    import textwrap
+
+    text, name, surah, number = random.choice(FALLBACK_AYAHS)
+    return f'"{textwrap.fill(text, 60)}"\n\n— Surah {name} [{surah}:{number}]'
+
+def get_hadith():
+    # Local hadith store (hadith_store.py), built from the bundled set on first use
     try:
-        # Fetch a random Ayah (using Saheeh International translation)
-        url = "http://api.alquran.cloud/v1/ayah/random/en.sahih"
-        with urllib.request.urlopen(url, timeout=2) as response:
-            data = json.loads(response.read().decode())
-            
-            ayah = data['data']
-            text = ayah['text']
-            surah = ayah['surah']['englishName']
-            number = ayah['numberInSurah']
-            
-            # Formatting
-            if len(text) > MAX_LENGTH:
-                return get_quran_ayah() # Retry if too long
-                
-            formatted_text = textwrap.fill(text, WRAP_WIDTH)
-            return f'"{formatted_text}"\n\n— Surah {surah} [{number}]'
-    except (urllib.error.URLError, Exception):
-        # Fallback if offline
-        return '"Verily, with hardship comes ease."\n\n— Surah Ash-Sharh [94:6]'
-
-# You can expand this to fetch Hadith if you find a stable API, 
-# but currently most Hadith APIs are slow or require keys. 
-# For now, this script defaults to Quran.
+        import textwrap
+        import hadith_store
+
+        store = hadith_store.load()
+        h = store.random(tags=HADITH_TAGS, max_length=MAX_LENGTH) if store else None
+        if h:
+            return hadith_store.format_hadith(dict(h, text=textwrap.fill(h["text"], 60)))
+    except Exception:
+        pass
+    return None
 
 if __name__ == "__main__":
-    print(get_quran_ayah())
+    if SOURCE == "hadith" or (SOURCE == "mixed" and random.random() < 0.5):
+        print(get_hadith() or get_quran_ayah())
+    else:
+        print(get_quran_ayah())
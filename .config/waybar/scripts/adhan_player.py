@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+# Resident audio engine for the Adhan: one idle mpv, driven over its JSON IPC
+# socket, keeps the Adhan loaded (paused, demuxed into its cache) so playing it
+# is a single IPC round trip instead of a process start and file decode.
+# prayer_times.py --daemon schedules play() for the exact prayer instant.
+
+# --- CONFIGURATION ---
+SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "thawrah_mpv.sock")
+ADHAN_FILE = os.path.expanduser("~/.config/waybar/scripts/adhan.mp3")
+# Per-prayer Adhans, used when the file exists (otherwise ADHAN_FILE)
+ADHAN_VARIANTS = {"Fajr": os.path.expanduser("~/.config/waybar/scripts/adhan_fajr.mp3")}
+VOLUME = 15          # mpv volume (0-100) the Adhan plays at
+FADE_IN = 2.0        # Seconds from silence to VOLUME (0 = start at full volume)
+RAMP_STEPS = 20      # Volume steps per second during a fade
+START_TIMEOUT = 3.0  # Seconds to wait for a freshly started mpv to open its socket
+MPV_ARGS = ["mpv", "--idle=yes", "--keep-open=yes", "--pause", "--no-terminal", "--no-video",
+            "--volume=0", "--cache=yes", "--demuxer-readahead-secs=600"]
+
+class PlayerError(Exception):
+    pass
+
+def adhan_file(prayer=None):
+    """The Adhan to play for `prayer` ("Fajr (Tom)" counts as Fajr)."""
+    variant = ADHAN_VARIANTS.get((prayer or "").split(" ")[0])
+    return variant if variant and os.path.exists(variant) else ADHAN_FILE
+
+class Player:
+    """Client for the resident mpv. Starts it on first use when `spawn` is set.
+
+    preload() is idempotent and cheap once the file is loaded, so the daemon can
+    call it on every tick before a prayer; play() then only sets the volume and
+    unpauses. Commands are serialized, so a fade can run on a thread while
+    stop() or volume() are called.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH, spawn=True):
+        self.socket_path = socket_path
+        self.spawn = spawn
+        self.sock = None
+        self.buffer = b""
+        self.request_id = 0
+        self.lock = threading.Lock()
+        self.loaded = None  # Path loaded, paused and rewound, ready to play
+        self.fade = None    # Running fade thread, if any
+
+    # --- IPC ---
+    def connect(self):
+        if self.sock:
+            return
+        try:
+            self.sock = self.open_socket()
+            return
+        except OSError:
+            if not self.spawn:
+                raise PlayerError(f"no player listening on {self.socket_path}")
+        self.start_mpv()
+
+    def open_socket(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(1)
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def start_mpv(self):
+        import subprocess
+
+        try:
+            subprocess.Popen(MPV_ARGS + [f"--input-ipc-server={self.socket_path}"],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        except OSError as e:
+            raise PlayerError(f"cannot start mpv: {e}")
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                self.sock = self.open_socket()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise PlayerError("mpv did not open its IPC socket")
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+        self.sock = None
+        self.buffer = b""
+        self.loaded = None
+
+    def command(self, *args):
+        """Runs one mpv command and returns its "data"; events arriving meanwhile are skipped."""
+        with self.lock:
+            self.connect()
+            self.request_id += 1
+            try:
+                self.sock.sendall(json.dumps({"command": list(args), "request_id": self.request_id}).encode() + b"\n")
+                while True:
+                    while b"\n" not in self.buffer:
+                        chunk = self.sock.recv(4096)
+                        if not chunk:
+                            raise OSError("player closed the connection")
+                        self.buffer += chunk
+                    line, self.buffer = self.buffer.split(b"\n", 1)
+                    reply = json.loads(line)
+                    if reply.get("request_id") == self.request_id:
+                        break
+            except (OSError, ValueError) as e:
+                # mpv quit or restarted: the next command reconnects (and reloads)
+                self.close()
+                raise PlayerError(str(e))
+        if reply.get("error") != "success":
+            raise PlayerError(f"{args[0]}: {reply.get('error')}")
+        return reply.get("data")
+
+    # --- PLAYBACK ---
+    def preload(self, prayer=None):
+        """Loads the Adhan for `prayer` paused at the start, unless it already is."""
+        path = adhan_file(prayer)
+        if self.loaded == path:
+            return
+        if not os.path.exists(path):
+            raise PlayerError(f"missing {path}")
+        self.cancel_fade()
+        self.command("set_property", "pause", True)
+        if self.command("get_property", "path") != path:
+            self.command("loadfile", path, "replace")
+        self.command("seek", 0, "absolute")
+        self.loaded = path
+
+    def play(self, prayer=None, volume=VOLUME, fade_in=FADE_IN):
+        """Starts the Adhan. Only two commands when preload() already ran."""
+        self.preload(prayer)
+        self.command("set_property", "volume", 0 if fade_in else volume)
+        self.command("set_property", "pause", False)
+        # Playing moves the position: the next play() rewinds first
+        self.loaded = None
+        if fade_in:
+            self.ramp(volume, fade_in, wait=False)
+
+    def stop(self, fade_out=0.0):
+        """Pauses playback, after fading out over `fade_out` seconds."""
+        if fade_out:
+            self.ramp(0, fade_out)
+        else:
+            self.cancel_fade()
+        self.command("set_property", "pause", True)
+        self.loaded = None
+
+    def volume(self, level, seconds=0.0):
+        """Sets the volume, or ramps to it over `seconds`."""
+        if seconds:
+            self.ramp(level, seconds)
+        else:
+            self.cancel_fade()
+            self.command("set_property", "volume", level)
+
+    def ramp(self, target, seconds, wait=True):
+        """Linear volume ramp to `target`; with wait=False it runs on a background thread."""
+        self.cancel_fade()
+        start = float(self.command("get_property", "volume") or 0)
+        stop = threading.Event()
+
+        def run():
+            steps = max(1, int(seconds * RAMP_STEPS))
+            began = time.monotonic()
+            for i in range(1, steps + 1):
+                # Sleep until this step's instant, so slow commands don't stretch the fade
+                delay = began + seconds * i / steps - time.monotonic()
+                if stop.wait(max(0.0, delay)):
+                    return
+                try:
+                    self.command("set_property", "volume", round(start + (target - start) * i / steps, 1))
+                except PlayerError:
+                    return
+
+        if wait:
+            run()
+        else:
+            self.fade = (threading.Thread(target=run, daemon=True), stop)
+            self.fade[0].start()
+
+    def cancel_fade(self):
+        if self.fade:
+            thread, stop = self.fade
+            stop.set()
+            if thread is not threading.current_thread():
+                thread.join()
+            self.fade = None
+
+# --- STUB ---
+def stub(socket_path=SOCKET_PATH):
+    """Stands in for mpv's JSON IPC (properties in memory, commands logged), for tests."""
+    import select
+
+    props = {"pause": True, "volume": 0, "path": None, "time-pos": 0}
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(8)
+    clients = {}
+    print(f"Stub player on {socket_path}", flush=True)
+
+    def handle(request):
+        args = request.get("command", [])
+        name = args[0] if args else None
+        if name == "get_property":
+            return props.get(args[1])
+        if name == "set_property":
+            props[args[1]] = args[2]
+        elif name == "loadfile":
+            props["path"], props["time-pos"] = args[1], 0
+        elif name == "seek":
+            props["time-pos"] = args[1]
+        else:
+            raise ValueError("invalid parameter")
+        return None
+
+    while True:
+        readable, _, _ = select.select([server, *clients], [], [])
+        for sock in readable:
+            if sock is server:
+                conn, _ = server.accept()
+                clients[conn] = b""
+                continue
+            chunk = sock.recv(4096)
+            if not chunk:
+                del clients[sock]
+                sock.close()
+                continue
+            clients[sock] += chunk
+            while b"\n" in clients[sock]:
+                line, clients[sock] = clients[sock].split(b"\n", 1)
+                request = json.loads(line)
+                print(f"{time.time():.3f} {json.dumps(request['command'])}", flush=True)
+                try:
+                    reply = {"data": handle(request), "error": "success"}
+                except (ValueError, IndexError) as e:
+                    reply = {"error": str(e)}
+                reply["request_id"] = request.get("request_id")
+                sock.sendall(json.dumps(reply).encode() + b"\n")
+
+if __name__ == "__main__":
+    # Usage: adhan_player.py preload [PRAYER] | play [PRAYER] | stop [FADE_SECONDS]
+    #        | volume LEVEL [SECONDS] | stub
+    command = sys.argv[1] if len(sys.argv) > 1 else "play"
+    args = sys.argv[2:]
+    if command == "stub":
+        stub()
+    player = Player(spawn=command in ("preload", "play"))
+    try:
+        if command == "preload":
+            player.preload(args[0] if args else None)
+        elif command == "play":
+            player.play(args[0] if args else None)
+            # The fade-in thread dies with this process: wait for it
+            if player.fade:
+                player.fade[0].join()
+        elif command == "stop":
+            player.stop(float(args[0]) if args else 0.0)
+        elif command == "volume":
+            player.volume(float(args[0]), float(args[1]) if len(args) > 1 else 0.0)
+    except PlayerError as e:
+        print(f"adhan_player: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -2,6 +2,8 @@
 
 ARABIC="أَصْبَحْنَا وَأَصْبَحَ الْمُلْكُ لِلَّهِ، وَالْحَمْدُ لِلَّهِ"
 ENGLISH="We have entered the morning and at this very time the whole kingdom belongs to Allah."
+# Hijri date and reminders on one line, e.g. "13 Rajab 1447 AH · White day fast (13/15)"
+HIJRI=$(python3 ~/.config/waybar/scripts/hijri.py 2>/dev/null | awk 'NR>1{printf " · "} {sub(/^ +/,""); printf "%s",$0}')
 
 # GTK_THEME forces dark mode so you don't get the white box
 # --class="adhkaar" matches the Hyprland rule we made
@@ -11,7 +13,7 @@ GTK_THEME=Adwaita:dark yad --title="Morning Remembrance" \
     --height=250 \
     --center \
     --window-icon="emblem-default" \
-    --text="<span font='Noto Naskh Arabic Bold 24' foreground='#ebcb8b'>$ARABIC</span>\n\n<span font='Arial 12' foreground='#cdd6f4'>$ENGLISH</span>" \
+    --text="<span font='Noto Naskh Arabic Bold 24' foreground='#ebcb8b'>$ARABIC</span>\n\n<span font='Arial 12' foreground='#cdd6f4'>$ENGLISH</span>\n\n<span font='Arial 10' foreground='#ebcb8b'>$HIJRI</span>" \
     --button="Close":0 \
     --undecorated \
     --text-align=center \
@@ -3,6 +3,8 @@ import sys
 import tkinter as tk
 from datetime import datetime
 
+import hijri
+
 # --- COLORS (Catppuccin/Dracula Style) ---
 BG_COLOR = "#1e1e2e"
 TEXT_COLOR = "#cdd6f4"
@@ -82,6 +84,14 @@ class AdhkaarApp:
         )
         self.counter_label.pack()
 
+        # Hijri date and reminders (white days, Ramadan, Dhu al-Hijjah), from the local table
+        try:
+            hijri_line = " · ".join([hijri.format_date(), *hijri.observances()])
+        except ValueError:
+            hijri_line = ""
+        if hijri_line:
+            tk.Label(self.header_frame, text=hijri_line, font=("Arial", 10), fg=GOLD_COLOR, bg=BG_COLOR).pack(pady=(5, 0))
+
         # Content Frame
         self.content_frame = tk.Frame(root, bg=BG_COLOR, padx=20)
         self.content_frame.pack(expand=True, fill="both")
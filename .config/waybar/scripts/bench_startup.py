@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Startup benchmark for the scripts Waybar runs on every interval or click.
+# Each scenario gets its own throwaway HOME, so nothing touches the real caches.
+#
+#   bench_startup.py            report wall time and import time per scenario
+#   bench_startup.py --check    also fail (exit 1) if a gated scenario is over budget
+
+# --- CONFIGURATION ---
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS = 15
+# Budget for the time a script adds on top of a bare `python3 -c pass`, in ms
+TICK_BUDGET_MS = 40
+# Modules a per-tick path must never import (each costs 10-45 ms on its own)
+HEAVY_MODULES = {"urllib.request", "http.client", "ssl", "subprocess", "email.parser", "tkinter", "numpy"}
+LAT, LON = 51.5074, -0.1278
+
+# --- SCENARIO SETUP ---
+def write_json(home, name, data):
+    import json
+
+    os.makedirs(os.path.join(home, ".cache"), exist_ok=True)
+    with open(os.path.join(home, ".cache", name), 'w') as f:
+        json.dump(data, f)
+
+def prayer_cached(home):
+    prayer_cold(home)
+    run(["prayer_times.py"], home)  # builds this year's timetable
+
+def prayer_cold(home):
+    write_json(home, "thawrah_prayers.json", {"meta": {"latitude": LAT, "longitude": LON, "city": "London"}})
+
+def khatmah_cached(home):
+    import reading_log
+
+    write_json(home, "thawrah_khatmah.json", {"current_page": 120})
+    # A few weeks of history, with its index already caught up
+    cache = os.path.join(home, ".cache")
+    log_file = os.path.join(cache, os.path.basename(reading_log.LOG_FILE))
+    start = int(time.time()) - 21 * 86400
+    with open(log_file, 'wb') as f:
+        for page in range(100, 121):
+            f.write(reading_log.RECORD.pack(start + (page - 100) * 86400, page))
+    reading_log.ReadingLog(log_file, os.path.join(cache, os.path.basename(reading_log.INDEX_FILE)))
+
+def tasbih_cached(home):
+    write_json(home, "thawrah_tasbih", {"session": [["SubhanAllah", 33]], "index": 0, "count": 20})
+
+def nothing(home):
+    pass
+
+# (name, args, setup, gated): gated scenarios are the per-tick paths held to the budget.
+# Clicks (dec) fsync their state, so they are reported but depend on the disk.
+SCENARIOS = [
+    ("prayer_times cached", ["prayer_times.py"], prayer_cached, True),
+    ("prayer_times cold", ["prayer_times.py"], prayer_cold, False),
+    ("prayer_times offline", ["prayer_times.py"], nothing, False),  # starts a background refresh
+    ("prayer_times import", ["-c", "import prayer_times"], nothing, False),  # what salah_guard pays
+    ("khatmah cached", ["khatmah.py"], khatmah_cached, True),
+    ("khatmah dec", ["khatmah.py", "dec"], khatmah_cached, False),
+    ("tasbih get", ["tasbih.py", "get"], tasbih_cached, True),
+    ("tasbih dec (no server)", ["tasbih.py", "dec"], tasbih_cached, False),
+]
+
+# --- MEASUREMENT ---
+def env_for(home):
+    env = dict(os.environ, HOME=home, XDG_RUNTIME_DIR=home, PYTHONDONTWRITEBYTECODE="1")
+    # Offline: point every HTTP(S) request at a closed port so it fails at once
+    env.update(http_proxy="http://127.0.0.1:9", https_proxy="http://127.0.0.1:9", no_proxy="")
+    return env
+
+def run(args, home, flags=()):
+    target = args if args[0] == "-c" else [os.path.join(SCRIPTS_DIR, args[0])] + args[1:]
+    return subprocess.run([sys.executable, *flags, *target], cwd=SCRIPTS_DIR, env=env_for(home),
+                          capture_output=True, text=True)
+
+def fresh_home(root, setup):
+    # A new directory per run: a background refresh started by the last run may still be writing
+    home = tempfile.mkdtemp(dir=root)
+    setup(home)
+    return home
+
+def background_refreshes():
+    """PIDs of detached prayer_refresh.py runs started from this directory."""
+    target = os.path.join(SCRIPTS_DIR, "prayer_refresh.py").encode()
+    pids = []
+    for pid in os.listdir("/proc"):
+        try:
+            with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                if target in f.read().split(b"\0"):
+                    pids.append(pid)
+        except (OSError, ValueError):
+            pass
+    return pids
+
+def settle(timeout=30):
+    # Background refreshes started by the previous scenario would otherwise compete
+    # with the next one for the CPU (and skew it badly on a single core)
+    deadline = time.monotonic() + timeout
+    while background_refreshes() and time.monotonic() < deadline:
+        time.sleep(0.2)
+
+def wall_times(args, root, setup, runs):
+    """Per-run wall time in ms. Each run starts from a freshly set up HOME."""
+    times = []
+    for _ in range(runs):
+        home = fresh_home(root, setup)
+        start = time.perf_counter()
+        run(args, home)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def import_profile(args, root, setup):
+    """(total self import time in ms, set of imported modules) from -X importtime."""
+    home = fresh_home(root, setup)
+    result = run(args, home, flags=("-X", "importtime"))
+    total_us, modules = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        modules.add(name.strip())
+    return total_us / 1000, modules
+
+def main():
+    check = "--check" in sys.argv
+    failures = []
+
+    # Real ticks reuse the bytecode written by the first one; runs here don't write any, so
+    # compile once up front or a freshly edited module would count its compile as startup
+    import compileall
+    compileall.compile_dir(SCRIPTS_DIR, maxlevels=0, quiet=1)
+
+    with tempfile.TemporaryDirectory() as root:
+        baseline = statistics.median(wall_times(["-c", "pass"], root, nothing, RUNS))
+        print(f"{'scenario':26} {'median':>8} {'+base':>8} {'imports':>8}  heavy modules (* = gated)")
+        print(f"{'python3 -c pass':26} {baseline:7.1f}ms")
+
+        for name, args, setup, gated in SCENARIOS:
+            settle()
+            median = statistics.median(wall_times(args, root, setup, RUNS))
+            import_ms, modules = import_profile(args, root, setup)
+            heavy = sorted(HEAVY_MODULES & modules)
+            overhead = median - baseline
+            flag = ""
+            if gated and overhead > TICK_BUDGET_MS:
+                flag = f"  OVER BUDGET ({TICK_BUDGET_MS} ms)"
+                failures.append(name)
+            if gated and heavy:
+                flag += "  HEAVY IMPORT"
+                failures.append(name)
+            label = f"{name} *" if gated else name
+            print(f"{label:26} {median:7.1f}ms {overhead:7.1f}ms {import_ms:7.1f}ms  "
+                  f"{', '.join(heavy) or '-'}{flag}")
+
+    if check and failures:
+        print(f"\n❌ Startup budget exceeded: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
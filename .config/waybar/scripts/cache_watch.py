@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import struct
+
+# --- INOTIFY (via libc, no extra dependency) ---
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000  # Events were dropped (wd -1): anything may have changed
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (followed by a NUL-padded name)
+
+def load_json(path):
+    """Default loader: parsed JSON, or None if the file is missing or broken."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class Watcher:
+    """One inotify instance shared by every WatchedFile in the process.
+
+    Watches the parent directories (so atomic rename-into-place is seen) for
+    IN_CLOSE_WRITE / IN_MOVED_TO. fileno() can be passed to select() by
+    daemons that want to wake up as soon as a watched file changes.
+    Without inotify (non-Linux), falls back to comparing mtimes on poll().
+    """
+
+    def __init__(self):
+        self.files = {}  # path -> [WatchedFile]
+        self.dirs = {}   # wd -> directory
+        self.seen_as = {}  # path -> signature() already accounted for (see seen())
+        self.fd = None
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self.fd = fd
+        except (OSError, AttributeError):
+            pass
+
+    def fileno(self):
+        return self.fd
+
+    def add(self, watched):
+        path = watched.path
+        directory = os.path.dirname(path)
+        if path not in self.files and self.fd is not None and directory not in self.dirs.values():
+            os.makedirs(directory, exist_ok=True)
+            wd = self.libc.inotify_add_watch(self.fd, directory.encode(), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd >= 0:
+                self.dirs[wd] = directory
+        self.files.setdefault(path, []).append(watched)
+
+    def poll(self):
+        """Drains pending events without blocking. Returns the set of watched paths that changed."""
+        changed = set()
+        if self.fd is None:
+            for path, watchers in self.files.items():
+                for watched in watchers:
+                    if watched.mtime != _mtime(path):
+                        changed.add(path)
+        else:
+            while True:
+                try:
+                    buf = os.read(self.fd, 4096)
+                except OSError as e:
+                    if e.errno in (errno.EAGAIN, errno.EINTR):
+                        break
+                    raise
+                offset = 0
+                while offset < len(buf):
+                    wd, mask, _, length = EVENT.unpack_from(buf, offset)
+                    name = buf[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0").decode()
+                    offset += EVENT.size + length
+                    if mask & IN_Q_OVERFLOW:
+                        changed.update(self.files)
+                        continue
+                    path = os.path.join(self.dirs.get(wd, ""), name)
+                    if path in self.files:
+                        changed.add(path)
+            # Our own writes, already marked seen, are not changes
+            changed = {path for path in changed if signature(path) != self.seen_as.get(path)}
+
+        for path in changed:
+            for watched in self.files[path]:
+                watched.stale = True
+        return changed
+
+    def seen(self):
+        """Marks every watched file as it is now as already handled, e.g. right after a
+        daemon has reloaded (and maybe rewritten) them: its own writes then don't wake it."""
+        for path, watchers in self.files.items():
+            self.seen_as[path] = signature(path)
+            for watched in watchers:
+                watched.mtime = _mtime(path)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def signature(path):
+    """(inode, mtime, size): changes with every write, including an atomic replace."""
+    try:
+        st = os.stat(path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+_default_watcher = None
+
+def default_watcher():
+    global _default_watcher
+    if _default_watcher is None:
+        _default_watcher = Watcher()
+    return _default_watcher
+
+class WatchedFile:
+    """In-memory snapshot of a file, re-read only after it has been rewritten."""
+
+    def __init__(self, path, loader=load_json, watcher=None):
+        self.path = os.path.expanduser(path)
+        self.loader = loader
+        self.watcher = watcher or default_watcher()
+        self.stale = True
+        self.value = None
+        self.mtime = None
+        self.watcher.add(self)
+
+    def get(self):
+        self.watcher.poll()
+        if self.stale:
+            self.stale = False
+            self.mtime = _mtime(self.path)
+            self.value = self.loader(self.path)
+        return self.value
+
+    def invalidate(self):
+        self.stale = True
+
+class Snapshots:
+    """Drop-in for state_store.read(path, default) in daemons: each file is parsed once,
+    then again only after it has been rewritten. Values are shared: don't modify them.
+
+    Uses its own Watcher unless given one, so its polling doesn't drain the events a
+    daemon's main loop waits for.
+    """
+
+    def __init__(self, watcher=None):
+        self.watcher = watcher or Watcher()
+        self.files = {}
+
+    def read(self, path, default=None, loader=load_json):
+        watched = self.files.get(path)
+        if watched is None:
+            watched = self.files[path] = WatchedFile(path, loader, self.watcher)
+        value = watched.get()
+        return default if value is None else value
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+import csv
+import json
+import mmap
+import os
+import random
+import re
+import struct
+
+# --- CONFIGURATION ---
+STORE_FILE = os.path.expanduser("~/.cache/thawrah_hadith.bin")
+
+# Bundled starter set; add collections with `hadith_store.py import FILE.json|FILE.csv ...`
+SEED = [
+    {"collection": "bukhari", "number": "1", "narrator": "Umar ibn al-Khattab",
+     "text": "Actions are but by intentions, and every man shall have only that which he intended.",
+     "tags": ["intention", "sincerity", "nawawi40"]},
+    {"collection": "bukhari", "number": "13", "narrator": "Anas ibn Malik",
+     "text": "None of you truly believes until he loves for his brother what he loves for himself.",
+     "tags": ["brotherhood", "iman", "nawawi40"]},
+    {"collection": "bukhari", "number": "6018", "narrator": "Abu Hurairah",
+     "text": "Whoever believes in Allah and the Last Day, let him speak good or remain silent.",
+     "tags": ["speech", "character", "nawawi40"]},
+    {"collection": "bukhari", "number": "6116", "narrator": "Abu Hurairah",
+     "text": "A man said to the Prophet: Advise me. He said: Do not become angry. The man repeated that several times and he said: Do not become angry.",
+     "tags": ["anger", "character", "nawawi40"]},
+    {"collection": "tirmidhi", "number": "1987", "narrator": "Abu Dharr",
+     "text": "Fear Allah wherever you are, follow a bad deed with a good deed and it will wipe it out, and treat people with good character.",
+     "tags": ["taqwa", "repentance", "character", "nawawi40"]},
+    {"collection": "bukhari", "number": "5027", "narrator": "Uthman ibn Affan",
+     "text": "The best of you are those who learn the Quran and teach it.",
+     "tags": ["quran", "knowledge"]},
+    {"collection": "muslim", "number": "2564", "narrator": "Abu Hurairah",
+     "text": "Allah does not look at your appearance or your wealth, but He looks at your hearts and your deeds.",
+     "tags": ["sincerity", "heart"]},
+]
+
+STOPWORDS = {"the", "and", "for", "his", "him", "her", "not", "who", "are", "but", "you", "your",
+             "that", "this", "with", "was", "will", "shall", "have", "has", "what", "they", "them",
+             "from", "had", "said", "one", "all", "let", "any"}
+
+# --- FILE FORMAT ---
+# Header, record table (offset, size), term table sorted by term (term offset, term size,
+# postings offset, postings count), then the term, postings (uint32 record ids) and record blobs.
+# Terms are lowercase words, "#tag" for tags and "@collection:number" for ids.
+MAGIC = b"THWH"
+VERSION = 1
+HEADER = struct.Struct("<4sHII")  # magic, version, record count, term count
+RECORD = struct.Struct("<II")
+TERM = struct.Struct("<IHII")
+POSTING = struct.Struct("<I")
+SEP = "\x1f"
+
+def tokenize(text):
+    return {w for w in re.findall(r"[a-z']+", text.lower()) if len(w) > 2 and w not in STOPWORDS}
+
+def hadith_id(h):
+    return f"{h['collection'].lower()}:{h['number']}"
+
+def read_import(path):
+    """JSON (list of objects) or CSV (header row) with collection, number, narrator, text, tags."""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row["tags"] = [t.strip() for t in (row.get("tags") or "").split(";") if t.strip()]
+        return rows
+    with open(path, 'r', encoding="utf-8") as f:
+        return json.load(f)
+
+def build(hadiths, out=STORE_FILE):
+    """Writes the record store and its inverted index. Later entries with the same id win."""
+    unique = {hadith_id(h): h for h in hadiths}
+    records = list(unique.values())
+
+    postings = {}
+    blobs = []
+    for i, h in enumerate(records):
+        tags = [t.lower() for t in h.get("tags", [])]
+        terms = tokenize(h["text"]) | tokenize(h.get("narrator", "")) | {f"#{t}" for t in tags}
+        terms.add(f"@{hadith_id(h)}")
+        for term in terms:
+            postings.setdefault(term, []).append(i)
+        values = [h["collection"], str(h["number"]), h.get("narrator", ""), ",".join(tags), h["text"]]
+        blobs.append(SEP.join(values).encode("utf-8"))
+
+    terms = sorted(postings, key=lambda t: t.encode("utf-8"))
+    record_table, offset = [], 0
+    for blob in blobs:
+        record_table.append(RECORD.pack(offset, len(blob)))
+        offset += len(blob)
+
+    term_table, term_parts, posting_parts = [], [], []
+    term_size = posting_count = 0
+    for term in terms:
+        raw = term.encode("utf-8")
+        ids = postings[term]
+        term_table.append(TERM.pack(term_size, len(raw), posting_count, len(ids)))
+        term_parts.append(raw)
+        posting_parts.append(b"".join(POSTING.pack(i) for i in ids))
+        term_size += len(raw)
+        posting_count += len(ids)
+    term_blob, posting_blob = b"".join(term_parts), b"".join(posting_parts)
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    tmp_file = f"{out}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), len(terms)))
+        f.write(b"".join(record_table))
+        f.write(b"".join(term_table))
+        f.write(struct.pack("<II", len(term_blob), len(posting_blob)))
+        f.write(term_blob + posting_blob + b"".join(blobs))
+    os.replace(tmp_file, out)
+    return len(records)
+
+class HadithStore:
+    """mmap-backed reader; term lookups are a binary search over the sorted term table."""
+
+    def __init__(self, path=STORE_FILE):
+        with open(path, 'rb') as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self.term_count = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a Thawrah hadith store")
+        self.records_at = HEADER.size
+        self.terms_at = self.records_at + self.count * RECORD.size
+        sizes_at = self.terms_at + self.term_count * TERM.size
+        term_bytes, posting_bytes = struct.unpack_from("<II", self.buf, sizes_at)
+        self.term_blob_at = sizes_at + 8
+        self.postings_at = self.term_blob_at + term_bytes
+        self.data_at = self.postings_at + posting_bytes
+
+    def get(self, i):
+        offset, size = RECORD.unpack_from(self.buf, self.records_at + i * RECORD.size)
+        start = self.data_at + offset
+        collection, number, narrator, tags, text = self.buf[start:start + size].decode("utf-8").split(SEP)
+        return {"collection": collection, "number": number, "narrator": narrator,
+                "tags": tags.split(",") if tags else [], "text": text}
+
+    def all(self):
+        return [self.get(i) for i in range(self.count)]
+
+    def _term(self, k):
+        t_off, t_len, p_off, p_count = TERM.unpack_from(self.buf, self.terms_at + k * TERM.size)
+        start = self.term_blob_at + t_off
+        return self.buf[start:start + t_len], p_off, p_count
+
+    def postings(self, term):
+        """Record ids containing `term` (sorted)."""
+        raw = term.encode("utf-8")
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid)[0] < raw: lo = mid + 1
+            else: hi = mid
+        if lo == self.term_count: return []
+        found, p_off, p_count = self._term(lo)
+        if found != raw: return []
+        start = self.postings_at + p_off * POSTING.size
+        return [i for (i,) in POSTING.iter_unpack(self.buf[start:start + p_count * POSTING.size])]
+
+    def by_id(self, hid):
+        """e.g. by_id("bukhari:1")."""
+        ids = self.postings(f"@{hid.lower()}")
+        return self.get(ids[0]) if ids else None
+
+    def search(self, query="", tags=()):
+        """Record ids matching every keyword in `query` and every tag."""
+        terms = list(tokenize(query)) + [f"#{t.lower()}" for t in tags]
+        if not terms:
+            return list(range(self.count))
+        result = None
+        for term in terms:
+            ids = set(self.postings(term))
+            result = ids if result is None else result & ids
+            if not result: return []
+        return sorted(result)
+
+    def random(self, query="", tags=(), max_length=None):
+        ids = self.search(query, tags)
+        random.shuffle(ids)
+        for i in ids[:20]:
+            h = self.get(i)
+            if max_length is None or len(h["text"]) <= max_length:
+                return h
+        return None
+
+def load(path=STORE_FILE):
+    """Opens the store, building it from the bundled SEED on first use."""
+    try:
+        if not os.path.exists(path):
+            build(SEED, path)
+        return HadithStore(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def format_hadith(h):
+    narrator = f" (narrated by {h['narrator']})" if h["narrator"] else ""
+    return f'"{h["text"]}"\n\n— {h["collection"].capitalize()} {h["number"]}{narrator}'
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: hadith_store.py import FILE...   |   get bukhari:1   |   search WORDS [#tag ...]   |   random [#tag]
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("random", [])
+    # Built from the bundled set if missing; None means it exists but can't be read
+    store = load()
+    if store is None:
+        print(f"hadith_store: can't read {STORE_FILE} (delete it to start again from the bundled set)",
+              file=sys.stderr)
+        sys.exit(1)
+    if command == "import":
+        # Merged into what is already indexed; re-importing a hadith replaces it
+        n = build(store.all() + [h for path in args for h in read_import(path)])
+        print(f"✅ {n} hadith indexed in {STORE_FILE}")
+    else:
+        words = " ".join(a for a in args if not a.startswith("#"))
+        tags = [a[1:] for a in args if a.startswith("#")]
+        if command == "get":
+            h = store.by_id(args[0])
+            print(format_hadith(h) if h else "Not found")
+        elif command == "search":
+            for i in store.search(words, tags):
+                h = store.get(i)
+                print(f"{hadith_id(h)}: {h['text']}")
+        else:
+            h = store.random(words, tags)
+            print(format_hadith(h) if h else "Not found")
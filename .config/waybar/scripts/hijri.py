@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+import math
+import sys
+from datetime import date, timedelta
+from itertools import accumulate
+
+# Gregorian <-> Hijri (Umm al-Qura) conversion from a precomputed month table.
+# Every lookup is O(1): month starts are an array indexed by (year, month), and
+# a date's month is found from the mean month length plus at most a step or two.
+# The table is generated astronomically (`hijri.py generate`, see generate()).
+
+FIRST_YEAR = 1300
+LAST_YEAR = 1600
+MONTHS = ["Muharram", "Safar", "Rabi' al-Awwal", "Rabi' al-Thani", "Jumada al-Ula", "Jumada al-Akhirah",
+          "Rajab", "Sha'ban", "Ramadan", "Shawwal", "Dhu al-Qi'dah", "Dhu al-Hijjah"]
+RAMADAN, SHAWWAL, DHU_AL_HIJJAH = 9, 10, 12
+
+# --- TABLE (generated, do not edit by hand) ---
+# 1 Muharram 1300 AH, then one year per 3 hex digits: 12 bits, Muharram first, 1 = 30 days, 0 = 29.
+EPOCH = date(1882, 11, 12)
+MONTH_BITS = (
+    "a55b49ba4bd15d8ada55aaab595749768bb45b52b6a96d4aea574ab5555a"
+    "a5d52da95d2ad955aaaad52f257527a95b4ab5656d2ae92ea9754b5a95d4"
+    "9da2dd26d5556a56d2b6937497a4db2ab5535c96d4aea56d2ada4dd25d92"
+    "ea56d4ad6956c97a4bb25b52da95ad4b5a575276936caae52ea96d4ae956"
+    "aaab553725752ba93b4aba55ab2ae94f49754b6a56d4aea4ed26e956aa6b"
+    "52b693b49ba4bb26b5556a96d4aea5752b69574a6d936c96d4ae696b4aba"
+    "4bd25d92da95b4ab5a56d27693b49b6556a9754b6a56caad555b29b92ba9"
+    "5d4ada55aaab5957497a4baa5b52b6a56d2ae9572a75535a95d49ba4dd26"
+    "d535aaaad4b6a57527a95b4ab5536c9ae4b6a96b4ada55d25d92dc96d4ad"
+    "6556d2b693749b64db2ab54b6a5752b6956b2ad94dc95d4aea56caad5556"
+    "c9764bb25b52da95b32b69574a75536a9ad52ea8ed26e936aaab54b6a575"
+    "27a93b4aba55aa9ae4b729754b6a55d29ea2ed16e4aea56b52b6937497a4"
+    "bb26b54b6a5ad2ae95752b6956ca6d4aea56d2ad555aaab64bb25d52da95"
+    "b2ab5956caba53aa9b54aea975476936caad555aa5b52ba8bd45da55aaab"
+    "555729754baa5b52b695751768b6a56d4ada95b49ba2bd15d4adaa5ad2b6"
+    "957"
+)
+
+MEAN_MONTH = 29.530588853
+
+_starts = None
+
+def month_starts():
+    """Ordinal of the first day of every month in the table, plus the day after the last one."""
+    global _starts
+    if _starts is None:
+        lengths = []
+        for i in range(0, len(MONTH_BITS), 3):
+            bits = int(MONTH_BITS[i:i + 3], 16)
+            lengths.extend(29 + (bits >> (11 - m) & 1) for m in range(12))
+        _starts = list(accumulate(lengths, initial=EPOCH.toordinal()))
+    return _starts
+
+def to_gregorian(year, month, day=1):
+    if not FIRST_YEAR <= year <= LAST_YEAR or not 1 <= month <= 12 or not 1 <= day <= 30:
+        raise ValueError(f"{year}-{month}-{day} AH is outside the table ({FIRST_YEAR}-{LAST_YEAR} AH)")
+    return date.fromordinal(month_starts()[(year - FIRST_YEAR) * 12 + month - 1] + day - 1)
+
+def from_gregorian(d):
+    """(year, month, day) of the Hijri date `d` falls on."""
+    starts = month_starts()
+    ordinal = d.toordinal()
+    if not starts[0] <= ordinal < starts[-1]:
+        raise ValueError(f"{d} is outside the table ({FIRST_YEAR}-{LAST_YEAR} AH)")
+    i = min(int((ordinal - starts[0]) / MEAN_MONTH), len(starts) - 2)
+    while starts[i] > ordinal:
+        i -= 1
+    while starts[i + 1] <= ordinal:
+        i += 1
+    return FIRST_YEAR + i // 12, i % 12 + 1, ordinal - starts[i] + 1
+
+def month_length(year, month):
+    i = (year - FIRST_YEAR) * 12 + month - 1
+    starts = month_starts()
+    return starts[i + 1] - starts[i]
+
+def last_ten(day, length):
+    """True on the last ten days of a month of `length` (29 or 30) days, e.g. Ramadan's last ten nights."""
+    return day > length - 10
+
+def format_date(d=None):
+    """e.g. "7 Jumada al-Ula 1448 AH"."""
+    year, month, day = from_gregorian(d or date.today())
+    return f"{day} {MONTHS[month - 1]} {year} AH"
+
+def observances(d=None):
+    """Reminders for `d` (and for tomorrow, where there is something to prepare for)."""
+    d = d or date.today()
+    try:
+        year, month, day = from_gregorian(d)
+        _, next_month, next_day = from_gregorian(d + timedelta(days=1))
+    except ValueError:
+        return []
+    notes = []
+    if month == RAMADAN:
+        notes.append(f"Ramadan, day {day}" + (" (last ten nights)" if last_ten(day, month_length(year, month)) else ""))
+    elif month == SHAWWAL and day == 1:
+        notes.append("Eid al-Fitr")
+    elif month == DHU_AL_HIJJAH and day <= 13:
+        notes.append({9: "Day of Arafah", 10: "Eid al-Adha"}.get(day)
+                     or ("Days of Tashreeq (no fasting)" if day > 10 else f"First ten days of Dhu al-Hijjah ({day})"))
+    elif month == 1 and day in (9, 10):
+        notes.append("Ashura: fast of the 9th and 10th")
+
+    # The three white days (13-15), except the Days of Tashreeq
+    if 13 <= day <= 15 and month != DHU_AL_HIJJAH:
+        notes.append(f"White day fast ({day}/15)")
+    if next_day == 13 and next_month != DHU_AL_HIJJAH:
+        notes.append("White days begin tomorrow: intend the fast")
+    if next_month == RAMADAN and next_day == 1:
+        notes.append("Ramadan begins tomorrow")
+    return notes
+
+# --- GENERATOR ---
+# Umm al-Qura rule (as applied since 1420 AH; used for the whole range here): on the
+# evening of the 29th, if at sunset in Makkah the conjunction has already happened
+# and the moon sets after the sun, the next month starts the following day;
+# otherwise the month has 30 days. New moons from Meeus ch. 49, the moon's position
+# from the main terms of Meeus ch. 47 (good to ~0.01 degrees, i.e. seconds of moonset).
+
+MAKKAH = (21.4225, 39.8262)
+
+# D, M, M', F, longitude (1e-6 deg), distance (1e-3 km)
+MOON_LR = [
+    (0, 0, 1, 0, 6288774, -20905355), (2, 0, -1, 0, 1274027, -3699111), (2, 0, 0, 0, 658314, -2955968),
+    (0, 0, 2, 0, 213618, -569925), (0, 1, 0, 0, -185116, 48888), (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158), (2, -1, -1, 0, 57066, -152138), (2, 0, 1, 0, 53322, -170733),
+    (2, -1, 0, 0, 45758, -204586), (0, 1, -1, 0, -40923, -129620), (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755), (2, 0, 0, -2, 15327, 10321), (0, 0, 1, 2, -12528, 0),
+    (0, 0, 1, -2, 10980, 79661), (4, 0, -1, 0, 10675, -34782), (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636), (2, 1, -1, 0, -7888, 24208), (2, 1, 0, 0, -6766, 30824),
+    (1, 0, -1, 0, -5163, -8379), (1, 1, 0, 0, 4987, -16675), (2, -1, 1, 0, 4036, -12831),
+    (2, 0, 2, 0, 3994, -10445), (4, 0, 0, 0, 3861, -11650), (2, 0, -3, 0, 3665, 14403),
+    (0, 1, -2, 0, -2689, -7003), (2, 0, -1, 2, -2602, 0), (2, -1, -2, 0, 2390, 10056),
+    (1, 0, 1, 0, -2348, 6322), (2, -2, 0, 0, 2236, -9884), (0, 1, 2, 0, -2120, 5751),
+    (0, 2, 0, 0, -2069, 0), (2, -2, -1, 0, 2048, -4950), (2, 0, 1, -2, -1773, 4130),
+    (2, 0, 0, 2, -1595, 0), (4, -1, -1, 0, 1215, -3958), (0, 0, 2, 2, -1110, 0),
+    (3, 0, -1, 0, -892, 3258), (2, 1, 1, 0, -810, 2616), (4, -1, -2, 0, 759, -1897),
+    (0, 2, -1, 0, -713, -2117), (2, 2, -1, 0, -700, 2354), (2, 1, -2, 0, 691, 0),
+    (2, -1, 0, -2, 596, 0), (4, 0, 1, 0, 549, -1423), (0, 0, 4, 0, 537, -1117),
+    (4, -1, 0, 0, 520, -1571), (1, 0, -2, 0, -487, -1739), (2, 1, 0, -2, -399, 0),
+    (0, 0, 2, -2, -381, -4421), (1, 1, 1, 0, 351, 0), (3, 0, -2, 0, -340, 0),
+    (4, 0, -3, 0, 330, 0), (2, -1, 2, 0, 327, 0), (0, 2, 1, 0, -323, 1165),
+    (1, 1, -1, 0, 299, 0), (2, 0, 3, 0, 294, 0), (2, 0, -1, -2, 0, 8752),
+]
+# D, M, M', F, latitude (1e-6 deg)
+MOON_B = [
+    (0, 0, 0, 1, 5128122), (0, 0, 1, 1, 280602), (0, 0, 1, -1, 277693), (2, 0, 0, -1, 173237),
+    (2, 0, -1, 1, 55413), (2, 0, -1, -1, 46271), (2, 0, 0, 1, 32573), (0, 0, 2, 1, 17198),
+    (2, 0, 1, -1, 9266), (0, 0, 2, -1, 8822), (2, -1, 0, -1, 8216), (2, 0, -2, -1, 4324),
+    (2, 0, 1, 1, 4200), (2, 1, 0, -1, -3359), (2, -1, -1, 1, 2463), (2, -1, 0, 1, 2211),
+    (2, -1, -1, -1, 2065), (0, 1, -1, -1, -1870), (4, 0, -1, -1, 1828), (0, 1, 0, 1, -1794),
+    (0, 0, 0, 3, -1749), (0, 1, -1, 1, -1565), (1, 0, 0, 1, -1491), (0, 1, 1, 1, -1475),
+    (0, 1, 1, -1, -1410), (0, 1, 0, -1, -1344), (1, 0, 0, -1, -1335), (0, 0, 3, 1, 1107),
+    (4, 0, 0, -1, 1021), (4, 0, -1, 1, 833),
+]
+# Coefficient, multiples of (M, M', F, Omega) in the sine, power of E (Meeus table 49.A, new moon column)
+NEW_MOON_TERMS = [
+    (-0.40720, (0, 1, 0, 0), 0), (0.17241, (1, 0, 0, 0), 1), (0.01608, (0, 2, 0, 0), 0),
+    (0.01039, (0, 0, 2, 0), 0), (0.00739, (-1, 1, 0, 0), 1), (-0.00514, (1, 1, 0, 0), 1),
+    (0.00208, (2, 0, 0, 0), 2), (-0.00111, (0, 1, -2, 0), 0), (-0.00057, (0, 1, 2, 0), 0),
+    (0.00056, (1, 2, 0, 0), 1), (-0.00042, (0, 3, 0, 0), 0), (0.00042, (1, 0, 2, 0), 1),
+    (0.00038, (1, 0, -2, 0), 1), (-0.00024, (-1, 2, 0, 0), 1), (-0.00017, (0, 0, 0, 1), 0),
+    (-0.00007, (2, 1, 0, 0), 0), (0.00004, (0, 2, -2, 0), 0), (0.00004, (3, 0, 0, 0), 0),
+    (0.00003, (1, 1, -2, 0), 0), (0.00003, (0, 2, 2, 0), 0), (-0.00003, (1, 1, 2, 0), 0),
+    (0.00003, (-1, 1, 2, 0), 0), (-0.00002, (-1, 1, -2, 0), 0), (-0.00002, (1, 3, 0, 0), 0),
+    (0.00002, (0, 4, 0, 0), 0),
+]
+# (A0, A1 per lunation, amplitude) of the planetary corrections; A1's T^2 term is applied separately
+NEW_MOON_PLANETARY = [
+    (299.77, 0.107408, 0.000325), (251.88, 0.016321, 0.000165), (251.83, 26.651886, 0.000164),
+    (349.42, 36.412478, 0.000126), (84.66, 18.206239, 0.000110), (141.74, 53.303771, 0.000062),
+    (207.14, 2.453732, 0.000060), (154.84, 7.306860, 0.000056), (34.52, 27.261239, 0.000047),
+    (207.19, 0.121824, 0.000042), (291.34, 1.844379, 0.000040), (161.72, 24.198154, 0.000037),
+    (239.56, 25.513099, 0.000035), (331.55, 3.592518, 0.000023),
+]
+# Delta T (TT - UT, seconds) by year, interpolated; later years use Espenak & Meeus's polynomials
+DELTA_T = [(1880, -5.4), (1900, -2.8), (1920, 21.2), (1940, 24.3), (1960, 33.2), (1980, 50.5),
+           (2000, 63.8), (2010, 66.1), (2020, 69.4)]
+
+def delta_t(year):
+    if year >= 2050:
+        u = (year - 1820) / 100
+        return -20 + 32 * u * u - (0.5628 * (2150 - year) if year < 2150 else 0)
+    if year >= DELTA_T[-1][0]:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t * t
+    for (y0, t0), (y1, t1) in zip(DELTA_T, DELTA_T[1:]):
+        if year < y1:
+            return t0 + (t1 - t0) * (max(year, y0) - y0) / (y1 - y0)
+
+def jd_of(d):
+    return d.toordinal() + 1721424.5
+
+def new_moon(k):
+    """Julian day (UT) of the k-th new moon after January 2000."""
+    t = k / 1236.85
+    jde = (2451550.09766 + 29.530588861 * k + 0.00015437 * t ** 2 - 0.000000150 * t ** 3
+           + 0.00000000073 * t ** 4)
+    e = 1 - 0.002516 * t - 0.0000074 * t ** 2
+    m = math.radians(2.5534 + 29.10535670 * k - 0.0000014 * t ** 2 - 0.00000011 * t ** 3)
+    mp = math.radians(201.5643 + 385.81693528 * k + 0.0107582 * t ** 2 + 0.00001238 * t ** 3
+                      - 0.000000058 * t ** 4)
+    f = math.radians(160.7108 + 390.67050284 * k - 0.0016118 * t ** 2 - 0.00000227 * t ** 3
+                     + 0.000000011 * t ** 4)
+    omega = math.radians(124.7746 - 1.56375588 * k + 0.0020672 * t ** 2 + 0.00000215 * t ** 3)
+    for coeff, (cm, cmp, cf, co), e_power in NEW_MOON_TERMS:
+        jde += coeff * e ** e_power * math.sin(cm * m + cmp * mp + cf * f + co * omega)
+    for i, (a0, a1, amplitude) in enumerate(NEW_MOON_PLANETARY):
+        angle = a0 + a1 * k - (0.009173 * t ** 2 if i == 0 else 0)
+        jde += amplitude * math.sin(math.radians(angle))
+    return jde - delta_t(2000 + k / 12.3685) / 86400
+
+def moon_position(jd):
+    """(right ascension, declination, horizontal parallax) in degrees, geocentric."""
+    t = (jd - 2451545.0) / 36525
+    lp = 218.3164477 + 481267.88123421 * t - 0.0015786 * t ** 2
+    d = math.radians(297.8501921 + 445267.1114034 * t - 0.0018819 * t ** 2)
+    m = math.radians(357.5291092 + 35999.0502909 * t - 0.0001536 * t ** 2)
+    mp = math.radians(134.9633964 + 477198.8675055 * t + 0.0087414 * t ** 2)
+    f = math.radians(93.2720950 + 483202.0175233 * t - 0.0036539 * t ** 2)
+    a1 = math.radians(119.75 + 131.849 * t)
+    a2 = math.radians(53.09 + 479264.290 * t)
+    a3 = math.radians(313.45 + 481266.484 * t)
+    e = 1 - 0.002516 * t - 0.0000074 * t ** 2
+
+    sum_l = sum_r = sum_b = 0.0
+    for cd, cm, cmp, cf, coeff_l, coeff_r in MOON_LR:
+        arg = cd * d + cm * m + cmp * mp + cf * f
+        scale = e ** abs(cm)
+        sum_l += coeff_l * scale * math.sin(arg)
+        sum_r += coeff_r * scale * math.cos(arg)
+    for cd, cm, cmp, cf, coeff_b in MOON_B:
+        sum_b += coeff_b * e ** abs(cm) * math.sin(cd * d + cm * m + cmp * mp + cf * f)
+    lp_r = math.radians(lp)
+    sum_l += 3958 * math.sin(a1) + 1962 * math.sin(lp_r - f) + 318 * math.sin(a2)
+    sum_b += (-2235 * math.sin(lp_r) + 382 * math.sin(a3) + 175 * math.sin(a1 - f) + 175 * math.sin(a1 + f)
+              + 127 * math.sin(lp_r - mp) - 115 * math.sin(lp_r + mp))
+
+    lon = math.radians(lp + sum_l / 1e6)
+    lat = math.radians(sum_b / 1e6)
+    distance = 385000.56 + sum_r / 1000
+    eps = math.radians(23.4392911 - 0.0130042 * t)
+    ra = math.atan2(math.sin(lon) * math.cos(eps) - math.tan(lat) * math.sin(eps), math.cos(lon))
+    decl = math.asin(math.sin(lat) * math.cos(eps) + math.cos(lat) * math.sin(eps) * math.sin(lon))
+    return math.degrees(ra) % 360, math.degrees(decl), math.degrees(math.asin(6378.14 / distance))
+
+def sunset(d, lat, lon):
+    """Julian day (UT) of sunset on date `d` at (lat, lon)."""
+    import prayer_engine
+
+    jd0 = jd_of(d)
+    hours = 18 - lon / 15
+    for _ in range(2):
+        decl, eqt = prayer_engine.sun_position(jd0 + hours / 24)
+        lat_r, decl_r = math.radians(lat), math.radians(decl)
+        cos_h = ((-math.sin(math.radians(prayer_engine.SUNRISE_ANGLE)) - math.sin(lat_r) * math.sin(decl_r))
+                 / (math.cos(lat_r) * math.cos(decl_r)))
+        hours = 12 - lon / 15 - eqt + math.degrees(math.acos(cos_h)) / 15
+    return jd0 + hours / 24
+
+def moon_sets_after_sun(jd, lat, lon):
+    """True if the moon is still above its setting altitude at the instant `jd` (sunset)."""
+    ra, decl, parallax = moon_position(jd + delta_t(2000 + (jd - 2451545) / 365.25) / 86400)
+    gmst = 280.46061837 + 360.98564736629 * (jd - 2451545.0)
+    hour_angle = math.radians(gmst + lon - ra)
+    lat_r, decl_r = math.radians(lat), math.radians(decl)
+    altitude = math.degrees(math.asin(math.sin(lat_r) * math.sin(decl_r)
+                                      + math.cos(lat_r) * math.cos(decl_r) * math.cos(hour_angle)))
+    # Meeus ch. 15: standard altitude of the moon at rising/setting
+    return altitude > 0.7275 * parallax - 0.5667
+
+def next_month_starts_after_29(day29):
+    """True if the month whose 29th is `day29` ends that evening (so it has 29 days)."""
+    lat, lon = MAKKAH
+    k = round((jd_of(day29) - 2451550.09766) / 29.530588861)
+    set_jd = sunset(day29, lat, lon)
+    return new_moon(k) < set_jd and moon_sets_after_sun(set_jd, lat, lon)
+
+def generate(first_year=FIRST_YEAR, last_year=LAST_YEAR):
+    """(epoch date, hex month bits) computed with the Umm al-Qura rule."""
+    # Anchor: the first evening after the conjunction that starts Muharram of first_year
+    approx = date.fromordinal(date(622, 7, 19).toordinal() + math.floor((first_year - 1) * 354.36707))
+    k = round((jd_of(approx) - 2451550.09766) / 29.530588861)
+    conj = new_moon(k)
+    day = date.fromordinal(int(conj + 3 / 24 - 1721424.5))  # Makkah date (UTC+3) of the conjunction
+    start = day + timedelta(days=1 if next_month_starts_after_29(day) else 2)
+
+    epoch, digits = start, []
+    for _ in range(first_year, last_year + 1):
+        bits = 0
+        for _ in range(12):
+            short = next_month_starts_after_29(start + timedelta(days=28))
+            bits = bits << 1 | (0 if short else 1)
+            start += timedelta(days=29 if short else 30)
+        digits.append(f"{bits:03x}")
+    return epoch, "".join(digits)
+
+if __name__ == "__main__":
+    # Usage: hijri.py [YYYY-MM-DD]   |   hijri.py to-gregorian YEAR MONTH DAY   |   hijri.py generate
+    args = sys.argv[1:]
+    if args and args[0] == "generate":
+        epoch, bits = generate()
+        print(f"EPOCH = date({epoch.year}, {epoch.month}, {epoch.day})\nMONTH_BITS = (")
+        for i in range(0, len(bits), 60):
+            print(f'    "{bits[i:i + 60]}"')
+        print(")")
+    elif args and args[0] == "to-gregorian":
+        print(to_gregorian(*(int(a) for a in args[1:4])))
+    else:
+        d = date.fromisoformat(args[0]) if args else date.today()
+        print(format_date(d))
+        for note in observances(d):
+            print(f"  {note}")
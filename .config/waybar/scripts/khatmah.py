@@ -2,49 +2,57 @@
 import sys
 import os
 import json
-import math
-from datetime import datetime
+from datetime import date
+
+import state_store
 
 # --- CONFIGURATION ---
 CACHE_FILE = os.path.expanduser("~/.cache/thawrah_khatmah.json")
 TOTAL_PAGES = 604 
 
 def load_data():
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return {"current_page": 0, "last_read_date": datetime.now().strftime("%Y-%m-%d"), "pages_today": 0}
-
-def save_data(data):
-    with open(CACHE_FILE, 'w') as f:
-        json.dump(data, f)
+    return state_store.read(CACHE_FILE, {"current_page": 0})
 
 def get_juz(page):
-    if page <= 0: return 0
-    return math.ceil(page / 20)
+    import quran_meta
+
+    return quran_meta.index().juz_of_page(page)
+
+def ramadan_target(page, today=None):
+    """Pages per day still needed to finish within Ramadan, or None outside it."""
+    import hijri
+
+    today = today or date.today()
+    try:
+        year, month, day = hijri.from_gregorian(today)
+    except ValueError:
+        return None
+    if month != hijri.RAMADAN or page >= TOTAL_PAGES:
+        return None
+    days_left = hijri.month_length(year, month) - day + 1
+    return -(-(TOTAL_PAGES - page) // days_left)
 
 def main():
-    data = load_data()
-    today_str = datetime.now().strftime("%Y-%m-%d")
+    import quran_meta
+    import reading_log
 
-    # Reset daily counter
-    if data.get("last_read_date") != today_str:
-        data["pages_today"] = 0
-        data["last_read_date"] = today_str
+    # Page-read journal; daily/weekly totals, streak and pace are precomputed in its index
+    log = reading_log.ReadingLog()
 
     # Handle direct commands (Right click decrement)
     if len(sys.argv) > 1 and sys.argv[1] == "dec":
-        if data["current_page"] > 0:
-            data["current_page"] -= 1
-            if data["pages_today"] > 0: data["pages_today"] -= 1
-        save_data(data)
+        # Locked, so a concurrent quran_nav save can't be lost
+        with state_store.update(CACHE_FILE, {"current_page": 0}) as data:
+            if data["current_page"] > 0:
+                log.append(data["current_page"], undo=True)
+                data["current_page"] -= 1
+    else:
+        data = load_data()
 
     # --- OUTPUT TO WAYBAR ---
     page = data["current_page"]
     juz = get_juz(page)
+    surah = quran_meta.SURAHS[quran_meta.index().surah_of_page(page) - 1][0] if page > 0 else "-"
     percentage = int((page / TOTAL_PAGES) * 100)
     
     icon = "📖"
@@ -53,10 +61,21 @@ def main():
     text = f"{icon} Page {page}"
     if page == 0: text = f"{icon} Start Reading"
 
+    streak, best = log.streak()
+    finish = log.projected_finish(page)
+    finish = f"{finish:%d %b %Y}" if finish else "-"
+    target = ramadan_target(page)
+    ramadan = f"Ramadan Target: {target} pages/day\n" if target else ""
     tooltip = (f"<b>Quran Progress</b>\n"
                f"----------------\n"
                f"Juz: {juz}\n"
-               f"Pages Today: {data['pages_today']}\n"
+               f"Surah: {surah}\n"
+               f"Pages Today: {log.day_total()}\n"
+               f"This Week: {log.week_total()}\n"
+               f"Streak: {streak} days (best {best})\n"
+               f"Pace: {log.pace():.1f} pages/day\n"
+               f"Finish: {finish}\n"
+               f"{ramadan}"
                f"Progress: {percentage}%")
 
     print(json.dumps({
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import json
+import os
+import struct
+import time
+
+import state_store
+
+# --- CONFIGURATION ---
+LOCATION_FILE = os.path.expanduser("~/.cache/thawrah_location.json")
+# Override with THAWRAH_GEO_URL (e.g. `location.py stub` for tests); must answer like ipapi.co/json
+GEO_URL = os.environ.get("THAWRAH_GEO_URL", "https://ipapi.co/json/")
+TTL = 7 * 86400        # Re-geolocate at least this often, even on the same network
+MOVED_DEGREES = 0.05   # ~5 km: closer than this counts as the same place
+TIMEOUT = 5
+
+# --- NETWORK IDENTITY ---
+def network_identity():
+    """"iface|gateway|gateway MAC" of the default route, "" when offline.
+
+    Read from /proc, so checking costs no network traffic and no subprocess. The
+    gateway's MAC tells apart networks that reuse the same private gateway address
+    (most home routers are 192.168.1.1), which is what an SSID check would do too.
+    """
+    try:
+        with open("/proc/net/route", 'r') as f:
+            routes = [line.split() for line in f.readlines()[1:]]
+    except OSError:
+        return ""
+    default = [r for r in routes if len(r) > 2 and r[1] == "00000000"]
+    if not default:
+        return ""
+    iface, gateway_hex = default[0][0], default[0][2]
+    gateway = ".".join(str(b) for b in struct.pack("<I", int(gateway_hex, 16)))
+
+    mac = ""
+    try:
+        with open("/proc/net/arp", 'r') as f:
+            for line in f.readlines()[1:]:
+                fields = line.split()
+                if len(fields) > 3 and fields[0] == gateway:
+                    mac = fields[3]
+                    break
+    except OSError:
+        pass
+    return f"{iface}|{gateway}|{mac}"
+
+# --- LOOKUP ---
+def geolocate():
+    """(lat, lon, city) from the IP geolocation service, or None."""
+    import urllib.error
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(GEO_URL, timeout=TIMEOUT) as response:
+            data = json.loads(response.read().decode())
+        return float(data["latitude"]), float(data["longitude"]), data.get("city") or ""
+    except (urllib.error.URLError, OSError, ValueError, KeyError, TypeError):
+        return None
+
+def load():
+    return state_store.read(LOCATION_FILE)
+
+def save(lat, lon, city, source, network):
+    entry = {"latitude": lat, "longitude": lon, "city": city, "source": source,
+             "network": network, "fetched_at": int(time.time())}
+    state_store.write(LOCATION_FILE, entry)
+    return entry
+
+def needs_lookup(cached, network):
+    """True if the cached location should be checked with the IP service."""
+    if not cached:
+        return True
+    # Set by hand (`location.py set`): never expires
+    if cached.get("source") == "manual":
+        return False
+    # Offline: nothing to ask, and most likely we haven't moved
+    if not network:
+        return False
+    return network != cached.get("network") or time.time() - cached.get("fetched_at", 0) >= TTL
+
+def get(override=None, force=False, seed=None, lookup=True):
+    """(lat, lon, city) for the current location, or (None, None, None).
+
+    `override` is a configured (lat, lon, city) and always wins. Otherwise the
+    cached location is reused until it expires (TTL) or the network identity
+    changes; only then is the IP service asked. If that fails we keep the
+    cached location, which is still the best guess. `seed` is a known position
+    to start the cache from (e.g. an older prayer cache) instead of a lookup.
+    With lookup=False this never touches the network (see stale()).
+    """
+    if override:
+        lat, lon, city = override
+        return lat, lon, city
+
+    cached = load()
+    if not cached and seed and seed[0] is not None:
+        cached = save(seed[0], seed[1], seed[2] or "", "seed", network_identity())
+
+    network = network_identity()
+    if cached and not force and (not lookup or not needs_lookup(cached, network)):
+        return cached["latitude"], cached["longitude"], cached.get("city", "")
+
+    found = geolocate() if lookup and (network or force) else None
+    if found:
+        lat, lon, city = found
+        save(lat, lon, city, "ip", network)
+        return lat, lon, city
+    if cached:
+        return cached["latitude"], cached["longitude"], cached.get("city", "")
+    return None, None, None
+
+def qibla(lat, lon, points=16):
+    """Qibla bearing, distance and compass label for (lat, lon), memoized in the location cache.
+
+    Computed once per location: the entry is keyed by the rounded position, so a
+    move (or a different label resolution) recomputes it on the next call.
+    """
+    import qibla as qibla_math
+
+    key = f"{lat:.4f},{lon:.4f},{points}"
+    cached = load()
+    memo = cached.get("qibla") if cached else None
+    if memo and memo.get("key") == key:
+        return memo
+    memo = dict(qibla_math.compute(lat, lon, points), key=key)
+    # Only alongside the position it belongs to (a configured LOCATION may differ from the cache)
+    if cached and not moved(cached["latitude"], cached["longitude"], lat, lon):
+        cached["qibla"] = memo
+        # Derived data: atomic, but not worth an fsync
+        state_store.write(LOCATION_FILE, cached, sync=False)
+    return memo
+
+def stale(override=None, read=state_store.read):
+    """True if get() would ask the IP service (cheap: one small file and /proc).
+
+    `read`: how to read the cache (e.g. a daemon's cache_watch.Snapshots.read).
+    """
+    return not override and needs_lookup(read(LOCATION_FILE), network_identity())
+
+def moved(lat, lon, other_lat, other_lon):
+    """True if the two positions are further apart than MOVED_DEGREES."""
+    return abs(lat - other_lat) > MOVED_DEGREES or abs(lon - other_lon) > MOVED_DEGREES
+
+def stub(port, lat, lon, city):
+    """Serves a fixed ipapi.co-shaped answer on localhost, for tests and offline setups."""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    body = json.dumps({"latitude": lat, "longitude": lon, "city": city}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    print(f"Serving {city} on http://127.0.0.1:{port}/ (set THAWRAH_GEO_URL to use it)")
+    HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: location.py [refresh]   |   location.py set LAT LON [CITY]   |   location.py stub PORT LAT LON CITY
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "set":
+        city = " ".join(sys.argv[4:])
+        save(float(sys.argv[2]), float(sys.argv[3]), city, "manual", network_identity())
+    elif command == "stub":
+        stub(int(sys.argv[2]), float(sys.argv[3]), float(sys.argv[4]), " ".join(sys.argv[5:]))
+        sys.exit(0)
+    lat, lon, city = get(force=command == "refresh")
+    print(f"{city or 'Unknown'}: {lat}, {lon}  (network: {network_identity() or 'offline'})")
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+import mmap
+import os
+import struct
+import sys
+from datetime import date as Date, timedelta
+
+import prayer_engine
+import state_store
+
+# Prayer times for many places over a date range (travel planning), fully offline:
+# N places x D days in one NumPy pass, each place's time zone resolved once.
+# Results go out as CSV, JSON lines or NumPy columns, or into a "places set"
+# that prayer_times.py reads instead of the detected location once one of its
+# places is made active (`prayer_batch.py use NAME`). Reading the set needs no
+# NumPy: like the timetable it is a fixed-layout file read through mmap.
+
+# --- CONFIGURATION ---
+PLACES_FILE = os.path.expanduser("~/.cache/thawrah_places.bin")
+ACTIVE_FILE = os.path.expanduser("~/.cache/thawrah_place.json")
+DAYS = 30  # Default range length
+
+COLUMNS = prayer_engine.PRAYER_NAMES + prayer_engine.NIGHT_NAMES
+
+# --- FILE FORMAT (places set) ---
+# Header (16 bytes): magic, version, method index, asr school index, high-latitude rule index,
+# place count, days, first day (proleptic ordinal)
+# Places: count x (lat, lon, name, IANA zone), NUL-padded strings ("" = system zone)
+# Body: count x days rows of 9 int16 (minutes since local midnight, COLUMNS order)
+MAGIC = b"THWP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBBHHI")
+PLACE = struct.Struct("<ff32s32s")
+ROW = struct.Struct(f"<{len(COLUMNS)}h")
+
+METHOD_NAMES = list(prayer_engine.METHODS)
+SCHOOL_NAMES = list(prayer_engine.ASR_FACTORS)
+
+# --- INPUT ---
+def read_places(path):
+    """[(name, lat, lon, zone)] from lines of "name,lat,lon[,zone]" ("-" = stdin, # comments)."""
+    f = sys.stdin if path == "-" else open(os.path.expanduser(path), 'r')
+    places = []
+    with f:
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            fields = [x.strip() for x in line.split(",")]
+            try:
+                name, lat, lon = fields[0], float(fields[1]), float(fields[2])
+            except (IndexError, ValueError):
+                raise ValueError(f"{path}:{number}: expected name,lat,lon[,zone]")
+            zone = fields[3] if len(fields) > 3 else ""
+            # The places set stores both in fixed 32-byte fields (see PLACE)
+            for label, text in (("name", name), ("zone", zone)):
+                if len(text.encode()) > 32:
+                    raise ValueError(f"{path}:{number}: {label} {text!r} is longer than 32 bytes")
+            places.append((name, lat, lon, zone))
+    if not places:
+        raise ValueError(f"{path}: no places")
+    return places
+
+# --- BATCH ---
+def compute(places, first, days=DAYS, method="MWL", asr="Standard", high_lat="None"):
+    """All times for `places` over `days` days from `first`, in one vectorized pass.
+
+    Returns an int16 array of shape (places, days, 9): minutes since local midnight
+    in each place's zone, COLUMNS order (Imsak/Midnight/Lastthird need the next
+    day's Fajr, so one extra day is computed).
+    """
+    import numpy as np
+
+    lats = np.array([[p[1]] for p in places], dtype=float)
+    lons = np.array([[p[2]] for p in places], dtype=float)
+    # Night times from UT instants, before the conversion (a DST change during the night can't skew them)
+    ut = prayer_engine.with_night(prayer_engine.compute_days(lats, lons, first, days + 1, method, asr, high_lat))
+
+    # Local time: one zone lookup (and one set of DST transitions) per distinct zone
+    minutes = np.empty(ut.shape, dtype=np.int16)
+    by_zone = {}
+    for i, place in enumerate(places):
+        by_zone.setdefault(place[3], []).append(i)
+    for zone, rows in by_zone.items():
+        tzinfo = None
+        if zone:
+            from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+            try:
+                tzinfo = ZoneInfo(zone)
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(f"unknown time zone {zone!r}")
+        minutes[rows] = prayer_engine.local_minutes(ut[rows], first, None, tzinfo)
+    return minutes
+
+def columns(places, first, times):
+    """compute() output as flat columns, one entry per place-day (place-major)."""
+    import numpy as np
+
+    count, days = times.shape[:2]
+    out = {
+        "place": np.repeat(np.array([p[0] for p in places]), days),
+        "date": np.tile(np.datetime64(first.isoformat()) + np.arange(days), count),
+        "latitude": np.repeat(np.array([p[1] for p in places]), days),
+        "longitude": np.repeat(np.array([p[2] for p in places]), days),
+        "timezone": np.repeat(np.array([p[3] for p in places]), days),
+    }
+    for i, name in enumerate(COLUMNS):
+        out[name] = times[:, :, i].reshape(-1)
+    return out
+
+def hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+# --- OUTPUT ---
+def write_csv(out, places, first, times):
+    import csv
+
+    writer = csv.writer(out)
+    writer.writerow(["place", "date", "latitude", "longitude", "timezone"] + COLUMNS)
+    for p, (name, lat, lon, zone) in enumerate(places):
+        for d, row in enumerate(times[p].tolist()):
+            writer.writerow([name, (first + timedelta(days=d)).isoformat(), lat, lon, zone]
+                            + [hhmm(m) for m in row])
+
+def write_jsonl(out, places, first, times):
+    """One object per place-day, with Aladhan-style "timings"."""
+    import json
+
+    for p, (name, lat, lon, zone) in enumerate(places):
+        for d, row in enumerate(times[p].tolist()):
+            out.write(json.dumps({"place": name, "date": (first + timedelta(days=d)).isoformat(),
+                                  "latitude": lat, "longitude": lon, "timezone": zone,
+                                  "timings": {c: hhmm(m) for c, m in zip(COLUMNS, row)}}) + "\n")
+
+def write_npz(path, places, first, times):
+    """NumPy columns (minutes since midnight as int16), see columns()."""
+    import numpy as np
+
+    np.savez(path, **columns(places, first, times))
+
+def save_set(path, places, first, times, method="MWL", asr="Standard", high_lat="None"):
+    """Writes the places set prayer_times.py can switch to, atomically."""
+    count, days = times.shape[:2]
+    data = bytearray(HEADER.pack(MAGIC, VERSION, METHOD_NAMES.index(method), SCHOOL_NAMES.index(asr),
+                                 prayer_engine.HIGH_LAT_RULES.index(high_lat), count, days, first.toordinal()))
+    for name, lat, lon, zone in places:
+        data += PLACE.pack(lat, lon, name.encode(), zone.encode())
+    data += times.astype("<i2").tobytes()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+# --- PLACES SET (read side, no NumPy) ---
+class Places:
+    """Read-only, mmap-backed view of a places set. Lookups are a single unpack_from."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, method, school, high_lat, self.count, self.days, first = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a Thawrah places set")
+        self.method = METHOD_NAMES[method]
+        self.school = SCHOOL_NAMES[school]
+        self.high_lat = prayer_engine.HIGH_LAT_RULES[high_lat]
+        self.first = Date.fromordinal(first)
+        self.body = HEADER.size + self.count * PLACE.size
+
+    def place(self, index):
+        """(name, lat, lon, zone) of place `index`."""
+        lat, lon, name, zone = PLACE.unpack_from(self.buf, HEADER.size + index * PLACE.size)
+        return name.rstrip(b"\0").decode(), lat, lon, zone.rstrip(b"\0").decode()
+
+    def find(self, name):
+        """Index of the place called `name` (case-insensitive), or None."""
+        for i in range(self.count):
+            if self.place(i)[0].lower() == name.lower():
+                return i
+        return None
+
+    def covers(self, day):
+        return 0 <= (day - self.first).days < self.days
+
+    def timings(self, index, day):
+        """Same shape as timetable.Timetable.timings() for place `index` on `day`."""
+        row = ROW.unpack_from(self.buf, self.body + (index * self.days + (day - self.first).days) * ROW.size)
+        return {name: hhmm(m) for name, m in zip(COLUMNS, row)}
+
+def load(path=PLACES_FILE):
+    """Returns a Places set, or None if the file is missing or unreadable."""
+    try:
+        return Places(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def active_place():
+    """(places, index) of the active place, or None to use the detected location."""
+    name = state_store.read(ACTIVE_FILE)
+    if not name:
+        return None
+    places = load()
+    index = places.find(name) if places else None
+    if index is None:
+        return None
+    return places, index
+
+def use(name):
+    """Makes `name` the active place (None: back to the detected location). False if it isn't in the set."""
+    if name:
+        places = load()
+        if not places or places.find(name) is None:
+            return False
+    state_store.write(ACTIVE_FILE, name or "")
+    return True
+
+if __name__ == "__main__":
+    # Usage: prayer_batch.py PLACES_FILE [FROM] [DAYS] [csv|jsonl|npz|set] [OUTPUT]
+    #        prayer_batch.py use NAME|-  |  prayer_batch.py list
+    # PLACES_FILE: lines of "name,lat,lon[,zone]", e.g. "Tromsø,69.65,18.96,Europe/Oslo" ("-" = stdin).
+    # "set" (OUTPUT defaults to PLACES_FILE) is what `use` and prayer_times.py read.
+    import prayer_times
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "use":
+        name = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != "-" else None
+        if not use(name):
+            print(f"{name}: not in {PLACES_FILE}", file=sys.stderr)
+            sys.exit(1)
+        print(f"✅ Active place: {name or 'detected location'}")
+        sys.exit(0)
+    if command == "list":
+        places = load()
+        if not places:
+            print("No places set: run prayer_batch.py PLACES_FILE FROM DAYS set", file=sys.stderr)
+            sys.exit(1)
+        active = state_store.read(ACTIVE_FILE)
+        last = places.first + timedelta(days=places.days - 1)
+        print(f"{places.count} places, {places.first} to {last} · {places.method}, Asr {places.school}, {places.high_lat}")
+        for i in range(places.count):
+            name, lat, lon, zone = places.place(i)
+            mark = "*" if active and name.lower() == active.lower() else " "
+            print(f"{mark} {name:20} {lat:8.4f} {lon:9.4f}  {zone or 'system zone'}")
+        sys.exit(0)
+
+    first = Date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else Date.today()
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else DAYS
+    fmt = sys.argv[4] if len(sys.argv) > 4 else "csv"
+    output = sys.argv[5] if len(sys.argv) > 5 else None
+    method, asr, high_lat = prayer_times.METHOD, prayer_times.ASR_SCHOOL, prayer_times.HIGH_LATITUDE
+    try:
+        places = read_places(command)
+        times = compute(places, first, days, method, asr, high_lat)
+    except (OSError, ValueError) as e:
+        print(f"prayer_batch: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ImportError:
+        print("Batch computation needs NumPy", file=sys.stderr)
+        sys.exit(1)
+
+    if fmt == "set":
+        save_set(os.path.expanduser(output) if output else PLACES_FILE, places, first, times, method, asr, high_lat)
+        print(f"✅ {len(places)} places x {days} days from {first} saved; switch with: prayer_batch.py use NAME")
+    elif fmt == "npz":
+        if not output:
+            print("npz needs an OUTPUT file", file=sys.stderr)
+            sys.exit(1)
+        write_npz(os.path.expanduser(output), places, first, times)
+    else:
+        writer = write_jsonl if fmt == "jsonl" else write_csv
+        if output:
+            with open(os.path.expanduser(output), 'w', newline="") as out:
+                writer(out, places, first, times)
+        else:
+            writer(sys.stdout, places, first, times)
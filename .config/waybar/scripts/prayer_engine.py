@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+import math
+from datetime import date as Date, datetime, timedelta, timezone
+
+# --- CALCULATION METHODS ---
+# Twilight angles in degrees below the horizon. "isha_minutes" means Isha is a
+# fixed interval after Maghrib instead of an angle (Umm al-Qura).
+METHODS = {
+    "MWL": {"fajr": 18.0, "isha": 17.0},         # Muslim World League (Aladhan method 3)
+    "ISNA": {"fajr": 15.0, "isha": 15.0},        # Islamic Society of North America (2)
+    "Makkah": {"fajr": 18.5, "isha_minutes": 90}, # Umm al-Qura University, Makkah (4)
+    "Egypt": {"fajr": 19.5, "isha": 17.5},       # Egyptian General Authority of Survey (5)
+    "Karachi": {"fajr": 18.0, "isha": 18.0},     # University of Islamic Sciences, Karachi (1)
+}
+
+# Aladhan "method" query parameter -> preset name
+ALADHAN_METHODS = {1: "Karachi", 2: "ISNA", 3: "MWL", 4: "Makkah", 5: "Egypt"}
+
+# Shadow length factor for Asr (Aladhan "school" parameter 0 / 1)
+ASR_FACTORS = {"Standard": 1, "Hanafi": 2}
+
+PRAYER_NAMES = ["Fajr", "Sunrise", "Dhuhr", "Asr", "Maghrib", "Isha"]
+
+SUNRISE_ANGLE = 0.833  # Refraction + solar semi-diameter
+
+# High-latitude rules, for nights when the sun never gets as low as the Fajr/Isha
+# angle (or only briefly): Fajr is kept within a portion of the night (sunset to
+# sunrise) before sunrise, and Isha within the same portion after Maghrib.
+#   "None": no rule (the sun's lowest point when the angle is never reached)
+#   "AngleBased": angle/60 of the night, "OneSeventh": 1/7, "NightMiddle": 1/2
+# Beyond the polar circles, on days without a sunrise or sunset, every time falls
+# back to the sun's lowest/highest point: no rule has a night to divide there.
+HIGH_LAT_RULES = ["None", "AngleBased", "OneSeventh", "NightMiddle"]
+# Aladhan "latitudeAdjustmentMethod" query parameter
+ALADHAN_HIGH_LAT = {"NightMiddle": 1, "OneSeventh": 2, "AngleBased": 3}
+
+# Derived from the prayer times (see night_times)
+NIGHT_NAMES = ["Imsak", "Midnight", "Lastthird"]
+IMSAK_MINUTES = 10  # Imsak this long before Fajr (Aladhan's default)
+
+# --- ASTRONOMY ---
+def julian_day(d):
+    """Julian day number at 0h UT for a date (Meeus, chapter 7)."""
+    year, month = d.year, d.month
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + d.day + b - 1524.5
+
+def sun_position(jd):
+    """Returns (declination in degrees, equation of time in hours)."""
+    d = jd - 2451545.0
+    g = math.radians((357.529 + 0.98560028 * d) % 360)
+    q = (280.459 + 0.98564736 * d) % 360
+    l = math.radians((q + 1.915 * math.sin(g) + 0.020 * math.sin(2 * g)) % 360)
+    e = math.radians(23.439 - 0.00000036 * d)
+
+    ra = math.degrees(math.atan2(math.cos(e) * math.sin(l), math.cos(l))) / 15
+    decl = math.degrees(math.asin(math.sin(e) * math.sin(l)))
+    eqt = q / 15 - ra % 24
+    eqt = (eqt + 12) % 24 - 12
+    return decl, eqt
+
+def sun_horizontal(lat, lon, when):
+    """(azimuth, altitude) of the sun in degrees at a UTC datetime; azimuth clockwise from north."""
+    ut = when.hour + when.minute / 60 + when.second / 3600
+    decl, eqt = sun_position(julian_day(when.date()) + ut / 24)
+    lat_r, decl_r = math.radians(lat), math.radians(decl)
+    hour_angle = math.radians(15 * (ut + lon / 15 + eqt - 12))
+
+    altitude = math.asin(math.sin(lat_r) * math.sin(decl_r)
+                         + math.cos(lat_r) * math.cos(decl_r) * math.cos(hour_angle))
+    azimuth = math.atan2(-math.sin(hour_angle),
+                         math.tan(decl_r) * math.cos(lat_r) - math.sin(lat_r) * math.cos(hour_angle))
+    return math.degrees(azimuth) % 360, math.degrees(altitude)
+
+def _hour_angle(angle, lat, decl, clamp=True):
+    """Hours between solar noon and the moment the sun is `angle` degrees below the horizon.
+
+    Where the sun never reaches the angle that day: the sun's lowest/highest point,
+    or NaN with clamp=False (for the high-latitude rules to fill in).
+    """
+    lat_r, decl_r = math.radians(lat), math.radians(decl)
+    cos_h = (-math.sin(math.radians(angle)) - math.sin(lat_r) * math.sin(decl_r)) / (math.cos(lat_r) * math.cos(decl_r))
+    if not -1.0 <= cos_h <= 1.0:
+        if not clamp:
+            return math.nan
+        cos_h = max(-1.0, min(1.0, cos_h))
+    return math.degrees(math.acos(cos_h)) / 15
+
+def _asr_angle(factor, lat, decl):
+    """Sun altitude (as a depression angle) when shadow = factor * length + noon shadow."""
+    return -math.degrees(math.atan(1 / (factor + math.tan(math.radians(abs(lat - decl))))))
+
+def night_portion(rule, angle, night):
+    """Longest Fajr-to-sunrise (or Maghrib-to-Isha) interval a rule allows, in the unit of `night`."""
+    if rule == "AngleBased":
+        return angle / 60 * night
+    if rule == "OneSeventh":
+        return night / 7
+    return night / 2
+
+# --- TIME ZONES ---
+def utc_offset(zone, instant):
+    """Hours east of UTC in `zone` (a tzinfo; None = the system time zone) at an aware datetime."""
+    local = instant.astimezone(zone) if zone else instant.astimezone()
+    return local.utcoffset().total_seconds() / 3600
+
+def zone_transitions(zone, first, last):
+    """(instants, offsets): the UTC offsets of `zone` from date `first` to `last` and when they change.
+
+    instants are Unix seconds, offsets hours, len(offsets) == len(instants) + 1:
+    offsets[i] holds from instants[i - 1] until instants[i]. Found by sampling
+    every UTC midnight and bisecting each change to the second, so any tzinfo
+    works and the DST rules come from the zone itself.
+    """
+    # A couple of days either side: local times can fall on the neighbouring UTC day
+    start = datetime(first.year, first.month, first.day, tzinfo=timezone.utc) - timedelta(days=2)
+    samples = [start + timedelta(days=i) for i in range((last - first).days + 5)]
+    offsets = [utc_offset(zone, t) for t in samples]
+    instants, changes = [], [offsets[0]]
+    for i in range(1, len(samples)):
+        if offsets[i] == offsets[i - 1]:
+            continue
+        lo, hi = int(samples[i - 1].timestamp()), int(samples[i].timestamp())
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if utc_offset(zone, datetime.fromtimestamp(mid, timezone.utc)) == offsets[i - 1]:
+                lo = mid
+            else:
+                hi = mid
+        instants.append(hi)
+        changes.append(offsets[i])
+    return instants, changes
+
+# --- PRAYER TIMES ---
+def compute_times(lat, lon, day=None, tz_offset=0.0, method="MWL", asr="Standard", high_lat="None", zone=None):
+    """Prayer times for one day as decimal local hours, keyed by PRAYER_NAMES.
+
+    tz_offset: fixed UTC offset in hours. With tz_offset=None each time gets the
+    offset `zone` (None = system time zone) has at that instant, so days on which
+    DST starts or ends come out right. high_lat: one of HIGH_LAT_RULES.
+    """
+    day = day or Date.today()
+    return to_local(compute_ut(lat, lon, day, method, asr, high_lat), day, tz_offset, zone)
+
+def compute_ut(lat, lon, day, method="MWL", asr="Standard", high_lat="None"):
+    """Prayer times for one day as UT hours from `day`'s UTC midnight, keyed by PRAYER_NAMES."""
+    params = METHODS[method]
+    factor = ASR_FACTORS[asr]
+    jd = julian_day(day) - lon / (15 * 24)
+    clamp = high_lat == "None"
+
+    # Initial guesses, refined by re-evaluating the sun position at each event
+    times = {"Fajr": 5, "Sunrise": 6, "Dhuhr": 12, "Asr": 13, "Maghrib": 18, "Isha": 18}
+    for _ in range(2):
+        def at(hour):
+            return sun_position(jd + hour / 24)
+
+        decl, eqt = at(times["Dhuhr"])
+        noon = 12 - eqt
+        decl, _ = at(times["Fajr"])
+        fajr = noon - _hour_angle(params["fajr"], lat, decl, clamp)
+        decl, _ = at(times["Sunrise"])
+        sunrise = noon - _hour_angle(SUNRISE_ANGLE, lat, decl)
+        decl, _ = at(times["Asr"])
+        asr_t = noon + _hour_angle(_asr_angle(factor, lat, decl), lat, decl)
+        decl, _ = at(times["Maghrib"])
+        maghrib = noon + _hour_angle(SUNRISE_ANGLE, lat, decl)
+        if "isha_minutes" in params:
+            isha = maghrib + params["isha_minutes"] / 60
+        else:
+            decl, _ = at(times["Isha"])
+            isha = noon + _hour_angle(params["isha"], lat, decl, clamp)
+        if not clamp:
+            night = 24 - (maghrib - sunrise)
+            portion = night_portion(high_lat, params["fajr"], night)
+            if math.isnan(fajr) or sunrise - fajr > portion:
+                fajr = sunrise - portion
+            if "isha" in params:
+                portion = night_portion(high_lat, params["isha"], night)
+                if math.isnan(isha) or isha - maghrib > portion:
+                    isha = maghrib + portion
+        times = {"Fajr": fajr, "Sunrise": sunrise, "Dhuhr": noon, "Asr": asr_t, "Maghrib": maghrib, "Isha": isha}
+
+    return {name: t - lon / 15 for name, t in times.items()}
+
+def to_local(ut_times, day, tz_offset=0.0, zone=None):
+    """{name: UT hours from `day`'s UTC midnight} -> {name: decimal local hours}. Offsets as for compute_times."""
+    if tz_offset is not None:
+        return {name: ut + tz_offset for name, ut in ut_times.items()}
+    midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return {name: ut + utc_offset(zone, midnight + timedelta(hours=ut)) for name, ut in ut_times.items()}
+
+def night_times(fajr, maghrib, next_fajr):
+    """(Imsak, Midnight, Lastthird) in UT hours, from the UT hours of Fajr, Maghrib and the next day's Fajr.
+
+    The night runs from Maghrib to the next day's Fajr; Lastthird is when its last
+    third begins. It is measured in UT, so a DST change during the night doesn't
+    stretch or shrink it: convert the results to local time like the prayers
+    (Midnight and Lastthird may be past 24, i.e. on the next date). Plain
+    arithmetic, so it works on floats and on NumPy arrays alike.
+    """
+    night = next_fajr + 24 - maghrib
+    return fajr - IMSAK_MINUTES / 60, maghrib + night / 2, maghrib + 2 * night / 3
+
+def format_time(hours):
+    """Decimal hours -> "HH:MM", rounded to the nearest minute."""
+    minutes = int(math.floor(hours * 60 + 0.5)) % 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def get_timings(lat, lon, day=None, tz_offset=0.0, method="MWL", asr="Standard", high_lat="None", zone=None):
+    """Same shape as Aladhan's data['timings'] (e.g. {"Fajr": "05:12", ...}). Arguments as for compute_times."""
+    day = day or Date.today()
+    ut = compute_ut(float(lat), float(lon), day, method, asr, high_lat)
+    tomorrow = Date.fromordinal(day.toordinal() + 1)
+    next_fajr = compute_ut(float(lat), float(lon), tomorrow, method, asr, high_lat)["Fajr"]
+    ut.update(zip(NIGHT_NAMES, night_times(ut["Fajr"], ut["Maghrib"], next_fajr)))
+    return {name: format_time(t) for name, t in to_local(ut, day, tz_offset, zone).items()}
+
+# --- WHOLE-YEAR (VECTORIZED) ---
+def compute_days(lat, lon, first, days, method="MWL", asr="Standard", high_lat="None"):
+    """UT hours of PRAYER_NAMES for `days` days from `first`, in one NumPy pass.
+
+    lat/lon are scalars, or arrays of shape (N, 1) for N locations at once.
+    Returns a float array of shape (days, 6), or (N, days, 6).
+    """
+    import numpy as np
+
+    params = METHODS[method]
+    factor = ASR_FACTORS[asr]
+    lon = np.asarray(lon, dtype=float)
+    jd = julian_day(first) + np.arange(days) - lon / (15 * 24)
+    lat_r = np.radians(lat)
+    clamp = high_lat == "None"
+
+    def sun(hours):
+        d = jd + hours / 24 - 2451545.0
+        g = np.radians((357.529 + 0.98560028 * d) % 360)
+        q = (280.459 + 0.98564736 * d) % 360
+        l = np.radians((q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g)) % 360)
+        e = np.radians(23.439 - 0.00000036 * d)
+        ra = np.degrees(np.arctan2(np.cos(e) * np.sin(l), np.cos(l))) / 15
+        decl = np.arcsin(np.sin(e) * np.sin(l))
+        eqt = (q / 15 - ra % 24 + 12) % 24 - 12
+        return decl, eqt
+
+    def hour_angle(angle, decl, clamp=True):
+        cos_h = (-np.sin(np.radians(angle)) - np.sin(lat_r) * np.sin(decl)) / (np.cos(lat_r) * np.cos(decl))
+        if not clamp:
+            # NaN where the sun never reaches the angle
+            cos_h = np.where(np.abs(cos_h) <= 1.0, cos_h, np.nan)
+        return np.degrees(np.arccos(np.clip(cos_h, -1.0, 1.0))) / 15
+
+    full = np.ones(jd.shape)
+    fajr, sunrise, noon, asr_t, maghrib, isha = 5 * full, 6 * full, 12 * full, 13 * full, 18 * full, 18 * full
+    for _ in range(2):
+        _, eqt = sun(noon)
+        noon = 12 - eqt
+        fajr = noon - hour_angle(params["fajr"], sun(fajr)[0], clamp)
+        sunrise = noon - hour_angle(SUNRISE_ANGLE, sun(sunrise)[0])
+        decl = sun(asr_t)[0]
+        asr_angle = -np.degrees(np.arctan(1 / (factor + np.tan(np.abs(lat_r - decl)))))
+        asr_t = noon + hour_angle(asr_angle, decl)
+        maghrib = noon + hour_angle(SUNRISE_ANGLE, sun(maghrib)[0])
+        if "isha_minutes" in params:
+            isha = maghrib + params["isha_minutes"] / 60
+        else:
+            isha = noon + hour_angle(params["isha"], sun(isha)[0], clamp)
+        if not clamp:
+            night = 24 - (maghrib - sunrise)
+            portion = night_portion(high_lat, params["fajr"], night)
+            fajr = np.where(np.isnan(fajr) | (sunrise - fajr > portion), sunrise - portion, fajr)
+            if "isha" in params:
+                portion = night_portion(high_lat, params["isha"], night)
+                isha = np.where(np.isnan(isha) | (isha - maghrib > portion), maghrib + portion, isha)
+
+    return np.stack([fajr, sunrise, noon, asr_t, maghrib, isha], axis=-1) - lon[..., None] / 15
+
+def with_night(ut_hours):
+    """compute_days() output for days + 1 days -> UT hours of PRAYER_NAMES + NIGHT_NAMES for the first `days`.
+
+    Shape (..., days + 1, 6) -> (..., days, 9): each night ends with the next day's Fajr.
+    """
+    import numpy as np
+
+    today = ut_hours[..., :-1, :]
+    night = night_times(today[..., 0], today[..., 4], ut_hours[..., 1:, 0])
+    return np.concatenate([today, np.stack(night, axis=-1)], axis=-1)
+
+def local_minutes(ut_hours, first, tz_offsets=None, zone=None, transitions=None):
+    """compute_days() output -> int16 minutes since local midnight, same shape.
+
+    tz_offsets: UTC offset in hours per day (sequence of len days, or a scalar).
+    None: each time gets the offset `zone` (a tzinfo; None = system time zone) has
+    at that instant, so DST changes land exactly. `transitions` (from
+    zone_transitions) saves looking them up again for another batch in the zone.
+    """
+    import numpy as np
+
+    days = ut_hours.shape[-2]
+    if tz_offsets is not None:
+        hours = ut_hours + np.reshape(np.asarray(tz_offsets, dtype=float), (-1, 1))
+    else:
+        # UT hours -> Unix seconds, then each time's offset from the zone's transitions
+        instants, offsets = transitions or zone_transitions(zone, first, first + timedelta(days=days - 1))
+        unix = (julian_day(first) - 2440587.5 + np.arange(days)[:, None]) * 86400 + ut_hours * 3600
+        hours = ut_hours + np.asarray(offsets)[np.searchsorted(instants, unix, side="right")]
+    return (np.floor(hours * 60 + 0.5) % 1440).astype(np.int16)
+
+def compute_year(lat, lon, year, tz_offsets=None, method="MWL", asr="Standard", high_lat="None", zone=None,
+                 night=False):
+    """All days of `year` in one NumPy pass.
+
+    tz_offsets/zone: as for local_minutes. high_lat: one of HIGH_LAT_RULES.
+    Returns an int16 array of shape (days, 6): minutes since local midnight, PRAYER_NAMES order;
+    with night=True, (days, 9) with NIGHT_NAMES after them.
+    """
+    first = Date(year, 1, 1)
+    days = (Date(year + 1, 1, 1) - first).days
+    if night:
+        ut = with_night(compute_days(lat, lon, first, days + 1, method, asr, high_lat))
+    else:
+        ut = compute_days(lat, lon, first, days, method, asr, high_lat)
+    return local_minutes(ut, first, tz_offsets, zone)
+
+def check_dst_nights():
+    """Self-check (`prayer_engine.py --check`): on the nights the clocks change, Midnight and
+    Lastthird are a half and two thirds of the real night. Returns a list of failures."""
+    from zoneinfo import ZoneInfo
+
+    zone = ZoneInfo("Europe/London")
+    lat, lon = 51.5074, -0.1278
+    failures = []
+
+    def elapsed(day, start, end):
+        """Real minutes between two "HH:MM" wall times in `zone`, `end` on the night after `day`."""
+        times = []
+        for hhmm, d in ((start, day), (end, day + timedelta(days=1))):
+            hour, minute = (int(x) for x in hhmm.split(":"))
+            # Evening times before noon are past midnight
+            if d == day and hour < 12:
+                d += timedelta(days=1)
+            times.append(datetime(d.year, d.month, d.day, hour, minute, tzinfo=zone).timestamp())
+        return (times[1] - times[0]) / 60
+
+    # Spring forward (the night loses an hour) and fall back (it gains one)
+    for day in (Date(2025, 3, 29), Date(2025, 10, 25)):
+        tonight = get_timings(lat, lon, day, None, zone=zone)
+        tomorrow = get_timings(lat, lon, day + timedelta(days=1), None, zone=zone)
+        night = elapsed(day, tonight["Maghrib"], tomorrow["Fajr"])
+        for name, fraction in (("Midnight", 1 / 2), ("Lastthird", 2 / 3)):
+            # Each time is rounded to the minute: allow two
+            got = night - elapsed(day, tonight[name], tomorrow["Fajr"])
+            if abs(got - fraction * night) > 2:
+                failures.append(f"{day} {name} {tonight[name]}: {got:.0f} min after Maghrib, "
+                                f"expected {fraction * night:.0f}")
+    try:
+        table = compute_year(lat, lon, 2025, None, zone=zone, night=True)
+    except ImportError:
+        return failures
+    for day in (Date(2025, 3, 29), Date(2025, 10, 25)):
+        row = table[day.timetuple().tm_yday - 1]
+        expected = get_timings(lat, lon, day, None, zone=zone)
+        for i, name in enumerate(PRAYER_NAMES + NIGHT_NAMES):
+            got = f"{row[i] // 60:02d}:{row[i] % 60:02d}"
+            if got != expected[name]:
+                failures.append(f"{day} {name}: compute_year {got}, get_timings {expected[name]}")
+    return failures
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["--check"]:
+        failures = check_dst_nights()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print("DST nights: " + ("FAIL" if failures else "ok"))
+        sys.exit(1 if failures else 0)
+
+    # Usage: prayer_engine.py LAT LON [METHOD] [ASR] [HIGH_LAT_RULE] [ZONE] | --check
+    # e.g. prayer_engine.py 69.65 18.96 MWL Standard AngleBased Europe/Oslo
+    lat, lon = float(sys.argv[1]), float(sys.argv[2])
+    method = sys.argv[3] if len(sys.argv) > 3 else "MWL"
+    asr = sys.argv[4] if len(sys.argv) > 4 else "Standard"
+    high_lat = sys.argv[5] if len(sys.argv) > 5 else "None"
+    zone = None
+    if len(sys.argv) > 6:
+        from zoneinfo import ZoneInfo
+        zone = ZoneInfo(sys.argv[6])
+    for name, t in get_timings(lat, lon, None, None, method, asr, high_lat, zone).items():
+        print(f"{name}: {t}")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+import json
+import os
+import sys
+import time
+from datetime import date as Date
+
+import location
+import prayer_engine
+import state_store
+import timetable
+
+# Background refresh for prayer_times.py (stale-while-revalidate): the bar always
+# answers from the cached location and timetable, and when those are stale it
+# starts this script detached. Network work happens here, in one asyncio run:
+# re-geolocation and, with TIMES_SOURCE = "aladhan", the month calendar from Aladhan
+# written into the timetable. asyncio is imported lazily: the checks the bar
+# calls on every tick (due(), start()) must stay cheap.
+
+# --- CONFIGURATION ---
+STATE_FILE = os.path.expanduser("~/.cache/thawrah_refresh.json")
+LOCK_FILE = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "thawrah_refresh.lock")
+# Override with THAWRAH_ALADHAN_URL (e.g. a local stub for tests)
+ALADHAN_URL = os.environ.get("THAWRAH_ALADHAN_URL", "https://api.aladhan.com/v1")
+MONTHS = 2               # Current month and the next one
+RETRIES = 3              # Attempts per request
+BACKOFF = 1.0            # Seconds before the first retry, doubled after each failure (+ jitter)
+TIMEOUT = 10             # Per request
+BREAKER_FAILURES = 3     # Failed refreshes in a row before the circuit breaker opens...
+BREAKER_COOLDOWN = 1800  # ...and refreshes are skipped for this long
+
+ALADHAN_IDS = {name: n for n, name in prayer_engine.ALADHAN_METHODS.items()}
+
+class RefreshError(Exception):
+    pass
+
+# --- HTTP (asyncio streams, keep-alive) ---
+class Connection:
+    """One keep-alive HTTP/1.1 connection. Requests on it run one after another."""
+
+    def __init__(self, scheme, host, port):
+        import asyncio
+
+        self.scheme, self.host, self.port = scheme, host, port
+        self.reader = self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def open(self):
+        import asyncio
+
+        context = None
+        if self.scheme == "https":
+            import ssl
+            context = ssl.create_default_context()
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def get(self, target, timeout=None):
+        """(status, body) for GET `target`, reusing the open connection when there is one.
+
+        `timeout` starts once the request has the connection, not while it waits its turn.
+        """
+        import asyncio
+
+        async with self.lock:
+            try:
+                return await asyncio.wait_for(self.exchange(target), timeout)
+            except BaseException:
+                # Timed out or broken midway: the stream is in an unknown state. Only this
+                # request was using it (we hold the lock); the next one opens a fresh one
+                self.close()
+                raise
+
+    async def exchange(self, target):
+        import asyncio
+
+        reused = self.writer is not None
+        if not reused:
+            await self.open()
+        try:
+            return await self.request(target)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+        # The server closed the idle connection since our last request: once more on a fresh one
+        await self.open()
+        return await self.request(target)
+
+    async def request(self, target):
+        self.writer.write((f"GET {target} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Accept: application/json\r\nUser-Agent: thawrah\r\n"
+                           f"Connection: keep-alive\r\n\r\n").encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""): break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers up to the closing blank line
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""): pass
+                    break
+                body += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            self.close()
+
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, bytes(body)
+
+class Pool:
+    """One pooled connection per (scheme, host, port)."""
+
+    def __init__(self):
+        self.connections = {}
+
+    def connection(self, url):
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        if key not in self.connections:
+            self.connections[key] = Connection(*key)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        return self.connections[key], target
+
+    async def fetch_json(self, url):
+        """GET `url` as JSON, with RETRIES attempts and exponential backoff."""
+        import asyncio
+        import random
+
+        conn, target = self.connection(url)
+        delay = BACKOFF
+        error = None
+        for attempt in range(RETRIES):
+            try:
+                status, body = await conn.get(target, TIMEOUT)
+                if status == 200:
+                    return json.loads(body)
+                error = f"HTTP {status}"
+                # Client errors won't get better by asking again
+                if 400 <= status < 500 and status != 429:
+                    break
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                # (conn.get has already dropped the stream it was using)
+                error = e
+            if attempt < RETRIES - 1:
+                await asyncio.sleep(delay * (1 + random.random() / 2))
+                delay *= 2
+        raise RefreshError(f"{url}: {error}")
+
+    def close(self):
+        for conn in self.connections.values():
+            conn.close()
+
+# --- CIRCUIT BREAKER ---
+class CircuitBreaker:
+    """Skips refreshes for BREAKER_COOLDOWN after BREAKER_FAILURES failed ones in a row.
+
+    State lives in STATE_FILE, since every refresh is a new process. After the
+    cooldown one trial refresh is let through; if it fails the breaker reopens.
+    """
+
+    def __init__(self, state):
+        self.state = state
+
+    def allow(self):
+        return time.time() >= self.state.get("open_until", 0)
+
+    def success(self):
+        self.state["failures"] = 0
+        self.state["open_until"] = 0
+
+    def failure(self):
+        self.state["failures"] = self.state.get("failures", 0) + 1
+        if self.state["failures"] >= BREAKER_FAILURES:
+            self.state["open_until"] = time.time() + BREAKER_COOLDOWN
+
+# --- ALADHAN CALENDAR ---
+def months_from(today, count=MONTHS):
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def calendar_url(lat, lon, year, month, method, school, high_lat="None", zone=""):
+    from urllib.parse import urlencode
+
+    params = {"latitude": f"{lat:.4f}", "longitude": f"{lon:.4f}", "method": ALADHAN_IDS[method],
+              "school": 1 if school == "Hanafi" else 0}
+    # Same rule and zone as the timetable the rows are written into (Aladhan otherwise guesses the zone)
+    if high_lat in prayer_engine.ALADHAN_HIGH_LAT:
+        params["latitudeAdjustmentMethod"] = prayer_engine.ALADHAN_HIGH_LAT[high_lat]
+    if zone:
+        params["timezonestring"] = zone
+    return f"{ALADHAN_URL}/calendar/{year}/{month}?{urlencode(params)}"
+
+def parse_calendar(payload):
+    """Aladhan calendar response -> {date: (6 minutes since midnight, PRAYER_NAMES order)}."""
+    rows = {}
+    for entry in payload["data"]:
+        d, m, y = (int(x) for x in entry["date"]["gregorian"]["date"].split("-"))
+        minutes = []
+        for name in prayer_engine.PRAYER_NAMES:
+            # Values look like "05:12 (BST)"
+            hour, minute = entry["timings"][name][:5].split(":")
+            minutes.append(int(hour) * 60 + int(minute))
+        rows[Date(y, m, d)] = tuple(minutes)
+    return rows
+
+def table_key(table):
+    return f"{table.lat:.3f},{table.lon:.3f},{table.method},{table.school},{table.high_lat},{table.zone},{table.year}"
+
+def patched_months(state, table, path=timetable.TIMETABLE_FILE):
+    """Months already written into the current timetable file (rebuilding it drops them)."""
+    patched = state.get("patched", {})
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return set()
+    if patched.get("key") != table_key(table) or patched.get("mtime") != mtime:
+        return set()
+    return {tuple(m) for m in patched.get("months", [])}
+
+# --- REFRESH ---
+def due(today, source="engine", override=None, read=state_store.read, load_table=timetable.load):
+    """True if a background refresh has something to do (cheap: small files and /proc only).
+
+    A daemon passes `read` and `load_table` backed by cache_watch, so that checking
+    every minute reads nothing until one of the files changes.
+    """
+    state = read(STATE_FILE, {})
+    # While the circuit breaker is open, a refresh would only exit again: don't start one
+    if not CircuitBreaker(state).allow():
+        return False
+    if location.stale(override, read):
+        return True
+    if source != "aladhan":
+        return False
+    table = load_table()
+    if not table or not table.covers(today):
+        return False  # prayer_times rebuilds it first
+    wanted = {m for m in months_from(today) if m[0] == table.year}
+    return not wanted <= patched_months(state, table)
+
+async def refresh(state, today, source, override, method, school):
+    import asyncio
+
+    pool = Pool()
+    try:
+        # 1. Location first: the calendar is for wherever we are now
+        if location.stale(override):
+            data = await pool.fetch_json(location.GEO_URL)
+            location.save(float(data["latitude"]), float(data["longitude"]), data.get("city") or "",
+                          "ip", location.network_identity())
+
+        # 2. Calendar months, requested together; requests to one host share its keep-alive connection
+        table = timetable.load()
+        lat, lon, _ = location.get(override, lookup=False)
+        if source != "aladhan" or not table or lat is None or location.moved(table.lat, table.lon, lat, lon):
+            return
+        done = patched_months(state, table)
+        months = [m for m in months_from(today) if m[0] == table.year and m not in done]
+        if not months:
+            return
+        payloads = await asyncio.gather(*(pool.fetch_json(calendar_url(table.lat, table.lon, y, m, method, school,
+                                                                  table.high_lat, table.zone))
+                                          for y, m in months))
+        rows = {}
+        for payload in payloads:
+            rows.update(parse_calendar(payload))
+        timetable.patch(timetable.TIMETABLE_FILE, rows)
+        state["patched"] = {"key": table_key(table), "mtime": os.stat(timetable.TIMETABLE_FILE).st_mtime_ns,
+                            "months": sorted(done | set(months))}
+    finally:
+        pool.close()
+
+def run(today=None):
+    """One refresh, unless another one is running or the circuit breaker is open. Returns True on success."""
+    import asyncio
+    import fcntl
+    import prayer_times
+
+    with open(LOCK_FILE, 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+
+        state = state_store.read(STATE_FILE, {})
+        breaker = CircuitBreaker(state)
+        if not breaker.allow():
+            return False
+        try:
+            asyncio.run(refresh(state, today or Date.today(), prayer_times.TIMES_SOURCE,
+                                prayer_times.LOCATION, prayer_times.METHOD, prayer_times.ASR_SCHOOL))
+            breaker.success()
+            ok = True
+        except (RefreshError, OSError, ValueError, KeyError, TypeError) as e:
+            breaker.failure()
+            state["last_error"] = str(e)
+            ok = False
+        state["last_run"] = int(time.time())
+        state_store.write(STATE_FILE, state)
+        return ok
+
+def start():
+    """Runs a refresh in a detached process, so the caller (a Waybar tick) never waits on the network."""
+    import subprocess
+
+    subprocess.Popen([sys.executable, os.path.abspath(__file__)],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+if __name__ == "__main__":
+    # Usage: prayer_refresh.py   (normally started by prayer_times.py)
+    sys.exit(0 if run() else 1)
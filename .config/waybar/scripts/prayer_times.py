@@ -1,216 +1,418 @@
 #!/usr/bin/env python3
 import json
-import time
-import math
 import os
-import subprocess
-import urllib.request
-import urllib.error
+import sys
 from datetime import datetime, timedelta
 
+import location
+import state_store
+
+# Runs on every Waybar tick, and salah_guard/qibla_compass import it for load_days: every
+# other module (timetable, places, Hijri dates, Ramadan, refresh, network, notifications)
+# is imported in the function that uses it. Check with bench_startup.py.
+
 # --- CONFIGURATION ---
 CACHE_FILE = os.path.expanduser("~/.cache/thawrah_prayers.json")
+TIMETABLE_FILE = os.path.expanduser("~/.cache/thawrah_timetable.bin")  # timetable.TIMETABLE_FILE
 STATE_FILE = "/tmp/thawrah_prayer_state"
-ADHAN_FILE = os.path.expanduser("~/.config/waybar/scripts/adhan.mp3")
+METHOD = "MWL"       # MWL, ISNA, Makkah, Egypt, Karachi (see prayer_engine.METHODS)
+ASR_SCHOOL = "Standard"  # Standard or Hanafi
+# Where Fajr/Isha angles are reached late or never (summer above ~48°N): "AngleBased",
+# "OneSeventh", "NightMiddle" or "None" (see prayer_engine.HIGH_LAT_RULES)
+HIGH_LATITUDE = "AngleBased"
+# IANA time zone the times are for, e.g. "Europe/Oslo". None = the system time zone
+TIMEZONE = None
+# Fixed location, e.g. (21.4225, 39.8262, "Makkah"). None = detect (cached, see location.py)
+LOCATION = None
+QIBLA_POINTS = 16  # Compass label resolution: 16 (e.g. "ESE") or 32 (e.g. "SEbE")
+# "engine": computed locally. "aladhan": the local timetable, with this and next month's
+# times replaced by Aladhan's calendar (fetched in the background, see prayer_refresh.py)
+TIMES_SOURCE = "engine"
+PRELOAD_SECONDS = 120  # Daemon: load the Adhan into the resident player this long before a prayer
+
+PRAYERS = ['Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']
 
 # --- UTILS ---
 def send_notification(title, message):
+    import subprocess
+
     # Added -t 900000 (15 mins)
     subprocess.run(["notify-send", "-u", "critical", "-t", "900000", title, message])
 
-def play_adhan():
-    if os.path.exists(ADHAN_FILE):
-        subprocess.Popen(["mpv", "--no-terminal", "--volume=15", ADHAN_FILE])
+def play_adhan(prayer=None, player=None):
+    """Plays the Adhan on the resident player (adhan_player.py), or a one-off mpv if there is none."""
+    import adhan_player
 
-def get_location():
-    """Detects location via IP address."""
-    try:
-        with urllib.request.urlopen("https://ipapi.co/json/", timeout=5) as url:
-            data = json.loads(url.read().decode())
-            return data['latitude'], data['longitude'], data['city']
-    except:
-        return None, None, None
-
-def get_qibla(lat, lon):
-    # KAABA Coordinates (Fixed)
-    kaaba_lat = 21.4225
-    kaaba_lon = 39.8262
-
-    # Convert all to radians
-    lat_rad = math.radians(float(lat))
-    lon_rad = math.radians(float(lon))
-    k_lat_rad = math.radians(kaaba_lat)
-    k_lon_rad = math.radians(kaaba_lon)
-
-    # The "Great Circle" Formula
-    lon_delta = k_lon_rad - lon_rad
-    y = math.sin(lon_delta) * math.cos(k_lat_rad)
-    x = math.cos(lat_rad) * math.sin(k_lat_rad) - math.sin(lat_rad) * math.cos(k_lat_rad) * math.cos(lon_delta)
-    
-    # Calculate Angle and convert to Degrees
-    angle = math.degrees(math.atan2(y, x))
-    
-    # Normalize to 0-360 degrees
-    qibla_deg = (angle + 360) % 360
-    
-    # Convert degrees to text (e.g., "South-East")
-    directions = ["N", "NE", "E", "SE", "S", "SW", "W", "NW", "N"]
-    index = int(round(qibla_deg / 45))
-    direction_text = directions[index]
-
-    return int(qibla_deg), direction_text
-
-def fetch_times_online(lat, lon):
-    """Fetches prayer times from Aladhan API."""
     try:
-        # Method 3 = Muslim World League. Change 'method' param if needed.
-        api_url = f"http://api.aladhan.com/v1/timings/{int(time.time())}?latitude={lat}&longitude={lon}&method=3"
-        with urllib.request.urlopen(api_url, timeout=5) as url:
-            data = json.loads(url.read().decode())
-            return data['data'] # Contains 'timings' and 'date'
-    except:
+        (player or adhan_player.Player(spawn=False)).play(prayer)
+        return
+    except adhan_player.PlayerError:
+        pass
+
+    import subprocess
+
+    path = adhan_player.adhan_file(prayer)
+    if os.path.exists(path):
+        subprocess.Popen(["mpv", "--no-terminal", f"--volume={adhan_player.VOLUME}", path])
+
+def compute_times_offline(lat, lon, day):
+    """Computes a day's prayer times locally (no network), in Aladhan's response shape."""
+    import prayer_engine
+
+    timings = prayer_engine.get_timings(lat, lon, day, None, METHOD, ASR_SCHOOL, HIGH_LATITUDE, zone())
+    return {
+        "timings": timings,
+        "date": {"gregorian": {"date": day.strftime("%d-%m-%Y")}},
+        "meta": {"latitude": lat, "longitude": lon, "method": METHOD, "school": ASR_SCHOOL}
+    }
+
+def zone(name=None):
+    """tzinfo for `name` (default TIMEZONE), or None for the system time zone."""
+    import timetable
+
+    name = name or TIMEZONE
+    if not name or name == timetable.system_zone():
         return None
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(name)
 
 def load_cache():
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return None
-    return None
+    return state_store.read(CACHE_FILE)
 
 def save_cache(data):
-    # Create dir if not exists
-    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-    with open(CACHE_FILE, 'w') as f:
-        json.dump(data, f)
+    # Unchanged (every reload without a valid timetable recomputes the same day): no write
+    if load_cache() != data:
+        state_store.write(CACHE_FILE, data)
+
+def load_timetable(today):
+    """Returns this year's precomputed timetable, or None if it is missing or outdated."""
+    import timetable
+
+    table = timetable.load(TIMETABLE_FILE)
+    if (table and table.covers(today) and table.method == METHOD and table.school == ASR_SCHOOL
+            and table.high_lat == HIGH_LATITUDE and table.zone == (TIMEZONE or timetable.system_zone())):
+        return table
+    return None
+
+def build_timetable(lat, lon, today):
+    """Precomputes the whole year. Returns None if NumPy is unavailable."""
+    import timetable
+
+    try:
+        timetable.build(TIMETABLE_FILE, float(lat), float(lon), today.year, METHOD, ASR_SCHOOL, HIGH_LATITUDE, TIMEZONE)
+    except ImportError:
+        return None
+    return load_timetable(today)
 
 # --- MAIN LOGIC ---
-def main():
-    # 1. Try to load today's cache first
+def local_date(now, tz=None):
+    """The date at `now` (an aware datetime) in `tz`, None = the system time zone."""
+    return now.astimezone(tz).date() if tz else now.date()
+
+def around(day):
+    """The day before, the day itself and the day after."""
+    return [day - timedelta(days=1), day, day + timedelta(days=1)]
+
+def load_days(now):
+    """Returns (days, lat, lon, location_name, tz) for the days around `now`.
+
+    days: {date: timings} for yesterday, today and tomorrow as dated in `tz`, the zone
+    the times are in (None = the system's); whichever are available, empty if we
+    have nothing. Today is local_date(now, tz), which for a place far from the system
+    zone need not be the system's date.
+    """
+    import prayer_batch
+
+    # 0. A place made active from the precomputed set (prayer_batch.py use NAME) wins over detection
+    place = prayer_batch.active_place()
+    if place:
+        places, index = place
+        name, lat, lon, place_zone = places.place(index)
+        tz = zone(place_zone) if place_zone else None
+        days = {d: places.timings(index, d) for d in around(local_date(now, tz)) if places.covers(d)}
+        if local_date(now, tz) in days:
+            return days, lat, lon, name, tz
+
+    tz = zone()
+    today = local_date(now, tz)
     cached_data = load_cache()
-    today_str = datetime.now().strftime("%d-%m-%Y")
-    
-    current_times = None
-    location_name = "Unknown"
-    
-    # Variables to hold coordinates for Qibla
-    lat = None
-    lon = None
-
-    # Check if cache is valid for TODAY
-    if cached_data and cached_data.get('date', {}).get('gregorian', {}).get('date') == today_str:
-        current_times = cached_data['timings']
-        location_name = cached_data.get('meta', {}).get('timezone', 'Cached')
-        # Extract lat/lon from cache so we can still calc Qibla offline
-        lat = cached_data.get('meta', {}).get('latitude')
-        lon = cached_data.get('meta', {}).get('longitude')
-    else:
-        # Cache is old or missing -> Fetch from Internet
-        lat, lon, city = get_location()
-        if lat and lon:
-            fetched_data = fetch_times_online(lat, lon)
-            if fetched_data:
-                current_times = fetched_data['timings']
-                # Inject date into data structure for cache validation
-                fetched_data['date']['gregorian']['date'] = today_str 
-                save_cache(fetched_data)
-                location_name = city
-        
-        # If internet failed and we have NO cache, use old cache as fallback
-        if not current_times and cached_data:
-            current_times = cached_data['timings']
-            location_name = "Offline"
-            lat = cached_data.get('meta', {}).get('latitude')
-            lon = cached_data.get('meta', {}).get('longitude')
+    meta = cached_data.get('meta', {}) if cached_data else {}
 
-    # If everything failed (No net, no cache)
-    if not current_times:
-        print(json.dumps({"text": "🚫 No Net", "tooltip": "Connect to internet to fetch prayer times", "class": "error"}))
-        return
+    # Where are we? Always the cached answer: re-geolocating (when the network changed or
+    # the TTL ran out) happens in prayer_refresh, after this tick's output is out
+    seed = (meta.get('latitude'), meta.get('longitude'), meta.get('city'))
+    lat, lon, city = location.get(LOCATION, seed=seed, lookup=False)
+
+    days = {}
+    location_name = city or meta.get('timezone', 'Cached')
 
-    # 2. Calculate Next Prayer
-    # API returns strings like "18:45". We need to compare them.
-    timings = {k: v for k, v in current_times.items() if k in ['Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']}
-    
-    now = datetime.now()
-    min_diff_minutes = 9999
-    next_prayer_name = None
-    
-    # Sort prayers by time
+    # 1. Try this year's precomputed timetable first (a single mmap read per day, no JSON parse)
+    table = load_timetable(today)
+    if table and (lat is None or not location.moved(table.lat, table.lon, lat, lon)):
+        lat, lon = table.lat, table.lon
+    elif lat is not None and lon is not None:
+        # Timetable is old, missing or for somewhere else -> recompute for where we are now
+        fresh_data = compute_times_offline(lat, lon, today)
+        fresh_data['meta']['city'] = city
+        save_cache(fresh_data)
+        table = build_timetable(lat, lon, today)
+        location_name = city or "Offline"
+        if not table:
+            # Without NumPy, fall back to computing just these days
+            days = {d: compute_times_offline(lat, lon, d)['timings'] for d in around(today)}
+    if table:
+        days = {d: table.timings(d) for d in around(today) if table.covers(d)}
+
+    # All of each day's times (Imsak, Lastthird, ... too); the prayers are picked out where needed
+    return days, lat, lon, location_name, tz
+
+# Times that fall in the evening: when earlier than Dhuhr they are past midnight (the next date)
+EVENING = {"Maghrib", "Isha", "Midnight", "Lastthird"}
+
+def clock(time_str):
+    """"HH:MM" (or "18:45 (CET)") -> minutes since midnight."""
+    # Split instead of strptime, which drags in the locale machinery
+    hour, minute = time_str[:5].split(":")
+    return int(hour) * 60 + int(minute)
+
+def instants(timings, day, tz=None, names=PRAYERS):
+    """{name: aware datetime} for `names` from `day`'s timings, which are wall times in `tz`.
+
+    A high-latitude Isha or the last third of the night may fall after midnight:
+    evening times earlier than Dhuhr are put on the next date.
+    """
+    noon = clock(timings["Dhuhr"])
+    out = {}
+    for name in names:
+        minutes = clock(timings[name])
+        d = day + timedelta(days=1) if name in EVENING and minutes < noon else day
+        wall = datetime(d.year, d.month, d.day, minutes // 60, minutes % 60)
+        out[name] = wall.replace(tzinfo=tz) if tz else wall.astimezone()
+    return out
+
+def parse_prayers(days, today, tz=None):
+    """[(name, aware datetime)] over the loaded days, sorted by time; tomorrow's are named "... (Tom)"."""
     sorted_prayers = []
-    for name, time_str in timings.items():
-        # Handle formats like "18:45 (CET)" by taking first 5 chars
-        clean_time = time_str[:5]
-        p_time = datetime.strptime(f"{now.strftime('%Y-%m-%d')} {clean_time}", "%Y-%m-%d %H:%M")
-        sorted_prayers.append((name, p_time))
-
-    # Find the next one
-    found_next = False
-    for name, p_time in sorted(sorted_prayers, key=lambda x: x[1]):
-        diff = (p_time - now).total_seconds() / 60
-        if diff > 0:
-            min_diff_minutes = int(diff)
-            next_prayer_name = name
-            found_next = True
-            break
-    
-    # If no prayer left today, point to Fajr tomorrow
-    if not found_next:
-        next_prayer_name = "Fajr (Tom)"
-        # Get Fajr time and add 24 hours to difference
-        fajr_time = [p[1] for p in sorted_prayers if p[0] == 'Fajr'][0]
-        diff_seconds = ((fajr_time + timedelta(days=1)) - now).total_seconds()
-        min_diff_minutes = int(diff_seconds / 60)
-
-    # 3. Format Output text (e.g. "-2h 10m")
-    if min_diff_minutes >= 60:
-        h = min_diff_minutes // 60
-        m = min_diff_minutes % 60
-        output_text = f"{next_prayer_name} -{h}h {m}m"
-    else:
-        output_text = f"{next_prayer_name} -{min_diff_minutes}m"
+    for day, timings in days.items():
+        suffix = " (Tom)" if day > today else ""
+        sorted_prayers += [(name + suffix, p_time) for name, p_time in instants(timings, day, tz).items()]
+    return sorted(sorted_prayers, key=lambda x: x[1])
+
+def next_adhan(sorted_prayers, now):
+    """(name, aware datetime) of the first prayer time strictly after `now`."""
+    for name, p_time in sorted_prayers:
+        if p_time > now:
+            return name, p_time
+    # No row for tomorrow (the timetable ends with the year): the last Fajr a day on is within a minute
+    fajr_time = max(p_time for name, p_time in sorted_prayers if name.startswith('Fajr'))
+    while fajr_time <= now:
+        fajr_time += timedelta(days=1)
+    return "Fajr (Tom)", fajr_time
+
+def next_prayer(sorted_prayers, now):
+    """Returns (name, whole minutes until it), never negative."""
+    name, p_time = next_adhan(sorted_prayers, now)
+    return name, int((p_time - now).total_seconds() / 60)
+
+def read_state():
+    return state_store.read(STATE_FILE, "")
+
+def update_alerts(next_prayer_name, min_diff_minutes, last_state, adhan=True):
+    """Sends the "soon"/"now" notifications once per transition. Returns the new state.
 
-    # 4. Handle Notifications & Audio
+    With adhan=False the caller plays the Adhan itself (the daemon, at the exact instant).
+    """
     current_state = ""
     if min_diff_minutes <= 15 and min_diff_minutes > 0:
         current_state = "soon"
     elif min_diff_minutes == 0:
         current_state = "now"
 
-    last_state = ""
-    if os.path.exists(STATE_FILE):
-        with open(STATE_FILE, "r") as f: last_state = f.read().strip()
+    if current_state == last_state:
+        return last_state
 
-    if current_state == "soon" and last_state != "soon":
+    if current_state == "soon":
         send_notification("⏳ Prepare for Salah", f"{next_prayer_name} is in {min_diff_minutes} min.")
-        with open(STATE_FILE, "w") as f: f.write("soon")
-        
-    if current_state == "now" and last_state != "now":
+    elif current_state == "now":
         send_notification("🕌 It is time for Salah", f"Time for {next_prayer_name}.")
-        play_adhan()
-        with open(STATE_FILE, "w") as f: f.write("now")
+        if adhan:
+            play_adhan(next_prayer_name)
 
-    if current_state == "" and last_state != "":
-         with open(STATE_FILE, "w") as f: f.write("")
+    # Only lives until reboot (/tmp), so skip the fsync
+    state_store.write(STATE_FILE, current_state, sync=False)
+    return current_state
 
-    # 5. Output JSON for Waybar
-    
-    # Qibla Calculation Logic
+def hijri_text(today):
+    """Hijri date plus today's observances (Ramadan, Dhu al-Hijjah, white days), from the local table."""
+    import hijri
+
+    try:
+        lines = [f"🌙 {hijri.format_date(today)}"]
+    except ValueError:
+        return ""
+    lines += [f"• {note}" for note in hijri.observances(today)]
+    return "\n".join(lines) + "\n"
+
+def build_output(next_prayer_name, min_diff_minutes, timings, lat, lon, location_name, today, qibla=None):
+    # Format Output text (e.g. "-2h 10m")
+    if min_diff_minutes >= 60:
+        h = min_diff_minutes // 60
+        m = min_diff_minutes % 60
+        output_text = f"{next_prayer_name} -{h}h {m}m"
+    else:
+        output_text = f"{next_prayer_name} -{min_diff_minutes}m"
+
+    # Qibla: computed once per location, memoized in the location cache
     qibla_text = ""
     if lat and lon:
-        q_deg, q_dir = get_qibla(lat, lon)
-        qibla_text = f"📍 Qibla: {q_deg}° {q_dir}\n"
-    
-    tooltip = f"Location: {location_name}\n{qibla_text}\n" + "\n".join([f"{name}: {time}" for name, time in timings.items()])
-    
-    json_data = {
+        q = qibla or location.qibla(lat, lon, QIBLA_POINTS)
+        qibla_text = f"📍 Qibla: {q['bearing']:.0f}° {q['label']} · {q['distance_km']:,} km\n"
+
+    tooltip = f"Location: {location_name}\n{hijri_text(today)}{qibla_text}\n" + "\n".join([f"{name}: {timings[name]}" for name in PRAYERS])
+
+    return {
         "text": f"🕌 {output_text}",
         "tooltip": tooltip,
         "class": "prayer-soon" if min_diff_minutes < 15 else "prayer-far"
     }
-    print(json.dumps(json_data))
+
+def ramadan_alerts(now, today, timings, times, read=state_store.read):
+    """Ramadan mode: Suhoor and Taraweeh reminders, each at most once a day."""
+    import ramadan
+
+    sent = dict(read(ramadan.STATE_FILE, {}))
+    alerts = ramadan.due_alerts(now, today, timings, times, sent)
+    for key, title, message in alerts:
+        send_notification(title, message)
+        sent[key] = today.isoformat()
+    if alerts:
+        state_store.write(ramadan.STATE_FILE, sent, sync=False)
+
+def render(now, tz, name, min_diff, timings, lat, lon, location_name, qibla=None, read=state_store.read):
+    """The Waybar JSON line, with Ramadan mode's countdowns when it is on. `timings` are today's, in `tz`.
+
+    The daemon passes the day's `qibla` and a cache_watch `read`, so a tick reads no files.
+    """
+    import ramadan
+
+    # The date where the times are (Hijri date, Ramadan) may not be the system's
+    today = local_date(now, tz)
+    output = build_output(name, min_diff, timings, lat, lon, location_name, today, qibla)
+    if ramadan.active(today):
+        times = instants(timings, today, tz, [n for n in ramadan.TIMES if n in timings])
+        ramadan_alerts(now, today, timings, times, read)
+        ramadan.apply(output, now, today, timings, times)
+    return json.dumps(output)
+
+NO_NET_OUTPUT = {"text": "🚫 No Net", "tooltip": "Connect to internet once to detect your location", "class": "error"}
+
+def revalidate(today, read=state_store.read, load_table=None):
+    """Stale-while-revalidate: the bar has already been answered; refresh in the background if needed."""
+    import prayer_refresh
+    import timetable
+
+    if prayer_refresh.due(today, TIMES_SOURCE, LOCATION, read, load_table or timetable.load):
+        prayer_refresh.start()
+
+def main():
+    now = datetime.now().astimezone()
+    days, lat, lon, location_name, tz = load_days(now)
+    today = local_date(now, tz)
+
+    # If everything failed (No net, no cache)
+    if today not in days:
+        print(json.dumps(NO_NET_OUTPUT), flush=True)
+    else:
+        name, min_diff = next_prayer(parse_prayers(days, today, tz), now)
+        update_alerts(name, min_diff, read_state())
+        print(render(now, tz, name, min_diff, days[today], lat, lon, location_name), flush=True)
+    revalidate(now.date())
+
+def run_daemon():
+    """Waybar continuous-exec mode: keeps the day in memory and prints a line only when it changes."""
+    import select
+    import time
+    import adhan_player
+    import cache_watch
+    import prayer_batch
+    import timetable
+
+    # Reload the day only when the timetable or location is rewritten (inotify), e.g. by prayer_refresh.
+    # Not CACHE_FILE: only load_days writes it, and our own writes must not wake us
+    watcher = cache_watch.Watcher()
+    cache_watch.WatchedFile(TIMETABLE_FILE, watcher=watcher)
+    cache_watch.WatchedFile(location.LOCATION_FILE, watcher=watcher)
+    # Switching place (prayer_batch.py use) takes effect at once
+    cache_watch.WatchedFile(prayer_batch.PLACES_FILE, watcher=watcher)
+    cache_watch.WatchedFile(prayer_batch.ACTIVE_FILE, watcher=watcher)
+    # Everything else read on a wakeup (refresh state, Ramadan reminders): parsed once, re-read on change
+    snapshots = cache_watch.Snapshots()
+
+    def load_table():
+        return snapshots.read(TIMETABLE_FILE, None, timetable.load)
+
+    # One resident mpv with the Adhan preloaded (started on the first preload)
+    player = adhan_player.Player()
+    adhan_at = None
+
+    last_state = read_state()
+    last_line = None
+    loaded_day = None
+    tz = None
+
+    while True:
+        now = datetime.now().astimezone()
+        if local_date(now, tz) != loaded_day:
+            days, lat, lon, location_name, tz = load_days(now)
+            watcher.seen()  # A timetable load_days just rebuilt is not news
+            today = local_date(now, tz)
+            loaded_day = None
+            if today in days:
+                timings = days[today]
+                sorted_prayers = parse_prayers(days, today, tz)
+                qibla = location.qibla(lat, lon, QIBLA_POINTS) if lat and lon else None
+                loaded_day = today
+
+        if loaded_day:
+            name, min_diff = next_prayer(sorted_prayers, now)
+            last_state = update_alerts(name, min_diff, last_state, adhan=False)
+            adhan_name, adhan_at = next_adhan(sorted_prayers, now)
+            if (adhan_at - now).total_seconds() <= PRELOAD_SECONDS:
+                try:
+                    player.preload(adhan_name)
+                except adhan_player.PlayerError:
+                    pass  # play_adhan falls back to a one-off mpv
+            line = render(now, tz, name, min_diff, timings, lat, lon, location_name, qibla, snapshots.read)
+        else:
+            line = json.dumps(NO_NET_OUTPUT)
+
+        if line != last_line:
+            print(line, flush=True)
+            last_line = line
+        revalidate(now.date(), snapshots.read, load_table)
+
+        # Prayer times are whole minutes, so the next minute boundary is also the next possible edge;
+        # the Adhan's instant gets its own wake-up so it isn't held to the tick
+        now = datetime.now().astimezone()
+        timeout = 60 - now.second - now.microsecond / 1_000_000
+        if adhan_at:
+            until = (adhan_at - now).total_seconds()
+            # The kernel may defer a long wait by 0.1% of it (timer slack): wake a second early,
+            # then make the last, short wait
+            timeout = max(0.0, min(timeout, until - 1 if until > 1 else until))
+        if watcher.fileno() is not None:
+            select.select([watcher], [], [], timeout)
+        else:
+            time.sleep(timeout)
+        # (Not when waking from suspend long after it)
+        if adhan_at and 0 <= (datetime.now().astimezone() - adhan_at).total_seconds() < 60:
+            play_adhan(adhan_name, player)
+            adhan_at = None
+        if watcher.poll():
+            loaded_day = None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+        run_daemon()
+    else:
+        main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import math
+
+# --- CONFIGURATION ---
+KAABA_LAT = 21.4225
+KAABA_LON = 39.8262
+EARTH_RADIUS_KM = 6371.0088  # Mean radius
+
+POINTS_16 = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+             "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+POINTS_32 = ["N", "NbE", "NNE", "NEbN", "NE", "NEbE", "ENE", "EbN",
+             "E", "EbS", "ESE", "SEbE", "SE", "SEbS", "SSE", "SbE",
+             "S", "SbW", "SSW", "SWbS", "SW", "SWbW", "WSW", "WbS",
+             "W", "WbN", "WNW", "NWbW", "NW", "NWbN", "NNW", "NbW"]
+
+def bearing(lat, lon):
+    """Initial great-circle bearing from (lat, lon) to the Kaaba, degrees clockwise from true north."""
+    lat_r, k_lat_r = math.radians(lat), math.radians(KAABA_LAT)
+    lon_delta = math.radians(KAABA_LON - lon)
+    y = math.sin(lon_delta) * math.cos(k_lat_r)
+    x = math.cos(lat_r) * math.sin(k_lat_r) - math.sin(lat_r) * math.cos(k_lat_r) * math.cos(lon_delta)
+    return math.degrees(math.atan2(y, x)) % 360
+
+def distance_km(lat, lon):
+    """Great-circle (haversine) distance to the Kaaba."""
+    lat_r, k_lat_r = math.radians(lat), math.radians(KAABA_LAT)
+    a = (math.sin((k_lat_r - lat_r) / 2) ** 2
+         + math.cos(lat_r) * math.cos(k_lat_r) * math.sin(math.radians(KAABA_LON - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def compass_label(degrees, points=16):
+    names = POINTS_32 if points == 32 else POINTS_16
+    step = 360 / len(names)
+    return names[int((degrees % 360) / step + 0.5) % len(names)]
+
+def compute(lat, lon, points=16):
+    """Everything the bar and the compass show, for memoizing per location (see location.qibla)."""
+    deg = bearing(lat, lon)
+    return {"bearing": round(deg, 1), "distance_km": round(distance_km(lat, lon)),
+            "label": compass_label(deg, points)}
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: qibla.py LAT LON [16|32]
+    lat, lon = float(sys.argv[1]), float(sys.argv[2])
+    q = compute(lat, lon, int(sys.argv[3]) if len(sys.argv) > 3 else 16)
+    print(f"Qibla: {q['bearing']}° {q['label']}, {q['distance_km']:,} km to the Kaaba")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import tkinter as tk
+import math
+from datetime import datetime, timezone
+
+import cache_watch
+import location
+import prayer_engine
+import prayer_times
+
+# --- CONFIGURATION ---
+BG_COLOR = "#1e1e2e"
+RING_COLOR = "#313244"
+TEXT_COLOR = "#cdd6f4"
+DIM_COLOR = "#6c7086"
+QIBLA_COLOR = "#a6e3a1"  # Needle (Green)
+SUN_COLOR = "#ebcb8b"    # Sun marker (Gold)
+SIZE = 320
+CHECK_MS = 30000         # How often the sun position is re-checked
+SUN_STEP = 1.0           # Degrees of sun movement worth a redraw
+
+class QiblaCompass:
+    """Compass rose with the Qibla needle and the sun's current azimuth.
+
+    The rose is drawn once. The needle and sun marker are redrawn only when
+    their inputs change: a new location (the location cache is watched) or
+    the sun moving SUN_STEP degrees, checked every CHECK_MS.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Qibla")
+        self.root.configure(bg=BG_COLOR)
+        self.root.resizable(False, False)
+
+        self.canvas = tk.Canvas(root, width=SIZE, height=SIZE, bg=BG_COLOR, highlightthickness=0)
+        self.canvas.pack(padx=10, pady=(10, 0))
+        self.info = tk.Label(root, bg=BG_COLOR, fg=TEXT_COLOR, font=("Arial", 11))
+        self.info.pack(pady=10)
+
+        self.center = SIZE / 2
+        self.radius = SIZE / 2 - 30
+        self.draw_rose()
+
+        self.cache = cache_watch.WatchedFile(location.LOCATION_FILE)
+        self.key = None
+        self.bearing = None  # ((lat, lon), location.qibla(...)) for the last place drawn
+        self.root.bind("<Escape>", lambda e: self.root.destroy())
+        self.tick()
+
+    def point(self, degrees, r):
+        a = math.radians(degrees)
+        return self.center + r * math.sin(a), self.center - r * math.cos(a)
+
+    def draw_rose(self):
+        c, r = self.center, self.radius
+        self.canvas.create_oval(c - r, c - r, c + r, c + r, outline=RING_COLOR, width=3)
+        for deg in range(0, 360, 15):
+            inner = r - (12 if deg % 90 == 0 else 6)
+            self.canvas.create_line(*self.point(deg, inner), *self.point(deg, r), fill=DIM_COLOR)
+        for deg, name in ((0, "N"), (90, "E"), (180, "S"), (270, "W")):
+            self.canvas.create_text(*self.point(deg, r + 15), text=name, fill=TEXT_COLOR, font=("Arial", 11, "bold"))
+
+    def place(self):
+        """(lat, lon, city): the configured location, else the watched location cache (re-read only when rewritten)."""
+        if prayer_times.LOCATION:
+            return prayer_times.LOCATION
+        cached = self.cache.get()
+        if not cached:
+            return None, None, None
+        return cached["latitude"], cached["longitude"], cached.get("city", "")
+
+    def inputs(self):
+        """(lat, lon, city, sun azimuth rounded to SUN_STEP, sun above horizon)."""
+        lat, lon, city = self.place()
+        if lat is None:
+            return None
+        azimuth, altitude = prayer_engine.sun_horizontal(lat, lon, datetime.now(timezone.utc))
+        return lat, lon, city, round(azimuth / SUN_STEP) * SUN_STEP, altitude > 0
+
+    def tick(self):
+        key = self.inputs()
+        if key != self.key:
+            self.key = key
+            self.redraw()
+        self.root.after(CHECK_MS, self.tick)
+
+    def redraw(self):
+        self.canvas.delete("dynamic")
+        if not self.key:
+            self.info.config(text="Location unknown: run location.py once")
+            return
+        lat, lon, city, sun_az, sun_up = self.key
+        # The bearing only changes with the place; the sun marker moves on its own
+        if not self.bearing or self.bearing[0] != (lat, lon):
+            self.bearing = (lat, lon), location.qibla(lat, lon, prayer_times.QIBLA_POINTS)
+        q = self.bearing[1]
+        c = self.center
+
+        # Sun on the ring (hollow when below the horizon)
+        x, y = self.point(sun_az, self.radius)
+        self.canvas.create_oval(x - 8, y - 8, x + 8, y + 8, outline=SUN_COLOR, width=2,
+                                fill=SUN_COLOR if sun_up else "", tags="dynamic")
+
+        # Qibla needle with the Kaaba at its tip
+        tip = self.point(q["bearing"], self.radius - 18)
+        self.canvas.create_line(c, c, *tip, fill=QIBLA_COLOR, width=4, arrow="last", tags="dynamic")
+        self.canvas.create_text(*self.point(q["bearing"], self.radius - 38), text="🕋", font=("Arial", 14),
+                                tags="dynamic")
+        self.canvas.create_oval(c - 5, c - 5, c + 5, c + 5, fill=TEXT_COLOR, outline="", tags="dynamic")
+
+        self.info.config(text=f"{city or 'Here'}: {q['bearing']:.1f}° {q['label']} · {q['distance_km']:,} km\n"
+                              f"Sun {sun_az:.0f}°{'' if sun_up else ' (below horizon)'}")
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = QiblaCompass(root)
+    root.mainloop()
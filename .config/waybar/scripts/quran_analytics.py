@@ -1,19 +1,32 @@
 #!/usr/bin/env python3
 import tkinter as tk
-import json
 import os
 import math
 
+import quran_meta
+import reading_log
+import state_store
+
 # --- CONFIGURATION ---
 BG_COLOR = "#1e1e2e"
 GRID_BG = "#313244"   # Empty square color
 GRID_FG = "#a6e3a1"   # Read square color (Green)
 GRID_CUR = "#ebcb8b"  # Current page color (Gold)
+SHADES = 4            # Intensity levels: read once ... read SHADES or more times
 TEXT_COLOR = "#cdd6f4"
 
 CACHE_FILE = os.path.expanduser("~/.cache/thawrah_khatmah.json")
 TOTAL_PAGES = 604
 
+def hex_rgb(color):
+    return bytes(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+def shade(level):
+    """Blends GRID_BG towards GRID_FG; level 1..SHADES."""
+    bg, fg = hex_rgb(GRID_BG), hex_rgb(GRID_FG)
+    t = 0.35 + 0.65 * (level - 1) / (SHADES - 1)
+    return bytes(round(b + (f - b) * t) for b, f in zip(bg, fg))
+
 class QuranHeatmap:
     def __init__(self, root):
         self.root = root
@@ -31,6 +44,8 @@ class QuranHeatmap:
         # Data Loading
         self.current_page = 0
         self.load_data()
+        # Per-page totals, kept up to date incrementally by reading_log
+        self.log = reading_log.ReadingLog()
 
         # UI Header
         header = tk.Frame(root, bg=BG_COLOR)
@@ -53,56 +68,82 @@ class QuranHeatmap:
         self.create_legend(footer)
 
     def load_data(self):
-        if os.path.exists(CACHE_FILE):
-            try:
-                with open(CACHE_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.current_page = data.get("current_page", 0)
-            except: pass
+        data = state_store.read(CACHE_FILE, {})
+        self.current_page = data.get("current_page", 0)
+
+    def page_color(self, page_num, reads):
+        if page_num == self.current_page:
+            return hex_rgb(GRID_CUR)
+        if reads:
+            return shade(min(reads, SHADES))
+        # No history yet for this page: fall back to the bookmark
+        if page_num < self.current_page:
+            return shade(1)
+        return hex_rgb(GRID_BG)
 
     def draw_heatmap(self):
         # Grid settings
-        cols = 30 # 30 Juz columns roughly? Or just 30 columns for aesthetics
-        rows = math.ceil(TOTAL_PAGES / cols)
-        
-        sq_size = 22
-        gap = 4
+        self.cols = 30 # 30 Juz columns roughly? Or just 30 columns for aesthetics
+        rows = math.ceil(TOTAL_PAGES / self.cols)
         
-        start_x = 20
-        start_y = 20
+        self.sq_size = 22
+        self.gap = 4
         
-        for i in range(TOTAL_PAGES):
-            page_num = i + 1
-            
-            # Calculate grid position
-            col = i % cols
-            row = i // cols
-            
-            x1 = start_x + (col * (sq_size + gap))
-            y1 = start_y + (row * (sq_size + gap))
-            x2 = x1 + sq_size
-            y2 = y1 + sq_size
-            
-            # Determine Color
-            if page_num < self.current_page:
-                color = GRID_FG # Read (Green)
-            elif page_num == self.current_page:
-                color = GRID_CUR # Current (Gold)
-            else:
-                color = GRID_BG # Unread (Grey)
-            
-            # Draw Square
-            tag = f"page_{page_num}"
-            self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="", tags=tag)
-            
-            # Hover Effect binding
-            self.canvas.tag_bind(tag, "<Enter>", lambda e, p=page_num: self.show_tooltip(e, p))
+        self.start_x = 20
+        self.start_y = 20
+
+        # The whole grid is one image: build the pixels as a PPM byte buffer, one
+        # pixel row per grid row repeated sq_size times, instead of 604 canvas items
+        cell = self.sq_size + self.gap
+        width = self.cols * cell - self.gap
+        height = rows * cell - self.gap
+        bg = hex_rgb(BG_COLOR)
+        gap_px = bg * self.gap
+        reads = self.log.index["reads"]
+
+        pixels = []
+        for row in range(rows):
+            squares = []
+            for col in range(self.cols):
+                page_num = row * self.cols + col + 1
+                color = self.page_color(page_num, reads[page_num - 1]) if page_num <= TOTAL_PAGES else bg
+                squares.append(color * self.sq_size)
+            line = gap_px.join(squares)
+            pixels.append(line * self.sq_size)
+            if row < rows - 1:
+                pixels.append(bg * width * self.gap)
+
+        ppm = f"P6 {width} {height} 255\n".encode() + b"".join(pixels)
+        self.image = tk.PhotoImage(data=ppm, format="PPM")
+        self.canvas.create_image(self.start_x, self.start_y, image=self.image, anchor="nw")
+
+        # Hover is resolved from the mouse position, so there is a single binding
+        self.hover_page = None
+        self.canvas.bind("<Motion>", self.on_motion)
+
+    def page_at(self, x, y):
+        """Page under canvas coordinates (x, y), or None over a gap or outside the grid."""
+        cell = self.sq_size + self.gap
+        col, dx = divmod(x - self.start_x, cell)
+        row, dy = divmod(y - self.start_y, cell)
+        if col < 0 or row < 0 or col >= self.cols or dx >= self.sq_size or dy >= self.sq_size:
+            return None
+        page = row * self.cols + col + 1
+        return page if page <= TOTAL_PAGES else None
+
+    def on_motion(self, event):
+        page = self.page_at(event.x, event.y)
+        if page and page != self.hover_page:
+            self.hover_page = page
+            self.show_tooltip(event, page)
 
     def show_tooltip(self, event, page):
-        # Simple print to console or update a label for now
         # A full tooltip in Tkinter canvas is complex, but we can change the title
-        juz = math.ceil(page / 20)
-        self.root.title(f"Page {page} - Juz {juz}")
+        quran = quran_meta.index()
+        surah = quran_meta.SURAHS[quran.surah_of_page(page) - 1][0]
+        reads, last_read, minutes = self.log.page_stats(page)
+        history = f"Read {reads}x, last {last_read:%Y-%m-%d}, {minutes} min" if reads else "Not read yet"
+        self.root.title(f"Page {page} - Juz {quran.juz_of_page(page)} - {surah} - {history}")
 
     def create_legend(self, parent):
         # Helper to draw legend circles
@@ -114,7 +155,8 @@ class QuranHeatmap:
 
         draw_dot(GRID_BG, "Unread")
         draw_dot(GRID_CUR, "Current")
-        draw_dot(GRID_FG, "Completed")
+        draw_dot("#" + shade(1).hex(), "Read once")
+        draw_dot(GRID_FG, f"Read {SHADES}+ times")
 
 if __name__ == "__main__":
     root = tk.Tk()
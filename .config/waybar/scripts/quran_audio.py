@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+import fcntl
+import hashlib
+import http.client
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIGURATION ---
+AUDIO_DIR = os.path.expanduser("~/.cache/thawrah_audio")
+# Override with THAWRAH_AUDIO_URL (e.g. a local mirror); {page} is zero-padded to 3 digits
+AUDIO_URL = os.environ.get("THAWRAH_AUDIO_URL",
+                           "https://everyayah.com/data/Alafasy_128kbps/PageMp3s/Page{page}.mp3")
+MAX_CACHE_BYTES = 500 * 1024 * 1024  # ~40 hours of 128 kbps page recitations (partial downloads included)
+PART_MAX_AGE = 7 * 86400             # Partial downloads untouched this long are abandoned: deleted
+PREFETCH_PAGES = 3                   # Pages after the current one to download ahead
+PREFETCH_WORKERS = 2                 # Parallel downloads
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 15
+TOTAL_PAGES = 604
+
+def page_url(page):
+    return AUDIO_URL.format(page=str(page).zfill(3))
+
+def cache_path(url):
+    """Files are keyed by the SHA-256 of their source URL, so reciters/mirrors never collide."""
+    return os.path.join(AUDIO_DIR, hashlib.sha256(url.encode()).hexdigest() + ".mp3")
+
+def cached(page):
+    """Local path of a fully downloaded page (and marks it recently used), or None."""
+    path = cache_path(page_url(page))
+    if os.path.exists(path):
+        os.utime(path)  # mtime doubles as the LRU timestamp
+        return path
+    return None
+
+def download(url):
+    """Downloads `url` into the cache, resuming a previous partial download. Returns the path or None."""
+    path = cache_path(url)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    part_path = path + ".part"
+    validator_path = part_path + ".validator"
+    with open(part_path, 'ab') as part:
+        # Another process is already downloading this file
+        try:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return None
+
+        # The cache key is the URL, not the content: resume only if the server can confirm
+        # (If-Range) that the file is still the one the partial download came from
+        offset = part.tell()
+        validator = read_validator(validator_path) if offset else None
+        if offset and not validator:
+            part.truncate(0)
+            offset = 0
+        request = urllib.request.Request(url)
+        if offset:
+            request.add_header("Range", f"bytes={offset}-")
+            request.add_header("If-Range", validator)
+        try:
+            with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+                # Server ignored the Range header, or the file changed -> start over
+                if offset and (response.status != 206 or range_start(response.headers) != offset):
+                    part.seek(0)
+                    part.truncate()
+                    offset = 0
+                if not offset:
+                    save_validator(validator_path, response.headers)
+                expected = full_size(response.status, response.headers)
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk: break
+                    part.write(chunk)
+        except urllib.error.HTTPError as e:
+            # 416: the partial file is already complete (if it is as long as the file)
+            if e.code != 416:
+                return None
+            expected = full_size(e.code, e.headers)
+        except (urllib.error.URLError, http.client.HTTPException, OSError):
+            return None  # Keep the .part file for the next attempt
+
+        part.flush()
+        # A connection cut mid-body ends the read early without an error: only a
+        # complete file may be promoted, or cached() would serve it truncated forever.
+        # A resumed file must have a known size to be checked against
+        if (expected is None and offset) or (expected is not None and part.tell() != expected):
+            if expected is None or part.tell() > expected:
+                part.truncate(0)  # Can't be checked, or not a prefix of this file: start over next time
+            return None
+        os.fsync(part.fileno())
+        os.replace(part_path, path)
+        remove(validator_path)
+    return path
+
+def read_validator(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def save_validator(path, headers):
+    """Keeps the response's ETag (strong only: If-Range refuses weak ones) or Last-Modified."""
+    etag = headers.get("ETag")
+    validator = etag if etag and not etag.startswith("W/") else headers.get("Last-Modified")
+    if validator:
+        with open(path, 'w') as f:
+            f.write(validator)
+    else:
+        remove(path)
+
+def range_start(headers):
+    """First byte of a 206 response ("bytes 100-199/1000" -> 100), or None."""
+    first = (headers.get("Content-Range") or "").partition(" ")[2].partition("-")[0]
+    return int(first) if first.isdigit() else None
+
+def remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def full_size(status, headers):
+    """Size of the whole file from a response's headers, or None if they don't say."""
+    if status in (206, 416):
+        # "bytes 100-199/1000" or "bytes */1000"
+        total = (headers.get("Content-Range") or "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    """Deletes abandoned partial downloads, then least recently used files until the cache fits in `max_bytes`.
+
+    Partial downloads count towards the size like finished ones; one being downloaded
+    right now (its .part is locked) is left alone.
+    """
+    try:
+        entries = [e for e in os.scandir(AUDIO_DIR) if e.name.endswith((".mp3", ".part"))]
+    except OSError:
+        return
+    files = sorted((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries)
+    total = sum(size for _, size, _ in files)
+    now = time.time()
+    for mtime, size, path in files:
+        abandoned = path.endswith(".part") and now - mtime > PART_MAX_AGE
+        if total <= max_bytes and not abandoned:
+            continue
+        if not delete_file(path):
+            continue
+        total -= size
+
+def delete_file(path):
+    """Deletes a cached file (a .part only if no download holds it, and with its validator). True if gone."""
+    if not path.endswith(".part"):
+        remove(path)
+        return True
+    try:
+        with open(path, 'ab') as part:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            remove(path)
+    except OSError:
+        return False
+    remove(path + ".validator")
+    return True
+
+def prefetch(page, count=PREFETCH_PAGES):
+    """Downloads `page` and the next `count` pages in parallel, then trims the cache."""
+    pages = [p for p in range(page, page + count + 1) if 1 <= p <= TOTAL_PAGES]
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as pool:
+        results = list(pool.map(lambda p: download(page_url(p)), pages))
+    # Keep what we just fetched even if it is the oldest by mtime
+    for path in results:
+        if path: os.utime(path)
+    evict()
+    return results
+
+def play_source(page):
+    """What mpv should open: the cached file if we have it, otherwise the stream URL."""
+    return cached(page) or page_url(page)
+
+def start_prefetch(page):
+    """Runs `prefetch` in a detached process, so it outlives the (possibly short-lived) caller."""
+    import subprocess
+
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "prefetch", str(page)],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+if __name__ == "__main__":
+    # Usage: quran_audio.py prefetch PAGE [COUNT]   |   quran_audio.py status
+    if len(sys.argv) > 2 and sys.argv[1] == "prefetch":
+        count = int(sys.argv[3]) if len(sys.argv) > 3 else PREFETCH_PAGES
+        prefetch(int(sys.argv[2]), count)
+    elif len(sys.argv) > 1 and sys.argv[1] == "status":
+        pages = [p for p in range(1, TOTAL_PAGES + 1) if os.path.exists(cache_path(page_url(p)))]
+        size = sum(os.path.getsize(cache_path(page_url(p))) for p in pages)
+        print(f"{len(pages)} pages cached, {size / 1024 / 1024:.1f} MB of {MAX_CACHE_BYTES / 1024 / 1024:.0f} MB")
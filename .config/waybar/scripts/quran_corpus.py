@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import mmap
+import os
+import random
+import struct
+import textwrap
+
+import quran_meta
+
+# --- CONFIGURATION ---
+CORPUS_FILE = os.path.expanduser("~/.cache/thawrah_quran_corpus.bin")
+# Full-text editions for `fetch` (Tanzil's texts); override with THAWRAH_QURAN_API (e.g. a local mirror)
+QURAN_API = os.environ.get("THAWRAH_QURAN_API", "http://api.alquran.cloud/v1")
+ARABIC_EDITION = "quran-simple"
+TRANSLATION_EDITION = "en.sahih"
+FETCH_TIMEOUT = 60
+FETCH_RETRY = 3600   # Background fetch: at most one attempt per this many seconds
+WRAP_WIDTH = 60   # Translations are stored pre-wrapped at this width
+BUCKET_SIZE = 50  # Length buckets: <=50, <=100, ... characters of translation
+BUCKETS = 40      # Last bucket also holds everything longer
+
+# --- FILE FORMAT ---
+# Header, then BUCKETS uint32 cumulative counts (records with translation length <= (k+1)*BUCKET_SIZE),
+# then one (offset, size) entry per ayah sorted by translation length, then the UTF-8 records.
+# A record is "surah\x1fayah\x1fwrapped translation\x1farabic".
+MAGIC = b"THWQ"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")  # magic, version, wrap width, record count
+BOUNDS = struct.Struct(f"<{BUCKETS}I")
+ENTRY = struct.Struct("<IH")
+SEP = "\x1f"
+
+def read_tanzil(path):
+    """Tanzil text export ("sura|aya|text" per line) -> {(sura, aya): text}."""
+    verses = {}
+    with open(path, 'r', encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            sura, aya, text = line.split("|", 2)
+            verses[(int(sura), int(aya))] = text
+    return verses
+
+def build(arabic_path, translation_path, out=CORPUS_FILE):
+    """Builds the corpus from Tanzil's quran-simple.txt and en.sahih.txt (tanzil.net/download, tanzil.net/trans)."""
+    return write(read_tanzil(arabic_path), read_tanzil(translation_path), out)
+
+def fetch_edition(edition):
+    """{(sura, aya): text} for a whole edition, in one request."""
+    import json
+    import urllib.request
+
+    with urllib.request.urlopen(f"{QURAN_API}/quran/{edition}", timeout=FETCH_TIMEOUT) as response:
+        data = json.loads(response.read().decode())
+    return {(surah["number"], ayah["numberInSurah"]): ayah["text"]
+            for surah in data["data"]["surahs"] for ayah in surah["ayahs"]}
+
+def fetch(out=CORPUS_FILE):
+    """Downloads the Arabic text and the translation and builds the corpus. Returns the ayah count."""
+    return write(fetch_edition(ARABIC_EDITION), fetch_edition(TRANSLATION_EDITION), out)
+
+def fetch_in_background(out=CORPUS_FILE):
+    """Starts `quran_corpus.py fetch` detached, unless one was started in the last FETCH_RETRY seconds."""
+    import subprocess
+    import sys
+    import time
+
+    stamp = f"{out}.fetch"
+    try:
+        if time.time() - os.path.getmtime(stamp) < FETCH_RETRY:
+            return
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(stamp, 'w'):
+        pass
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "fetch"],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+def write(arabic, translation, out=CORPUS_FILE):
+    """Writes the corpus from {(sura, aya): text} maps. Returns the ayah count."""
+    records = []
+    for key in sorted(translation):
+        text = translation[key]
+        body = SEP.join([str(key[0]), str(key[1]), textwrap.fill(text, WRAP_WIDTH), arabic.get(key, "")])
+        records.append((len(text), body.encode("utf-8")))
+    records.sort(key=lambda r: r[0])
+
+    bounds = [sum(1 for length, _ in records if length <= (k + 1) * BUCKET_SIZE) for k in range(BUCKETS)]
+    bounds[-1] = len(records)
+
+    entries, blob, offset = [], [], 0
+    for _, body in records:
+        entries.append(ENTRY.pack(offset, len(body)))
+        blob.append(body)
+        offset += len(body)
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    tmp_file = f"{out}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, WRAP_WIDTH, len(records)))
+        f.write(BOUNDS.pack(*bounds))
+        f.write(b"".join(entries))
+        f.write(b"".join(blob))
+    os.replace(tmp_file, out)
+    return len(records)
+
+class Corpus:
+    """mmap-backed reader: picking a random ayah under a length limit is one lookup and one slice."""
+
+    def __init__(self, path=CORPUS_FILE):
+        with open(path, 'rb') as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.wrap_width, self.count = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a Thawrah Quran corpus")
+        self.bounds = BOUNDS.unpack_from(self.buf, HEADER.size)
+        self.entries_at = HEADER.size + BOUNDS.size
+        self.data_at = self.entries_at + self.count * ENTRY.size
+
+    def eligible(self, max_length):
+        """Number of ayahs whose translation fits in `max_length` characters (bucket granularity)."""
+        bucket = max_length // BUCKET_SIZE
+        if bucket <= 0: return 0
+        return self.bounds[min(bucket, BUCKETS) - 1]
+
+    def record(self, i):
+        """(surah, ayah, wrapped translation, arabic) for the i-th record (length order)."""
+        offset, size = ENTRY.unpack_from(self.buf, self.entries_at + i * ENTRY.size)
+        start = self.data_at + offset
+        surah, ayah, text, arabic = self.buf[start:start + size].decode("utf-8").split(SEP)
+        return int(surah), int(ayah), text, arabic
+
+    def random(self, max_length):
+        n = self.eligible(max_length)
+        return self.record(random.randrange(n)) if n else None
+
+def surah_name(surah):
+    """"94. Ash-Sharh" -> "Ash-Sharh"."""
+    return quran_meta.SURAHS[surah - 1][0].split(". ", 1)[1]
+
+def load(path=CORPUS_FILE):
+    try:
+        return Corpus(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: quran_corpus.py fetch | build quran-simple.txt en.sahih.txt
+    if len(sys.argv) > 1 and sys.argv[1] == "fetch":
+        try:
+            n = fetch()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"quran_corpus: fetch failed: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif len(sys.argv) > 3 and sys.argv[1] == "build":
+        n = build(sys.argv[2], sys.argv[3])
+    else:
+        print("Usage: quran_corpus.py fetch | build quran-simple.txt en.sahih.txt", file=sys.stderr)
+        sys.exit(1)
+    print(f"✅ {n} ayahs written to {CORPUS_FILE} ({os.path.getsize(CORPUS_FILE) // 1024} KB)")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+import json
+import os
+from array import array
+from bisect import bisect_right
+
+# --- CONFIGURATION ---
+TOTAL_PAGES = 604  # Madani mushaf
+# Optional page-level ayah/ruku/rub' data, built from Tanzil's quran-data.xml (see build())
+META_FILE = os.path.expanduser("~/.cache/thawrah_quran_meta.json")
+
+# --- DATA ---
+# (name, start page) for all 114 surahs
+SURAHS = [
+    ("1. Al-Fatiha", 1), ("2. Al-Baqarah", 2), ("3. Al-Imran", 50), ("4. An-Nisa", 77),
+    ("5. Al-Ma'idah", 106), ("6. Al-An'am", 128), ("7. Al-A'raf", 151), ("8. Al-Anfal", 177),
+    ("9. At-Tawbah", 187), ("10. Yunus", 208), ("11. Hud", 221), ("12. Yusuf", 235),
+    ("13. Ar-Ra'd", 249), ("14. Ibrahim", 255), ("15. Al-Hijr", 262), ("16. An-Nahl", 267),
+    ("17. Al-Isra", 282), ("18. Al-Kahf", 293), ("19. Maryam", 305), ("20. Ta-Ha", 312),
+    ("21. Al-Anbiya", 322), ("22. Al-Hajj", 332), ("23. Al-Mu'minun", 342), ("24. An-Nur", 350),
+    ("25. Al-Furqan", 359), ("26. Ash-Shu'ara", 367), ("27. An-Naml", 377), ("28. Al-Qasas", 385),
+    ("29. Al-Ankabut", 396), ("30. Ar-Rum", 404), ("31. Luqman", 411), ("32. As-Sajdah", 415),
+    ("33. Al-Ahzab", 418), ("34. Saba", 428), ("35. Fatir", 434), ("36. Ya-Sin", 440),
+    ("37. As-Saffat", 446), ("38. Sad", 453), ("39. Az-Zumar", 458), ("40. Ghafir", 467),
+    ("41. Fussilat", 477), ("42. Ash-Shura", 483), ("43. Az-Zukhruf", 489), ("44. Ad-Dukhan", 496),
+    ("45. Al-Jathiyah", 499), ("46. Al-Ahqaf", 502), ("47. Muhammad", 507), ("48. Al-Fath", 511),
+    ("49. Al-Hujurat", 515), ("50. Qaf", 518), ("51. Adh-Dhariyat", 520), ("52. At-Tur", 523),
+    ("53. An-Najm", 526), ("54. Al-Qamar", 528), ("55. Ar-Rahman", 531), ("56. Al-Waqi'ah", 534),
+    ("57. Al-Hadid", 537), ("58. Al-Mujadila", 542), ("59. Al-Hashr", 545), ("60. Al-Mumtahanah", 549),
+    ("61. As-Saff", 551), ("62. Al-Jumu'ah", 553), ("63. Al-Munafiqun", 554), ("64. At-Taghabun", 556),
+    ("65. At-Talaq", 558), ("66. At-Tahrim", 560), ("67. Al-Mulk", 562), ("68. Al-Qalam", 564),
+    ("69. Al-Haqqah", 566), ("70. Al-Ma'arij", 568), ("71. Nuh", 570), ("72. Al-Jinn", 572),
+    ("73. Al-Muzzammil", 574), ("74. Al-Muddaththir", 575), ("75. Al-Qiyamah", 577), ("76. Al-Insan", 578),
+    ("77. Al-Mursalat", 580), ("78. An-Naba", 582), ("79. An-Nazi'at", 583), ("80. Abasa", 585),
+    ("81. At-Takwir", 586), ("82. Al-Infitar", 587), ("83. Al-Mutaffifin", 587), ("84. Al-Inshiqaq", 589),
+    ("85. Al-Buruj", 590), ("86. At-Tariq", 591), ("87. Al-A'la", 591), ("88. Al-Ghashiyah", 592),
+    ("89. Al-Fajr", 593), ("90. Al-Balad", 594), ("91. Ash-Shams", 595), ("92. Al-Lail", 595),
+    ("93. Ad-Duha", 596), ("94. Ash-Sharh", 596), ("95. At-Tin", 597), ("96. Al-Alaq", 597),
+    ("97. Al-Qadr", 598), ("98. Al-Bayyinah", 598), ("99. Az-Zalzalah", 599), ("100. Al-Adiyat", 599),
+    ("101. Al-Qari'ah", 600), ("102. At-Takathur", 600), ("103. Al-Asr", 601), ("104. Al-Humazah", 601),
+    ("105. Al-Fil", 601), ("106. Quraysh", 602), ("107. Al-Ma'un", 602), ("108. Al-Kawthar", 602),
+    ("109. Al-Kafirun", 603), ("110. An-Nasr", 603), ("111. Al-Masad", 603), ("112. Al-Ikhlas", 604),
+    ("113. Al-Falaq", 604), ("114. An-Nas", 604)
+]
+
+SURAH_AYAHS = [
+    7, 286, 200, 176, 120, 165, 206, 75, 129, 109, 123, 111, 43, 52, 99, 128, 111, 110, 98, 135,
+    112, 78, 118, 64, 77, 227, 93, 88, 69, 60, 34, 30, 73, 54, 45, 83, 182, 88, 75, 85,
+    54, 53, 89, 59, 37, 35, 38, 29, 18, 45, 60, 49, 62, 55, 78, 96, 29, 22, 24, 13,
+    14, 11, 11, 18, 12, 12, 30, 52, 52, 44, 28, 28, 20, 56, 40, 31, 50, 40, 46, 42,
+    29, 19, 36, 25, 22, 17, 19, 26, 30, 20, 15, 21, 11, 8, 8, 19, 5, 8, 8, 11,
+    11, 8, 3, 9, 5, 4, 7, 3, 6, 3, 5, 4, 5, 6
+]
+
+# Start page of each juz (index 0 = juz 1)
+JUZ_START_PAGES = [
+    1, 22, 42, 62, 82, 102, 121, 142, 162, 182, 201, 222, 242, 262, 282,
+    302, 322, 342, 362, 382, 402, 422, 442, 462, 482, 502, 522, 542, 562, 582
+]
+
+# (surah, ayah) where each juz starts
+JUZ_START_AYAHS = [
+    (1, 1), (2, 142), (2, 253), (3, 93), (4, 24), (4, 148), (5, 82), (6, 111), (7, 88), (8, 41),
+    (9, 93), (11, 6), (12, 53), (15, 1), (17, 1), (18, 75), (21, 1), (23, 1), (25, 21), (27, 56),
+    (29, 46), (33, 31), (36, 28), (39, 32), (41, 47), (46, 1), (51, 31), (58, 1), (67, 1), (78, 1)
+]
+
+# --- INDEX ---
+class QuranIndex:
+    """Array-backed page <-> surah/juz index; every lookup is a bisect (O(log n)).
+
+    Hizb, rub' (quarter), ruku and per-page ayah ranges need Tanzil's page data;
+    they are available once `quran_meta.py build quran-data.xml` has been run.
+    """
+
+    def __init__(self, meta_file=META_FILE):
+        self.surah_pages = array('H', (page for _, page in SURAHS))
+        self.juz_pages = array('H', JUZ_START_PAGES)
+
+        # Global ayah number (1..6236) of the first ayah of each surah
+        self.surah_first = array('H')
+        total = 1
+        for count in SURAH_AYAHS:
+            self.surah_first.append(total)
+            total += count
+
+        self.page_first = self.quarter_first = self.ruku_first = None
+        try:
+            with open(meta_file, 'r') as f:
+                data = json.load(f)
+            self.page_first = array('H', data["pages"])
+            self.quarter_first = array('H', data["quarters"])
+            self.ruku_first = array('H', data["rukus"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    @property
+    def has_ayahs(self):
+        return self.page_first is not None
+
+    # --- Ayah numbering ---
+    def global_ayah(self, surah, ayah):
+        return self.surah_first[surah - 1] + ayah - 1
+
+    def surah_ayah(self, number):
+        """Global ayah number -> (surah, ayah)."""
+        surah = bisect_right(self.surah_first, number)
+        return surah, number - self.surah_first[surah - 1] + 1
+
+    # --- Page lookups ---
+    def juz_of_page(self, page):
+        if page <= 0: return 0
+        return bisect_right(self.juz_pages, page)
+
+    def juz_range(self, juz):
+        """(first page, last page) of a juz."""
+        start = self.juz_pages[juz - 1]
+        end = self.juz_pages[juz] - 1 if juz < len(self.juz_pages) else TOTAL_PAGES
+        return start, end
+
+    def surah_of_page(self, page):
+        """Surah the page starts in (or, without ayah data, the last surah starting on or before it)."""
+        if page <= 0: return 0
+        if self.has_ayahs:
+            return self.surah_ayah(self.page_first[page - 1])[0]
+        return bisect_right(self.surah_pages, page)
+
+    def surah_range(self, surah):
+        """(first page, last page) of a surah. A page shared with the next surah is included."""
+        start = self.surah_pages[surah - 1]
+        if surah == len(SURAHS):
+            return start, TOTAL_PAGES
+        end = self.surah_pages[surah]
+        # With ayah data we know if the next surah starts at the top of its page
+        if self.has_ayahs and self.page_first[end - 1] == self.surah_first[surah] and end > start:
+            end -= 1
+        return start, end
+
+    def ayah_range(self, page):
+        """((surah, ayah), (surah, ayah)) shown on a page, or None without ayah data."""
+        if not self.has_ayahs: return None
+        first = self.page_first[page - 1]
+        last = self.page_first[page] - 1 if page < TOTAL_PAGES else self.surah_first[-1] + SURAH_AYAHS[-1] - 1
+        return self.surah_ayah(first), self.surah_ayah(last)
+
+    def rub_of_page(self, page):
+        """Rub' al-hizb (1..240) in effect at the top of a page, or None without ayah data."""
+        if not self.has_ayahs: return None
+        return bisect_right(self.quarter_first, self.page_first[page - 1])
+
+    def hizb_of_page(self, page):
+        rub = self.rub_of_page(page)
+        return (rub - 1) // 4 + 1 if rub else None
+
+    def ruku_of_page(self, page):
+        if not self.has_ayahs: return None
+        return bisect_right(self.ruku_first, self.page_first[page - 1])
+
+_index = None
+
+def index():
+    """Shared, lazily built QuranIndex."""
+    global _index
+    if _index is None:
+        _index = QuranIndex()
+    return _index
+
+def build(xml_path, meta_file=META_FILE):
+    """Precomputes page/quarter/ruku starts from Tanzil's quran-data.xml (tanzil.net/docs/quran_metadata)."""
+    import xml.etree.ElementTree as ET
+
+    tree = ET.parse(xml_path)
+    idx = QuranIndex(meta_file=os.devnull)
+
+    def starts(tag):
+        rows = sorted(tree.iter(tag), key=lambda e: int(e.get("index")))
+        return [idx.global_ayah(int(e.get("sura")), int(e.get("aya"))) for e in rows]
+
+    data = {"pages": starts("page"), "quarters": starts("quarter"), "rukus": starts("ruku")}
+    if len(data["pages"]) != TOTAL_PAGES:
+        raise ValueError(f"{xml_path}: expected {TOTAL_PAGES} pages, found {len(data['pages'])}")
+
+    import state_store
+
+    state_store.write(meta_file, data)
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: quran_meta.py build quran-data.xml   |   quran_meta.py PAGE
+    if len(sys.argv) > 2 and sys.argv[1] == "build":
+        build(sys.argv[2])
+        print(f"✅ Page index written to {META_FILE}")
+    else:
+        q = index()
+        page = int(sys.argv[1])
+        print(f"Page {page}: Juz {q.juz_of_page(page)}, {SURAHS[q.surah_of_page(page) - 1][0]}")
+        if q.has_ayahs:
+            (s1, a1), (s2, a2) = q.ayah_range(page)
+            print(f"Hizb {q.hizb_of_page(page)}, Rub' {q.rub_of_page(page)}, Ruku {q.ruku_of_page(page)}, "
+                  f"Ayahs {s1}:{a1} - {s2}:{a2}")
@@ -1,9 +1,34 @@
 #!/usr/bin/env python3
-import tkinter as tk
-import json
 import os
+import socket
+import sys
+
+SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "thawrah_quran_nav.sock")
+
+def show_running_instance():
+    """Asks a resident `quran_nav.py --daemon` to show its window. Returns False if none is running."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(1)
+            s.connect(SOCKET_PATH)
+            s.sendall(b"show\n")
+            return True
+    except OSError:
+        return False
+
+# Fast path: a click only has to poke the resident window, so do it before importing tkinter
+if __name__ == "__main__" and len(sys.argv) == 1 and show_running_instance():
+    sys.exit(0)
+
+import tkinter as tk
 import subprocess
 
+import cache_watch
+import quran_audio
+import quran_meta
+import reading_log
+import state_store
+
 # --- CONFIGURATION ---
 BG_COLOR = "#11111b"       # Darkest background (Crust)
 WHEEL_BG = "#1e1e2e"       # Main Drawer Color (Base)
@@ -15,44 +40,8 @@ HIGHLIGHT_BG = "#313244"
 CACHE_FILE = os.path.expanduser("~/.cache/thawrah_khatmah.json")
 
 # --- DATA ---
-JUZ_STARTS = {
-    1: 1, 2: 22, 3: 42, 4: 62, 5: 82, 6: 102, 7: 122, 8: 142, 9: 162, 10: 182,
-    11: 202, 12: 222, 13: 242, 14: 262, 15: 282, 16: 302, 17: 322, 18: 342, 19: 362, 20: 382,
-    21: 402, 22: 422, 23: 442, 24: 462, 25: 482, 26: 502, 27: 522, 28: 542, 29: 562, 30: 582,
-    31: 605
-}
-
-SURAHS = [
-    ("1. Al-Fatiha", 1), ("2. Al-Baqarah", 2), ("3. Al-Imran", 50), ("4. An-Nisa", 77),
-    ("5. Al-Ma'idah", 106), ("6. Al-An'am", 128), ("7. Al-A'raf", 151), ("8. Al-Anfal", 177),
-    ("9. At-Tawbah", 187), ("10. Yunus", 208), ("11. Hud", 221), ("12. Yusuf", 235),
-    ("13. Ar-Ra'd", 249), ("14. Ibrahim", 255), ("15. Al-Hijr", 262), ("16. An-Nahl", 267),
-    ("17. Al-Isra", 282), ("18. Al-Kahf", 293), ("19. Maryam", 305), ("20. Ta-Ha", 312),
-    ("21. Al-Anbiya", 322), ("22. Al-Hajj", 332), ("23. Al-Mu'minun", 342), ("24. An-Nur", 350),
-    ("25. Al-Furqan", 359), ("26. Ash-Shu'ara", 367), ("27. An-Naml", 377), ("28. Al-Qasas", 385),
-    ("29. Al-Ankabut", 396), ("30. Ar-Rum", 404), ("31. Luqman", 411), ("32. As-Sajdah", 415),
-    ("33. Al-Ahzab", 418), ("34. Saba", 428), ("35. Fatir", 434), ("36. Ya-Sin", 440),
-    ("37. As-Saffat", 446), ("38. Sad", 453), ("39. Az-Zumar", 458), ("40. Ghafir", 467),
-    ("41. Fussilat", 477), ("42. Ash-Shura", 483), ("43. Az-Zukhruf", 489), ("44. Ad-Dukhan", 496),
-    ("45. Al-Jathiyah", 499), ("46. Al-Ahqaf", 502), ("47. Muhammad", 507), ("48. Al-Fath", 511),
-    ("49. Al-Hujurat", 515), ("50. Qaf", 518), ("51. Adh-Dhariyat", 520), ("52. At-Tur", 523),
-    ("53. An-Najm", 526), ("54. Al-Qamar", 528), ("55. Ar-Rahman", 531), ("56. Al-Waqi'ah", 534),
-    ("57. Al-Hadid", 537), ("58. Al-Mujadila", 542), ("59. Al-Hashr", 545), ("60. Al-Mumtahanah", 549),
-    ("61. As-Saff", 551), ("62. Al-Jumu'ah", 553), ("63. Al-Munafiqun", 554), ("64. At-Taghabun", 556),
-    ("65. At-Talaq", 558), ("66. At-Tahrim", 560), ("67. Al-Mulk", 562), ("68. Al-Qalam", 564),
-    ("69. Al-Haqqah", 566), ("70. Al-Ma'arij", 568), ("71. Nuh", 570), ("72. Al-Jinn", 572),
-    ("73. Al-Muzzammil", 574), ("74. Al-Muddaththir", 575), ("75. Al-Qiyamah", 577), ("76. Al-Insan", 578),
-    ("77. Al-Mursalat", 580), ("78. An-Naba", 582), ("79. An-Nazi'at", 583), ("80. Abasa", 585),
-    ("81. At-Takwir", 586), ("82. Al-Infitar", 587), ("83. Al-Mutaffifin", 587), ("84. Al-Inshiqaq", 589),
-    ("85. Al-Buruj", 590), ("86. At-Tariq", 591), ("87. Al-A'la", 591), ("88. Al-Ghashiyah", 592),
-    ("89. Al-Fajr", 593), ("90. Al-Balad", 594), ("91. Ash-Shams", 595), ("92. Al-Lail", 595),
-    ("93. Ad-Duha", 596), ("94. Ash-Sharh", 596), ("95. At-Tin", 597), ("96. Al-Alaq", 597),
-    ("97. Al-Qadr", 598), ("98. Al-Bayyinah", 598), ("99. Az-Zalzalah", 599), ("100. Al-Adiyat", 599),
-    ("101. Al-Qari'ah", 600), ("102. At-Takathur", 600), ("103. Al-Asr", 601), ("104. Al-Humazah", 601),
-    ("105. Al-Fil", 601), ("106. Quraysh", 602), ("107. Al-Ma'un", 602), ("108. Al-Kawthar", 602),
-    ("109. Al-Kafirun", 603), ("110. An-Nasr", 603), ("111. Al-Masad", 603), ("112. Al-Ikhlas", 604),
-    ("113. Al-Falaq", 604), ("114. An-Nas", 604)
-]
+# Page <-> surah/juz index shared with khatmah.py and quran_analytics.py
+QURAN = quran_meta.index()
 
 class CurvedScroller(tk.Canvas):
     def __init__(self, master, items, width=150, height=280, on_select=None, on_click=None):
@@ -68,23 +57,41 @@ class CurvedScroller(tk.Canvas):
         self.target_offset = 0
         self.item_height = 40
         self.scroll_speed = 0
+        self.after_id = None  # Pending animation frame, None while at rest
+
+        # Draw "Lens" - A clean curve highlighting the center
+        # We draw a small filled rectangle that is nicely rounded
+        cy = self.height / 2
+        self.create_rectangle(5, cy-20, self.width-5, cy+20, fill=HIGHLIGHT_BG, outline="", tags="lens")
+
+        # Fixed pool of text items, moved with coords/itemconfig instead of delete-and-recreate
+        self.visible_range = int(self.height / self.item_height / 2) + 2
+        self.pool = [self.create_text(self.width / 2, cy, text="", anchor="center")
+                     for _ in range(2 * self.visible_range + 1)]
         
         self.bind("<Motion>", self.handle_hover)
         self.bind("<Button-1>", self.handle_click)
         self.bind("<Button-4>", lambda e: self.scroll_fixed(-1))
         self.bind("<Button-5>", lambda e: self.scroll_fixed(1))
         
-        self.animate()
+        self.wake()
+
+    def wake(self):
+        """(Re)starts the animation loop; it stops by itself once the scroller is at rest."""
+        if self.after_id is None:
+            self.after_id = self.after(20, self.animate)
 
     def update_items(self, new_items):
         self.items = new_items
         self.target_offset = 0
         self.offset_y = 0
         self.selected_index = 0
+        self.wake()
 
     def scroll_fixed(self, direction):
         self.target_offset -= direction * self.item_height
         self.limit_scroll()
+        self.wake()
 
     def handle_hover(self, event):
         y = event.y
@@ -96,6 +103,7 @@ class CurvedScroller(tk.Canvas):
             if abs(self.target_offset - self.offset_y) < 1:
                 idx = round(-self.target_offset / self.item_height)
                 self.target_offset = -idx * self.item_height
+        self.wake()
 
     def limit_scroll(self):
         max_scroll = -(len(self.items) - 1) * self.item_height
@@ -114,13 +122,21 @@ class CurvedScroller(tk.Canvas):
     def jump_to_index(self, index):
         self.target_offset = -index * self.item_height
         self.offset_y = self.target_offset
+        self.wake()
 
     def animate(self):
+        self.after_id = None
+        previous_target = self.target_offset
         if self.scroll_speed != 0:
             self.target_offset += self.scroll_speed
             self.limit_scroll()
 
         self.offset_y += (self.target_offset - self.offset_y) * 0.2
+        # At rest: converged on the target and not being pushed (or pinned at either end)
+        settled = abs(self.target_offset - self.offset_y) < 0.5 and self.target_offset == previous_target
+        if settled:
+            self.offset_y = self.target_offset
+
         center_idx = round(-self.offset_y / self.item_height)
         center_idx = max(0, min(center_idx, len(self.items)-1))
         
@@ -129,54 +145,49 @@ class CurvedScroller(tk.Canvas):
             if self.on_select:
                 self.on_select(self.items[self.selected_index], center_idx)
 
-        self.delete("all")
+        self.draw(center_idx)
+
+        if not settled:
+            self.after_id = self.after(20, self.animate)
+
+    def draw(self, center_idx):
         cy = self.height / 2
         
-        # Draw "Lens" - A clean curve highlighting the center
-        # We draw a small filled rectangle that is nicely rounded
-        self.create_rectangle(5, cy-20, self.width-5, cy+20, fill=HIGHLIGHT_BG, outline="", tags="lens")
-        self.tag_lower("lens") # Put behind text
+        for slot, item_id in enumerate(self.pool):
+            i = center_idx - self.visible_range + slot
+            if not 0 <= i < len(self.items):
+                self.itemconfig(item_id, state="hidden")
+                continue
 
-        visible_range = int(self.height / self.item_height / 2) + 2
-        
-        for i in range(center_idx - visible_range, center_idx + visible_range + 1):
-            if 0 <= i < len(self.items):
-                item_y_pos = cy + (i * self.item_height) + self.offset_y
-                dist = abs(cy - item_y_pos)
-                scale = max(0.8, 1 - (dist / (self.height * 0.9)))
-                font_size = int(12 * scale)
-                
-                # Simple X-Indent (No crazy curve that cuts off text)
-                x_pos = self.width / 2 
-
-                if i == center_idx:
-                    color = ACTIVE_COLOR
-                    font = ("Arial", 14, "bold")
-                else:
-                    color = TEXT_COLOR
-                    font = ("Arial", font_size, "normal")
-
-                self.create_text(x_pos, item_y_pos, text=str(self.items[i]), font=font, fill=color, anchor="center")
-
-        self.after(20, self.animate)
+            item_y_pos = cy + (i * self.item_height) + self.offset_y
+            dist = abs(cy - item_y_pos)
+            scale = max(0.8, 1 - (dist / (self.height * 0.9)))
+            font_size = int(12 * scale)
+            
+            # Simple X-Indent (No crazy curve that cuts off text)
+            x_pos = self.width / 2 
+
+            if i == center_idx:
+                color = ACTIVE_COLOR
+                font = ("Arial", 14, "bold")
+            else:
+                color = TEXT_COLOR
+                font = ("Arial", font_size, "normal")
+
+            self.coords(item_id, x_pos, item_y_pos)
+            self.itemconfig(item_id, text=str(self.items[i]), font=font, fill=color, state="normal")
 
 class QuranLauncher:
-    def __init__(self, root):
+    def __init__(self, root, resident=False):
         self.root = root
         self.root.title("Quran Nav")
+        # Resident windows are hidden instead of destroyed, so the next open is instant
+        self.resident = resident
         
         # --- COMPACT GEOMETRY ---
         win_w, win_h = 280, 420 
-        pointer_y = root.winfo_pointery()
-        screen_h = root.winfo_screenheight()
-        screen_w = root.winfo_screenwidth()
-        
-        y_pos = pointer_y - (win_h // 2)
-        if y_pos < 10: y_pos = 10
-        if y_pos + win_h > screen_h: y_pos = screen_h - win_h - 10
-        x_pos = screen_w - win_w - 60 
-        
-        self.root.geometry(f"{win_w}x{win_h}+{x_pos}+{y_pos}")
+        self.win_w, self.win_h = win_w, win_h
+        self.position()
         self.root.overrideredirect(True)
         self.root.configure(bg=BG_COLOR)
         
@@ -227,15 +238,46 @@ class QuranLauncher:
                                     bd=0, font=("Arial", 9, "bold"), command=self.open_tafsir, cursor="hand2")
         self.btn_read.place(x=150, y=350, width=80, height=30)
 
+        self.cache = cache_watch.WatchedFile(CACHE_FILE)
         self.load_current_page()
         self.root.focus_force()
-        self.root.bind("<FocusOut>", lambda e: self.root.destroy())
-        self.root.bind("<Escape>", lambda e: self.root.destroy())
+        self.root.bind("<FocusOut>", lambda e: self.close())
+        self.root.bind("<Escape>", lambda e: self.close())
+
+    def position(self):
+        """Places the drawer at the right screen edge, vertically centred on the pointer."""
+        win_w, win_h = self.win_w, self.win_h
+        pointer_y = self.root.winfo_pointery()
+        screen_h = self.root.winfo_screenheight()
+        screen_w = self.root.winfo_screenwidth()
+        
+        y_pos = pointer_y - (win_h // 2)
+        if y_pos < 10: y_pos = 10
+        if y_pos + win_h > screen_h: y_pos = screen_h - win_h - 10
+        x_pos = screen_w - win_w - 60 
+        
+        self.root.geometry(f"{win_w}x{win_h}+{x_pos}+{y_pos}")
+
+    def show(self):
+        """Resident mode: only refresh the current page and move to the pointer."""
+        if self.mode != "juz":
+            self.toggle_mode()
+        self.load_current_page()
+        self.position()
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+
+    def close(self):
+        if self.resident:
+            self.root.withdraw()
+        else:
+            self.root.destroy()
 
     def toggle_mode(self):
         if self.mode == "juz":
             self.mode = "surah"
-            self.left_scroll.update_items([s[0] for s in SURAHS])
+            self.left_scroll.update_items([s[0] for s in quran_meta.SURAHS])
             self.lbl_title.config(text="Surah Index")
         else:
             self.mode = "juz"
@@ -244,15 +286,11 @@ class QuranLauncher:
 
     def on_left_change(self, item, index):
         if self.mode == "juz":
-            juz_num = index + 1
-            start_page = JUZ_STARTS[juz_num]
-            end_page = JUZ_STARTS.get(juz_num + 1, 605) - 1
-            pages = [f"Page {p}" for p in range(start_page, end_page + 1)]
-            self.right_scroll.update_items(pages)
+            start_page, end_page = QURAN.juz_range(index + 1)
         else:
-            start_page = SURAHS[index][1]
-            pages = [f"Page {p}" for p in range(start_page, 605)]
-            self.right_scroll.update_items(pages)
+            start_page, end_page = QURAN.surah_range(index + 1)
+        pages = [f"Page {p}" for p in range(start_page, end_page + 1)]
+        self.right_scroll.update_items(pages)
 
     def on_page_click(self, item):
         try:
@@ -262,19 +300,16 @@ class QuranLauncher:
         except: pass
 
     def load_current_page(self):
-        if os.path.exists(CACHE_FILE):
+        # Parsed snapshot of the khatmah cache, re-read only after khatmah.py rewrites it
+        data = self.cache.get()
+        if data:
             try:
-                with open(CACHE_FILE, 'r') as f:
-                    data = json.load(f)
-                    page = data.get("current_page", 1)
-                    target_juz = 1
-                    for j, start in JUZ_STARTS.items():
-                        if page >= start: target_juz = j
-                        else: break
-                    self.left_scroll.jump_to_index(target_juz - 1)
-                    juz_start = JUZ_STARTS[target_juz]
-                    page_idx = page - juz_start
-                    self.root.after(50, lambda: self.right_scroll.jump_to_index(page_idx))
+                page = max(1, data.get("current_page", 1))
+                target_juz = QURAN.juz_of_page(page)
+                self.left_scroll.jump_to_index(target_juz - 1)
+                juz_start, _ = QURAN.juz_range(target_juz)
+                page_idx = page - juz_start
+                self.root.after(50, lambda: self.right_scroll.jump_to_index(page_idx))
             except: pass
 
     def save_and_act(self, action, page_override=None):
@@ -284,26 +319,53 @@ class QuranLauncher:
             page_str = self.right_scroll.items[self.right_scroll.selected_index]
             page_num = int(page_str.split()[1])
         
-        if os.path.exists(CACHE_FILE):
-            with open(CACHE_FILE, 'r') as f: data = json.load(f)
-        else: data = {"pages_today": 0}
-        data["current_page"] = page_num
-        data["last_read_date"] = "UPDATED"
-        with open(CACHE_FILE, 'w') as f: json.dump(data, f)
+        with state_store.update(CACHE_FILE, {}) as data:
+            data["current_page"] = page_num
+        # The journal (not the bookmark) is the reading history: pages today, streak, pace
+        reading_log.record_page(page_num)
         
         url = f"https://quran.com/page/{page_num}"
         if action == "play":
-            p_str = str(page_num).zfill(3)
-            url = f"https://everyayah.com/data/Alafasy_128kbps/PageMp3s/Page{p_str}.mp3"
-            subprocess.Popen(["mpv", "--no-terminal", url])
+            # Plays from ~/.cache/thawrah_audio when we have the page, streams otherwise;
+            # either way this page and the next few are downloaded in the background
+            subprocess.Popen(["mpv", "--no-terminal", quran_audio.play_source(page_num)])
+            quran_audio.start_prefetch(page_num)
         elif action == "tafsir":
             subprocess.Popen(['xdg-open', url])
-        self.root.destroy()
+        self.close()
 
     def play_audio(self): self.save_and_act("play")
     def open_tafsir(self): self.save_and_act("tafsir")
 
+def serve(root, app):
+    """Listens for "show" on SOCKET_PATH from inside the Tk event loop."""
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    server.listen(4)
+
+    def on_message(*_):
+        conn, _ = server.accept()
+        with conn:
+            conn.settimeout(1)
+            try:
+                message = conn.recv(64).decode().strip()
+            except OSError:
+                return
+        if message == "show":
+            app.show()
+
+    root.tk.createfilehandler(server, tk.READABLE, on_message)
+    return server
+
 if __name__ == "__main__":
     root = tk.Tk()
-    app = QuranLauncher(root)
+    if len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+        # Build everything once, then wait hidden for "show" messages
+        app = QuranLauncher(root, resident=True)
+        root.withdraw()
+        server = serve(root, app)
+    else:
+        app = QuranLauncher(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+import sys
+from datetime import date, timedelta
+
+import hijri
+import prayer_engine
+
+# Ramadan mode for prayer_times.py: Suhoor (Imsak) and Iftar (Maghrib) countdowns,
+# a Taraweeh reminder and the last third of the night. Everything comes from the
+# day's timings (one timetable row plus tomorrow's Fajr), so it costs no extra I/O.
+# Run directly, it prints the whole month's schedule, computed in one batch.
+
+# --- CONFIGURATION ---
+MODE = "auto"             # "auto" (from the Hijri date), "on" or "off"
+SUHOOR_REMINDER = 30      # Minutes before Imsak to send the Suhoor reminder
+TARAWEEH_AFTER_ISHA = 20  # Minutes after Isha to send the Taraweeh reminder
+STATE_FILE = "/tmp/thawrah_ramadan_state"
+
+def fasting(day, mode=MODE):
+    """True if `day` is a day of Ramadan (or mode forces it on/off)."""
+    if mode != "auto":
+        return mode == "on"
+    try:
+        return hijri.from_gregorian(day)[1] == hijri.RAMADAN
+    except ValueError:
+        return False
+
+def active(today, mode=MODE):
+    """Ramadan mode is on from the night before the first fast to the last Iftar."""
+    return fasting(today, mode) or fasting(today + timedelta(days=1), mode)
+
+# `times` below are today's instants (aware datetimes, from prayer_times.instants) and
+# `now` is aware too, so the countdowns hold wherever the times are for; `timings`
+# are the same times as "HH:MM" strings, for display.
+TIMES = ["Imsak", "Maghrib", "Isha"]
+
+def countdown(now, today, times, mode=MODE):
+    """("Iftar"/"Suhoor", whole minutes left), or None when there is nothing to count down to."""
+    if "Imsak" not in times:
+        return None
+    imsak, maghrib = times["Imsak"], times["Maghrib"]
+    if now < imsak:
+        return ("Suhoor", int((imsak - now).total_seconds() // 60)) if fasting(today, mode) else None
+    if now < maghrib:
+        return ("Iftar", int((maghrib - now).total_seconds() // 60)) if fasting(today, mode) else None
+    # After Iftar: tomorrow's Imsak (within a minute of today's)
+    if fasting(today + timedelta(days=1), mode):
+        return "Suhoor", int((imsak + timedelta(days=1) - now).total_seconds() // 60)
+    return None
+
+def format_minutes(minutes):
+    return f"-{minutes // 60}h {minutes % 60}m" if minutes >= 60 else f"-{minutes}m"
+
+def apply(output, now, today, timings, times, mode=MODE):
+    """Adds the Ramadan countdown to the bar text and the Ramadan times to the tooltip."""
+    left = countdown(now, today, times, mode)
+    if left:
+        label, minutes = left
+        icon = "🍽" if label == "Iftar" else "🌙"
+        output["text"] += f" · {icon} {label} {format_minutes(minutes)}"
+    if "Imsak" in timings:
+        output["tooltip"] += ("\n\n<b>Ramadan</b>\n"
+                              f"Suhoor ends (Imsak): {timings['Imsak']}\n"
+                              f"Iftar (Maghrib): {timings['Maghrib']}\n"
+                              f"Taraweeh: after Isha ({timings['Isha']})\n"
+                              f"Last third of the night: {timings['Lastthird']}")
+    # Waybar takes a list for several classes
+    output["class"] = [output["class"], "ramadan"]
+    return output
+
+def due_alerts(now, today, timings, times, sent, mode=MODE):
+    """[(key, title, message)] reminders due now that haven't been sent today (`sent`: key -> date)."""
+    key_day = today.isoformat()
+    alerts = []
+    if "Imsak" not in times:
+        return alerts
+    if (fasting(today, mode) and 0 < (times["Imsak"] - now).total_seconds() <= SUHOOR_REMINDER * 60
+            and sent.get("suhoor") != key_day):
+        alerts.append(("suhoor", "🌙 Suhoor", f"Suhoor ends at {timings['Imsak']} (Fajr {timings['Fajr']})."))
+    # Taraweeh is prayed on the nights before a fast, so not on the night before Eid
+    taraweeh = times["Isha"] + timedelta(minutes=TARAWEEH_AFTER_ISHA)
+    if (fasting(today + timedelta(days=1), mode) and 0 <= (now - taraweeh).total_seconds() < 3600
+            and sent.get("taraweeh") != key_day):
+        alerts.append(("taraweeh", "🕌 Taraweeh", f"Time for Taraweeh. Last third of the night: {timings['Lastthird']}."))
+    return alerts
+
+# --- MONTH SCHEDULE ---
+SCHEDULE_COLUMNS = ["Imsak", "Fajr", "Sunrise", "Dhuhr", "Asr", "Maghrib", "Isha", "Lastthird"]
+
+def schedule(year, lat, lon, method="MWL", asr="Standard", high_lat="None", zone=None):
+    """(first day, {column: minutes array}) for every day of Ramadan `year` AH, in one NumPy pass per year.
+
+    zone: tzinfo the times are for (None = the system time zone).
+    """
+    import numpy as np
+
+    first = hijri.to_gregorian(year, hijri.RAMADAN, 1)
+    days = hijri.month_length(year, hijri.RAMADAN)
+    last = first + timedelta(days=days - 1)
+    parts = []
+    for y in range(first.year, last.year + 1):
+        table = prayer_engine.compute_year(lat, lon, y, None, method, asr, high_lat, zone, night=True)
+        start = (max(first, date(y, 1, 1)) - date(y, 1, 1)).days
+        end = (min(last, date(y, 12, 31)) - date(y, 1, 1)).days + 1
+        parts.append(table[start:end])
+    minutes = np.concatenate(parts).astype(np.int32)
+
+    names = prayer_engine.PRAYER_NAMES + prayer_engine.NIGHT_NAMES
+    return first, {name: minutes[:, i] for i, name in enumerate(names)}
+
+def print_schedule(year, lat, lon, city, method, asr, high_lat="None", zone=None):
+    first, columns = schedule(year, lat, lon, method, asr, high_lat, zone)
+    heads = {"Maghrib": "Iftar", "Lastthird": "Last⅓"}
+    print(f"Ramadan {year} AH · {city or f'{lat:.2f}, {lon:.2f}'} · {method}, Asr {asr}")
+    print(f"{'Day':>3}  {'Date':10} " + " ".join(f"{heads.get(c, c):>7}" for c in SCHEDULE_COLUMNS))
+    days = len(columns["Fajr"])
+    for i in range(days):
+        day = first + timedelta(days=i)
+        # * marks the last ten nights (same rule as hijri.observances)
+        mark = "*" if hijri.last_ten(i + 1, days) else " "
+        times = " ".join(f"{int(columns[c][i]) // 60:02d}:{int(columns[c][i]) % 60:02d}".rjust(7) for c in SCHEDULE_COLUMNS)
+        print(f"{i + 1:>3}{mark} {day:%a %d %b} {times}")
+
+if __name__ == "__main__":
+    import location
+    import prayer_times
+
+    # Usage: ramadan.py [HIJRI_YEAR]   (default: this or the coming Ramadan)
+    if len(sys.argv) > 1:
+        year = int(sys.argv[1])
+    else:
+        year, month, _ = hijri.from_gregorian(date.today())
+        if month > hijri.RAMADAN:
+            year += 1
+    lat, lon, city = location.get(prayer_times.LOCATION, lookup=False)
+    if lat is None:
+        print("Location unknown: run location.py once", file=sys.stderr)
+        sys.exit(1)
+    try:
+        print_schedule(year, lat, lon, city, prayer_times.METHOD, prayer_times.ASR_SCHOOL,
+                       prayer_times.HIGH_LATITUDE, prayer_times.zone())
+    except ImportError:
+        print("The month schedule needs NumPy", file=sys.stderr)
+        sys.exit(1)
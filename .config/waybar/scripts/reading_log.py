@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+import json
+import math
+import os
+import struct
+import time
+from datetime import date, datetime, timedelta
+
+import state_store
+
+# --- CONFIGURATION ---
+LOG_FILE = os.path.expanduser("~/.cache/thawrah_reading.log")
+INDEX_FILE = os.path.expanduser("~/.cache/thawrah_reading_index.json")
+TOTAL_PAGES = 604
+# Time until the next page event is counted as reading time, up to this cap (a closed book isn't reading)
+MAX_PAGE_SECONDS = 20 * 60
+
+# One record per page opened: unix timestamp (uint32) + page (uint16).
+# A page with UNDO_FLAG set takes its latest read back again (`khatmah.py dec`).
+# Re-opening a page on the same day (paging back and forth) is one page read, not several.
+RECORD = struct.Struct("<IH")
+UNDO_FLAG = 0x8000
+INDEX_VERSION = 2  # Bumped when counting changes: older indexes are rebuilt from the log
+
+def day_key(d):
+    return d.strftime("%Y-%m-%d")
+
+def week_key(d):
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def empty_index():
+    return {
+        "version": INDEX_VERSION,
+        "log_size": 0,
+        "last": None,                     # [timestamp, page] of the latest read
+        "reads": [0] * TOTAL_PAGES,       # times each page was opened
+        "last_read": [0] * TOTAL_PAGES,   # timestamp of the latest read, 0 = never
+        "seconds": [0] * TOTAL_PAGES,     # time spent on each page
+        "days": {},                       # distinct pages read per day
+        "weeks": {},                      # sum of those days per ISO week
+        "total": 0,
+        "first_day": None,
+        "streak": {"current": 0, "best": 0, "last_day": None},
+    }
+
+class ReadingLog:
+    """Append-only binary journal of page reads plus a JSON index of running totals.
+
+    Like the tasbih TapLog, the index remembers how many log bytes it has counted
+    and catches up incrementally, so readers never rescan the whole history: the
+    per-page, per-day and per-week totals, streak and pace are all kept up to date
+    as events are counted.
+    """
+
+    def __init__(self, log_file=LOG_FILE, index_file=INDEX_FILE):
+        self.log_file = log_file
+        self.index_file = index_file
+        self.index = self.load_index()
+        self.catch_up()
+
+    def load_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+            # Index from an older version: rebuild it from the log
+            if index.get("version") != INDEX_VERSION:
+                return empty_index()
+            return index
+        except (OSError, ValueError):
+            return empty_index()
+
+    def save_index(self):
+        # Atomic, but no fsync: the index can always be rebuilt from the log
+        state_store.write(self.index_file, self.index, sync=False)
+
+    def count(self, ts, page, offset):
+        """Adds one page event, the log record at `offset`, to the in-memory index."""
+        undo = bool(page & UNDO_FLAG)
+        page &= ~UNDO_FLAG
+        if not 1 <= page <= TOTAL_PAGES:
+            return
+        index = self.index
+        i = page - 1
+        d = datetime.fromtimestamp(ts)
+
+        if undo:
+            # Takes back the latest read, on the day it happened rather than the day of the undo.
+            # Undos are rare: the page's history comes from the log instead of being kept in the index
+            standing = self.history(page, offset)
+            if not standing:
+                return
+            latest = standing.pop()
+            index["reads"][i] = max(0, index["reads"][i] - 1)
+            index["last"] = None
+            index["last_read"][i] = standing[-1] if standing else 0
+            read_on = datetime.fromtimestamp(latest)
+            # Still read that day by another open: the day's count is unchanged
+            if any(day_key(datetime.fromtimestamp(t)) == day_key(read_on) for t in standing):
+                return
+            for table, key in (("days", day_key(read_on)), ("weeks", week_key(read_on))):
+                if index[table].get(key, 0) > 0:
+                    index[table][key] -= 1
+                    if table == "days": index["total"] -= 1
+            if not index["days"].get(day_key(read_on)):
+                self.recount_streak()
+            return
+
+        last = index["last"]
+        if last:
+            prev_ts, prev_page = last
+            index["seconds"][prev_page - 1] += max(0, min(ts - prev_ts, MAX_PAGE_SECONDS))
+        day = day_key(d)
+        first_today = not index["last_read"][i] or day_key(datetime.fromtimestamp(index["last_read"][i])) != day
+        index["reads"][i] += 1
+        index["last_read"][i] = ts
+        index["last"] = [ts, page]
+        if not first_today:
+            return
+
+        for table, key in (("days", day), ("weeks", week_key(d))):
+            index[table][key] = index[table].get(key, 0) + 1
+        index["total"] += 1
+        if index["first_day"] is None or day < index["first_day"]:
+            index["first_day"] = day
+
+        # Streak of consecutive reading days, extended on the first read of a day
+        streak = index["streak"]
+        if streak["last_day"] != day:
+            yesterday = day_key(d - timedelta(days=1))
+            streak["current"] = streak["current"] + 1 if streak["last_day"] == yesterday else 1
+            streak["best"] = max(streak["best"], streak["current"])
+            streak["last_day"] = day
+
+    def history(self, page, end):
+        """Timestamps of `page`'s reads that stand (not undone) in the log before offset `end`."""
+        with open(self.log_file, 'rb') as f:
+            data = f.read(end - end % RECORD.size)
+        standing = []
+        for ts, p in RECORD.iter_unpack(data):
+            if p & ~UNDO_FLAG != page:
+                continue
+            if not p & UNDO_FLAG:
+                standing.append(ts)
+            elif standing:
+                standing.pop()
+        return standing
+
+    def recount_streak(self):
+        """Recomputes the streak and first day from the per-day totals, after an undo emptied a day."""
+        days = sorted(datetime.strptime(d, "%Y-%m-%d").date() for d, n in self.index["days"].items() if n > 0)
+        current = best = 0
+        for k, d in enumerate(days):
+            current = current + 1 if k and (d - days[k - 1]).days == 1 else 1
+            best = max(best, current)
+        self.index["streak"] = {"current": current, "best": best,
+                                "last_day": day_key(days[-1]) if days else None}
+        self.index["first_day"] = day_key(days[0]) if days else None
+
+    def catch_up(self):
+        """Counts log records written since the index was last saved."""
+        try:
+            size = os.path.getsize(self.log_file)
+        except OSError:
+            size = 0
+        if size < self.index["log_size"]:
+            self.index = empty_index()
+        if size == self.index["log_size"]:
+            return
+
+        with open(self.log_file, 'rb') as f:
+            f.seek(self.index["log_size"])
+            data = f.read(size - self.index["log_size"])
+        whole = len(data) - len(data) % RECORD.size
+        start = self.index["log_size"]
+        for k, (ts, page) in enumerate(RECORD.iter_unpack(data[:whole])):
+            self.count(ts, page, start + k * RECORD.size)
+        self.index["log_size"] += whole
+        self.save_index()
+
+    def append(self, page, ts=None, undo=False):
+        ts = int(ts or time.time())
+        with open(self.log_file, 'ab') as f:
+            f.write(RECORD.pack(ts, page | UNDO_FLAG if undo else page))
+        # Also picks up anything other processes appended since we loaded the index
+        self.catch_up()
+
+    def page_stats(self, page):
+        """(times read, last read datetime or None, minutes spent) for a page."""
+        i = page - 1
+        last_read = self.index["last_read"][i]
+        return (self.index["reads"][i],
+                datetime.fromtimestamp(last_read) if last_read else None,
+                self.index["seconds"][i] // 60)
+
+    def day_total(self, d=None):
+        return self.index["days"].get(day_key(d or datetime.now()), 0)
+
+    def week_total(self, d=None):
+        return self.index["weeks"].get(week_key(d or datetime.now()), 0)
+
+    def streak(self, today=None):
+        """(current, best) streak in days; the current one survives until the end of today."""
+        today = today or date.today()
+        s = self.index["streak"]
+        alive = s["last_day"] in (day_key(today), day_key(today - timedelta(days=1)))
+        return (s["current"] if alive else 0), s["best"]
+
+    def pace(self, today=None):
+        """Average pages per day since the first read."""
+        if not self.index["first_day"]:
+            return 0.0
+        today = today or date.today()
+        first = datetime.strptime(self.index["first_day"], "%Y-%m-%d").date()
+        return self.index["total"] / max(1, (today - first).days + 1)
+
+    def projected_finish(self, current_page, today=None):
+        """Date the khatmah is completed at the current pace, or None."""
+        pace = self.pace(today)
+        if pace <= 0 or current_page >= TOTAL_PAGES:
+            return None
+        return (today or date.today()) + timedelta(days=math.ceil((TOTAL_PAGES - current_page) / pace))
+
+def record_page(page, undo=False):
+    """Logs that `page` was opened now (or, with undo, takes the read back)."""
+    try:
+        ReadingLog().append(page, undo=undo)
+    except OSError:
+        pass
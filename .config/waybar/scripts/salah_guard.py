@@ -1,79 +1,115 @@
 #!/usr/bin/env python3
-import json
+import heapq
 import time
-import os
+import select
 import subprocess
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import cache_watch
+import location
+import prayer_batch
+import prayer_times
 
 # --- CONFIGURATION ---
-CACHE_FILE = os.path.expanduser("~/.cache/thawrah_prayers.json")
-LOCK_CMD = "hyprlock"  
+LOCK_CMD = "hyprlock"
 NOTIFICATION_TIMEOUT_MS = 900000  # 15 Minutes in milliseconds
+WARN_BEFORE_MIN = 6   # Warning 6 minutes BEFORE prayer
+LOCK_BEFORE_MIN = 5   # Lock 5 minutes BEFORE prayer
+MAX_SLEEP = 60        # Re-check the wall clock at least this often (suspend/resume, clock changes)
+RETRY_SEC = 60        # Retry interval when no prayer times are available yet
 
-def load_prayer_times():
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                data = json.load(f)
-                today_str = datetime.now().strftime("%d-%m-%Y")
-                if data.get('date', {}).get('gregorian', {}).get('date') == today_str:
-                    return data['timings']
-        except:
-            return None
-    return None
+# The days come from prayer_times.load_days (timetable, cache or the active place, in the zone
+# the times are for); these only wake the loop when one of its sources is rewritten (inotify).
+# Not prayer_times.CACHE_FILE: only load_days writes it
+WATCHER = cache_watch.Watcher()
+for path in (prayer_times.TIMETABLE_FILE, location.LOCATION_FILE,
+             prayer_batch.PLACES_FILE, prayer_batch.ACTIVE_FILE):
+    cache_watch.WatchedFile(path, watcher=WATCHER)
 
 def send_notification(urgency, title, message):
     # Added "-t" flag to make it expire after 15 mins
     subprocess.run([
-        "notify-send", 
-        "-u", urgency, 
-        "-t", str(NOTIFICATION_TIMEOUT_MS), 
-        title, 
+        "notify-send",
+        "-u", urgency,
+        "-t", str(NOTIFICATION_TIMEOUT_MS),
+        title,
         message
     ])
 
+def build_events(now, done):
+    """Heap of (deadline timestamp, action, prayer name, prayer time) for the prayers still ahead.
+
+    `now` and the prayer times are aware datetimes. Events already handled (in `done`)
+    are skipped. A lock whose deadline has passed is kept as long as the prayer itself
+    hasn't started, so a late wakeup locks late instead of never.
+    """
+    events = []
+    days, _, _, _, tz = prayer_times.load_days(now)
+    WATCHER.seen()  # A timetable load_days just rebuilt is not news
+    today = prayer_times.local_date(now, tz)
+
+    if today in days:
+        for name, p_time in prayer_times.parse_prayers(days, today, tz):
+            warn_at = p_time - timedelta(minutes=WARN_BEFORE_MIN)
+            lock_at = p_time - timedelta(minutes=LOCK_BEFORE_MIN)
+
+            if now < lock_at and ("warn", p_time) not in done:
+                events.append((warn_at.timestamp(), "warn", name, p_time))
+            if now < p_time and ("lock", p_time) not in done:
+                events.append((lock_at.timestamp(), "lock", name, p_time))
+
+        # Rebuild for the next day just after midnight where the times are
+        tomorrow = today + timedelta(days=1)
+        midnight = datetime(tomorrow.year, tomorrow.month, tomorrow.day)
+        midnight = midnight.replace(tzinfo=tz) if tz else midnight.astimezone()
+        events.append((midnight.timestamp(), "rebuild", None, None))
+    else:
+        events.append((now.timestamp() + RETRY_SEC, "rebuild", None, None))
+
+    heapq.heapify(events)
+    return events
+
 def main():
     print("🛡️ Salah Guard Active (Locking BEFORE prayer)...")
-    
-    last_locked_prayer = None
-    warning_sent_for = None
+
+    done = set()
+    events = build_events(datetime.now().astimezone(), done)
+    watcher = WATCHER
 
     while True:
-        timings = load_prayer_times()
-        
-        if timings:
-            now = datetime.now()
-            target_prayers = {k: v for k, v in timings.items() if k in ['Fajr', 'Dhuhr', 'Asr', 'Maghrib', 'Isha']}
-
-            for name, time_str in target_prayers.items():
-                clean_time = time_str[:5]
-                p_time = datetime.strptime(f"{now.strftime('%Y-%m-%d')} {clean_time}", "%Y-%m-%d %H:%M")
-                
-                # Calculate difference in minutes
-                # Negative result = Before Prayer
-                # Positive result = After Prayer
-                diff = (now - p_time).total_seconds() / 60
-                
-                # --- NEW LOGIC: LOCK BEFORE PRAYER ---
-                
-                # TRIGGER 1: WARNING (6 minutes BEFORE prayer)
-                # Gives you 1 minute to finish up before the lock at -5
-                if -6.0 <= diff < -5.0:
-                    if warning_sent_for != name:
-                        send_notification("critical", "⚠️ Salah Guard", f"System will lock in 1 minute for {name}.")
-                        warning_sent_for = name
-                
-                # TRIGGER 2: THE LOCK (5 minutes BEFORE prayer)
-                elif -5.0 <= diff < -4.0:
-                    if last_locked_prayer != name:
-                        print(f"🔒 Locking for {name}")
-                        send_notification("critical", "🔒 Salah Guard", f"Time to prepare for {name}. Locking system.")
-                        time.sleep(3) 
-                        subprocess.run([LOCK_CMD]) 
-                        last_locked_prayer = name
-                        warning_sent_for = None 
-        
-        time.sleep(10)
+        deadline, action, name, p_time = events[0]
+        wait = deadline - time.time()
+
+        if wait > 0:
+            # Sleep until the earliest deadline, or until the prayer cache is rewritten
+            if watcher.fileno() is not None:
+                select.select([watcher], [], [], min(wait, MAX_SLEEP))
+            else:
+                time.sleep(min(wait, MAX_SLEEP))
+            if watcher.poll():
+                events = build_events(datetime.now().astimezone(), done)
+            continue
+
+        heapq.heappop(events)
+
+        if action == "warn":
+            # Skip a warning we woke up too late for; the lock follows right away
+            if datetime.now().astimezone() < p_time - timedelta(minutes=LOCK_BEFORE_MIN):
+                send_notification("critical", "⚠️ Salah Guard", f"System will lock in 1 minute for {name}.")
+            done.add(("warn", p_time))
+
+        elif action == "lock":
+            if datetime.now().astimezone() < p_time:
+                print(f"🔒 Locking for {name}")
+                send_notification("critical", "🔒 Salah Guard", f"Time to prepare for {name}. Locking system.")
+                time.sleep(3)
+                subprocess.run([LOCK_CMD])
+            done.add(("lock", p_time))
+
+        elif action == "rebuild":
+            now = datetime.now().astimezone()
+            done = {d for d in done if d[1] > now - timedelta(days=1)}
+            events = build_events(now, done)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Shared state backend for the Thawrah scripts: every JSON state file is written
+# through here, so a crash mid-write can never leave a truncated file behind.
+#
+# - write():   temp file + fsync + rename (+ fsync of the directory)
+# - update():  read-modify-write under an exclusive flock, for files that more
+#              than one script changes (e.g. the khatmah bookmark)
+# - Batched:   in-memory value committed at most once per interval, for rapid input
+#
+# Plain files (not SQLite) keep the cache_watch/inotify reload path working.
+
+def read(path, default=None):
+    """Parsed JSON at `path`, or `default` if it is missing.
+
+    A file that exists but doesn't parse is moved aside to `path.corrupt`
+    instead of being silently replaced by the default on the next write.
+    """
+    try:
+        with open(path, 'r') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except ValueError:
+        try:
+            quarantine(path, inode)
+        except OSError:
+            pass
+        return default
+    except OSError:
+        return default
+
+def quarantine(path, inode):
+    """Moves the unparsable `path` to `path.corrupt`, unless a writer has replaced it since it was read."""
+    with locked(path):
+        try:
+            if os.stat(path).st_ino != inode:
+                return  # A fresh file, renamed into place after our read
+        except FileNotFoundError:
+            return
+        os.replace(path, f"{path}.corrupt")
+
+def write(path, data, sync=True):
+    """Atomically replaces `path` with `data` as JSON."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Per-process temp name, so concurrent writers never share a half-written file
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file): os.remove(tmp_file)
+        raise
+    if sync:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+_held = set()  # Paths this process holds the lock for (flock would block on a second open)
+
+@contextmanager
+def locked(path):
+    """Exclusive cross-process lock for `path` (held on a `path.lock` side file). Re-entrant."""
+    if path in _held:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        _held.add(path)
+        try:
+            yield
+        finally:
+            _held.discard(path)
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+@contextmanager
+def update(path, default=None):
+    """Locked read-modify-write: yields the current (dict) value and writes it back on success.
+
+        with state_store.update(CACHE_FILE, {}) as data:
+            data["current_page"] = 12
+    """
+    with locked(path):
+        data = read(path, default)
+        yield data
+        write(path, data)
+
+class Batched:
+    """Keeps a state value in memory and commits it at most once per `interval` seconds.
+
+    set() is cheap enough to call on every keypress; the caller flushes when
+    due() says so (or from its select() timeout), and once more on exit.
+    """
+
+    def __init__(self, path, default=None, interval=2.0):
+        self.path = path
+        self.interval = interval
+        self.value = read(path, default)
+        self.dirty = False
+        self.last_flush = time.monotonic()
+
+    def set(self, value):
+        if not self.dirty:
+            self.last_flush = time.monotonic()
+        self.value = value
+        self.dirty = True
+
+    def timeout(self):
+        """Seconds until the next commit is due, or None when there is nothing to write."""
+        if not self.dirty:
+            return None
+        return max(0.0, self.interval - (time.monotonic() - self.last_flush))
+
+    def due(self):
+        return self.dirty and self.timeout() == 0
+
+    def flush(self):
+        if self.dirty:
+            with locked(self.path):
+                write(self.path, self.value)
+            self.dirty = False
+        self.last_flush = time.monotonic()
+
+def bench(presses=500, directory=None):
+    """Rapid keypresses: plain full-file rewrites vs atomic writes vs batched commits."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        path = os.path.join(tmp, "state.json")
+        state = {"session": [["SubhanAllah", 33], ["Alhamdulillah", 33], ["AllahuAkbar", 34]],
+                 "index": 0, "count": 100}
+
+        def plain(i):
+            with open(path, 'w') as f:
+                json.dump(dict(state, count=i), f)
+
+        def atomic(i):
+            write(path, dict(state, count=i))
+
+        batched = Batched(path, state, interval=0.05)
+        def batch(i):
+            batched.set(dict(state, count=i))
+            if batched.due(): batched.flush()
+
+        results = {}
+        for name, fn in (("json rewrite (current)", plain), ("atomic write", atomic), ("batched", batch)):
+            start = time.perf_counter()
+            for i in range(presses):
+                fn(i)
+            if name == "batched": batched.flush()
+            results[name] = time.perf_counter() - start
+        return results
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: state_store.py bench [PRESSES] [DIR]   (DIR should be on the same disk as ~/.cache)
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        presses = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+        directory = sys.argv[3] if len(sys.argv) > 3 else os.path.expanduser("~/.cache")
+        os.makedirs(directory, exist_ok=True)
+        for name, seconds in bench(presses, directory).items():
+            print(f"{name:24} {seconds * 1000:8.1f} ms  ({seconds / presses * 1e6:7.1f} us/press)")
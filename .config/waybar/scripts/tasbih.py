@@ -2,58 +2,304 @@
 import sys
 import os
 import json
+import socket
+
+import state_store
 
 # Configuration
 CACHE_FILE = os.path.expanduser("~/.cache/thawrah_tasbih")
-START_COUNT = 33
-DHIKR_NAME = "SubhanAllah" # You can change this to Alhamdulillah/AllahuAkbar
+SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "thawrah_tasbih.sock")
+LOCK_PATH = f"{SOCKET_PATH}.lock"  # Held by the one running `serve`
+# Default session after Salah. Auto-advances to the next dhikr when one reaches 0.
+# Names must be in tasbih_log.DHIKR_NAMES.
+SESSION = [["SubhanAllah", 33], ["Alhamdulillah", 33], ["AllahuAkbar", 34]]
+FLUSH_INTERVAL = 2.0  # Seconds between batched writes of the state and tap log (serve mode)
+
+def new_state(session=None):
+    session = session or SESSION
+    return {"session": session, "index": 0, "count": session[0][1]}
+
+def upgrade_state(state):
+    # Older versions stored just the remaining count of one dhikr
+    if isinstance(state, int):
+        return {"session": SESSION, "index": 0, "count": state}
+    return state or new_state()
+
+def load_state():
+    return upgrade_state(state_store.read(CACHE_FILE))
+
+def save_state(state):
+    state_store.write(CACHE_FILE, state)
+
+def current_dhikr(state):
+    return state["session"][state["index"]]
+
+def is_complete(state):
+    return state["count"] == 0 and state["index"] == len(state["session"]) - 1
+
+def apply_command(state, args):
+    """Returns (new state, name of the dhikr that was counted or None). ValueError for a bad "custom"."""
+    import tasbih_log
+
+    command = args[0] if args else ""
+    counted = None
+
+    if command == "dec":
+        if is_complete(state):
+            state = new_state(state["session"]) # Reset loop
+        else:
+            counted = current_dhikr(state)[0]
+            state = dict(state, count=state["count"] - 1)
+            # Auto-advance to the next dhikr of the session
+            if state["count"] == 0 and state["index"] < len(state["session"]) - 1:
+                state["index"] += 1
+                state["count"] = current_dhikr(state)[1]
+
+    elif command == "reset":
+        state = new_state(state["session"])
+
+    elif command == "next":
+        index = (state["index"] + 1) % len(state["session"])
+        state = dict(state, index=index, count=state["session"][index][1])
 
-def load_count():
-    if os.path.exists(CACHE_FILE):
+    elif command == "session":
+        state = new_state()
+
+    elif command == "custom":
+        # e.g. tasbih.py custom Astaghfirullah 100, tasbih.py custom La ilaha illallah 100
+        name = " ".join(args[1:-1])
+        if name not in tasbih_log.DHIKR_NAMES:
+            raise ValueError(f"unknown dhikr {name!r} (see tasbih_log.DHIKR_NAMES)")
         try:
-            with open(CACHE_FILE, 'r') as f:
-                return int(f.read().strip())
-        except:
-            return START_COUNT
-    return START_COUNT
+            target = int(args[-1])
+        except ValueError:
+            target = 0
+        if target <= 0:
+            raise ValueError(f"target must be a positive whole number, not {args[-1]!r}")
+        state = new_state([[name, target]])
 
-def save_count(n):
-    with open(CACHE_FILE, 'w') as f:
-        f.write(str(n))
+    return state, counted
 
-def main():
-    # Handle Arguments
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-        
-        if command == "dec":
-            count = load_count()
-            count -= 1
-            if count < 0: count = START_COUNT # Reset loop
-            save_count(count)
-            
-        elif command == "reset":
-            save_count(START_COUNT)
-
-    # Output for Waybar
-    count = load_count()
-    
-    # Change color based on progress
-    if count == 0:
-        text_color = "#a6e3a1" # Green when done
-        icon = "✅"
-    else:
-        text_color = "#cdd6f4" # White normal
-        icon = "📿"
+def render(state, log=None):
+    name, target = current_dhikr(state)
+    count = state["count"]
+    step = f" ({state['index'] + 1}/{len(state['session'])})" if len(state["session"]) > 1 else ""
+
+    # Colors come from style.css via the class below
+    icon = "✅" if is_complete(state) else "📿"
+
+    tooltip = "Press Super + . to count"
+    if log:
+        today = sum(log.day_totals().values())
+        week = sum(log.week_totals().values())
+        tooltip += f"\nToday: {today}  |  This week: {week}"
 
     output = {
-        "text": f"{icon} {DHIKR_NAME}: {count}",
-        "tooltip": "Press Super + . to count",
-        "class": "tasbih-done" if count == 0 else "tasbih-active",
-        "percentage": count
+        "text": f"{icon} {name}: {count}{step}",
+        "tooltip": tooltip,
+        "class": "tasbih-done" if is_complete(state) else "tasbih-active",
+        "percentage": int(100 * (target - count) / target) if target else 100
     }
-    
-    print(json.dumps(output))
+    return json.dumps(output)
+
+# --- CLIENT ---
+def send_command(args):
+    """Sends a command to the running `serve` process. Returns its Waybar line, or None if none is running."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(1)
+            s.connect(SOCKET_PATH)
+            # JSON, so multi-word dhikr names arrive intact
+            s.sendall((json.dumps(args) + "\n").encode())
+            reply = b""
+            while not reply.endswith(b"\n"):
+                chunk = s.recv(4096)
+                if not chunk: break
+                reply += chunk
+            return reply.decode().strip() or None
+    except OSError:
+        return None
+
+def watch():
+    """Continuous exec for a second bar: prints the running server's lines, without serving itself."""
+    import time
+
+    shown = None
+    while True:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.connect(SOCKET_PATH)
+                s.sendall((json.dumps(["watch"]) + "\n").encode())
+                for line in s.makefile(encoding="utf-8"):
+                    shown = line.strip()
+                    print(shown, flush=True)
+        except OSError:
+            pass
+        # No server (yet): show the saved state until one is up
+        line = render(load_state())
+        if line != shown:
+            shown = line
+            print(line, flush=True)
+        time.sleep(FLUSH_INTERVAL)
+
+# --- SERVER ---
+def serve():
+    """Resident mode for Waybar's continuous exec: state lives in memory, taps arrive over a Unix socket."""
+    import fcntl
+    import select
+    import signal
+    import time
+    import tasbih_log
+
+    # One server only: a second would take the socket over from the first
+    lock = open(LOCK_PATH, 'a')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print("tasbih: a server is already running (use `tasbih.py watch` for another bar)", file=sys.stderr)
+        sys.exit(1)
+
+    # State is committed at most once per FLUSH_INTERVAL, however fast the taps come
+    store = state_store.Batched(CACHE_FILE, interval=FLUSH_INTERVAL)
+    state = store.value = upgrade_state(store.value)
+    log = tasbih_log.TapLog()
+
+    # Under the lock, a leftover socket can only be from a server that died
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    server.listen(16)
+    created = os.stat(SOCKET_PATH).st_ino
+    watchers = []  # Connections of `watch` clients, sent every new line
+
+    def flush():
+        store.flush()
+        log.flush()
+
+    def publish(line):
+        print(line, flush=True)
+        for conn in list(watchers):
+            try:
+                conn.sendall(f"{line}\n".encode())
+            except OSError:
+                watchers.remove(conn)
+                conn.close()
+
+    def shutdown(*_):
+        flush()
+        server.close()
+        # Only our own socket: never one a later server has bound
+        try:
+            if os.stat(SOCKET_PATH).st_ino == created:
+                os.unlink(SOCKET_PATH)
+        except OSError:
+            pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    line = render(state, log)
+    print(line, flush=True)
+
+    while True:
+        readable, _, _ = select.select([server], [], [], store.timeout())
+
+        if readable:
+            conn, _ = server.accept()
+            conn.settimeout(1)
+            try:
+                args = json.loads(conn.recv(1024))
+            except (OSError, ValueError):
+                args = None
+            if args == ["watch"]:
+                try:
+                    conn.sendall(f"{line}\n".encode())
+                    watchers.append(conn)
+                except OSError:
+                    conn.close()
+                continue
+            with conn:
+                try:
+                    if args is None:
+                        raise ValueError("unreadable command")
+                    updated, counted = apply_command(state, args)
+                except (ValueError, TypeError, IndexError) as e:
+                    # A bad command gets an error back; the server keeps serving
+                    try:
+                        conn.sendall(f"error: {e}\n".encode())
+                    except OSError:
+                        pass
+                    continue
+                if counted:
+                    log.append(time.time(), tasbih_log.DHIKR_NAMES.index(counted))
+                if updated != state:
+                    state = updated
+                    store.set(state)
+                    line = render(state, log)
+                    publish(line)
+                try:
+                    conn.sendall(f"{line}\n".encode())
+                except OSError:
+                    pass
+
+        # Persist in batches instead of on every tap
+        if store.due():
+            flush()
+
+def print_stats():
+    import tasbih_log
+
+    log = tasbih_log.TapLog()
+    for title, totals in (("Today", log.day_totals()), ("This week", log.week_totals())):
+        print(f"{title}: {sum(totals.values())}")
+        for name, n in sorted(totals.items(), key=lambda x: -x[1]):
+            print(f"  {name}: {n}")
+
+def main():
+    # Handle Arguments
+    args = sys.argv[1:]
+    if args:
+        command = args[0]
+
+        if command == "serve":
+            serve()
+            return
+
+        if command == "watch":
+            watch()
+            return
+
+        if command == "stats":
+            print_stats()
+            return
+
+        line = send_command(args)
+        if line and line.startswith("error: "):
+            print(f"tasbih: {line[7:]}", file=sys.stderr)
+            sys.exit(1)
+        if line:
+            print(line)
+            return
+
+        # No server running -> read-modify-write the file directly
+        if command != "get":
+            import tasbih_log
+
+            with state_store.locked(CACHE_FILE):
+                try:
+                    state, counted = apply_command(load_state(), args)
+                except ValueError as e:
+                    print(f"tasbih: {e}", file=sys.stderr)
+                    sys.exit(1)
+                save_state(state)
+            if counted:
+                tasbih_log.append_now(tasbih_log.DHIKR_NAMES.index(counted))
+
+    # Output for Waybar (asks the server first, so the count is never behind a pending flush)
+    line = send_command(["get"])
+    print(line or render(load_state()))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+import json
+import os
+import struct
+from datetime import datetime
+
+import state_store
+
+# --- CONFIGURATION ---
+LOG_FILE = os.path.expanduser("~/.cache/thawrah_tasbih.log")
+INDEX_FILE = os.path.expanduser("~/.cache/thawrah_tasbih_index.json")
+
+# Stable ids: the log stores the position in this list, so only ever append to it
+DHIKR_NAMES = [
+    "SubhanAllah", "Alhamdulillah", "AllahuAkbar", "Astaghfirullah",
+    "La ilaha illallah", "SubhanAllahi wa bihamdihi", "Salawat", "La hawla wa la quwwata illa billah",
+]
+
+# One record per tap: unix timestamp (uint32) + dhikr id (uint8)
+RECORD = struct.Struct("<IB")
+
+def day_key(d):
+    return d.strftime("%Y-%m-%d")
+
+def week_key(d):
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+class TapLog:
+    """Append-only binary log of taps plus a JSON index of per-day and per-week totals.
+
+    Taps are buffered in memory and written with one sequential write per flush().
+    The index remembers how many log bytes it has counted, so it is caught up
+    incrementally (or rebuilt) from the log if the two ever disagree.
+    """
+
+    def __init__(self, log_file=LOG_FILE, index_file=INDEX_FILE):
+        self.log_file = log_file
+        self.index_file = index_file
+        self.pending = []
+        self.index = self.load_index()
+        self.catch_up()
+
+    def load_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"log_size": 0, "days": {}, "weeks": {}}
+
+    def save_index(self):
+        # Atomic, but no fsync: the index can always be rebuilt from the log
+        state_store.write(self.index_file, self.index, sync=False)
+
+    def count(self, ts, dhikr_id):
+        """Adds one tap to the in-memory index."""
+        d = datetime.fromtimestamp(ts)
+        name = DHIKR_NAMES[dhikr_id] if dhikr_id < len(DHIKR_NAMES) else str(dhikr_id)
+        for table, key in (("days", day_key(d)), ("weeks", week_key(d))):
+            bucket = self.index[table].setdefault(key, {})
+            bucket[name] = bucket.get(name, 0) + 1
+
+    def catch_up(self):
+        """Counts log records written since the index was last saved (e.g. by the no-server fallback)."""
+        try:
+            size = os.path.getsize(self.log_file)
+        except OSError:
+            size = 0
+        if size < self.index["log_size"]:
+            self.index = {"log_size": 0, "days": {}, "weeks": {}}
+        if size == self.index["log_size"]:
+            return
+
+        with open(self.log_file, 'rb') as f:
+            f.seek(self.index["log_size"])
+            data = f.read(size - self.index["log_size"])
+        whole = len(data) - len(data) % RECORD.size
+        for ts, dhikr_id in RECORD.iter_unpack(data[:whole]):
+            self.count(ts, dhikr_id)
+        self.index["log_size"] += whole
+        self.save_index()
+
+    def append(self, ts, dhikr_id):
+        self.pending.append((int(ts), dhikr_id))
+        self.count(int(ts), dhikr_id)
+
+    def flush(self):
+        if not self.pending:
+            return
+        data = b"".join(RECORD.pack(ts, dhikr_id) for ts, dhikr_id in self.pending)
+        with open(self.log_file, 'ab') as f:
+            f.write(data)
+        self.index["log_size"] += len(data)
+        self.pending = []
+        self.save_index()
+
+    def day_totals(self, d=None):
+        return self.index["days"].get(day_key(d or datetime.now()), {})
+
+    def week_totals(self, d=None):
+        return self.index["weeks"].get(week_key(d or datetime.now()), {})
+
+def append_now(dhikr_id):
+    """Single-shot append used when no `tasbih.py serve` process is running."""
+    log = TapLog()
+    log.append(datetime.now().timestamp(), dhikr_id)
+    log.flush()
+    return log
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import mmap
+import os
+import struct
+from datetime import date as Date
+
+import prayer_engine
+
+# --- CONFIGURATION ---
+TIMETABLE_FILE = os.path.expanduser("~/.cache/thawrah_timetable.bin")
+
+# --- FILE FORMAT ---
+# Header (52 bytes): magic, version, method index, asr school index, high-latitude rule index,
+# year, days, lat, lon, time zone name (IANA, NUL-padded; empty if the system zone has no name)
+# Body: 366 rows x 9 int16 (minutes since local midnight, prayer_engine.PRAYER_NAMES then
+# NIGHT_NAMES order). Row N is day-of-year N+1. Non-leap years leave row 366 filled with -1.
+MAGIC = b"THWT"
+VERSION = 3
+HEADER = struct.Struct("<4sBBBBHHff32s")
+ROW = struct.Struct("<9h")
+PRAYER_ROW = struct.Struct("<6h")  # The leading PRAYER_NAMES part of a row (see patch)
+ROWS = 366
+
+METHOD_NAMES = list(prayer_engine.METHODS)
+SCHOOL_NAMES = list(prayer_engine.ASR_FACTORS)
+
+def system_zone():
+    """IANA name of the system time zone (from $TZ or the /etc/localtime link), or "" if unknown."""
+    name = os.environ.get("TZ", "").lstrip(":")
+    if not name:
+        target = os.path.realpath("/etc/localtime")
+        name = target.split("zoneinfo/", 1)[1] if "zoneinfo/" in target else ""
+    return name
+
+def build(path, lat, lon, year, method="MWL", asr="Standard", high_lat="None", zone=None):
+    """Computes the whole year in one vectorized pass and writes the binary table to `path`.
+
+    zone: IANA time zone name for the times (None = the system time zone). Every
+    time gets that zone's UTC offset at its own instant, DST changes included.
+    """
+    tzinfo = None
+    if zone:
+        from zoneinfo import ZoneInfo
+        tzinfo = ZoneInfo(zone)
+    # The night times are computed from UT instants here, so DST nights come out right
+    table = prayer_engine.compute_year(lat, lon, year, None, method, asr, high_lat, tzinfo, night=True)
+    days = len(table)
+
+    body = table.astype("<i2").tobytes() + ROW.pack(*([-1] * 9)) * (ROWS - days)
+    header = HEADER.pack(MAGIC, VERSION, METHOD_NAMES.index(method), SCHOOL_NAMES.index(asr),
+                         prayer_engine.HIGH_LAT_RULES.index(high_lat), year, days, lat, lon,
+                         (zone or system_zone()).encode())
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + body)
+    os.replace(tmp_path, path)
+
+def patch(path, rows):
+    """Replaces the rows for some days ({date: 6 minutes}) of an existing table, atomically."""
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    year = HEADER.unpack_from(data, 0)[5]
+    for day, minutes in rows.items():
+        if day.year == year:
+            # Only the prayers: the night times stay the engine's
+            PRAYER_ROW.pack_into(data, HEADER.size + (day.timetuple().tm_yday - 1) * ROW.size, *minutes)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class Timetable:
+    """Read-only, mmap-backed view of a yearly timetable. Lookups are a single unpack_from."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, method, school, high_lat, self.year, self.days,
+         self.lat, self.lon, zone) = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a Thawrah timetable (or an older format)")
+        self.method = METHOD_NAMES[method]
+        self.school = SCHOOL_NAMES[school]
+        self.high_lat = prayer_engine.HIGH_LAT_RULES[high_lat]
+        self.zone = zone.rstrip(b"\0").decode()
+
+    def covers(self, day):
+        return day.year == self.year
+
+    def minutes(self, day):
+        """Tuple of 9 ints (minutes since midnight) for `day`, PRAYER_NAMES + NIGHT_NAMES order."""
+        row = day.timetuple().tm_yday - 1
+        return ROW.unpack_from(self.buf, HEADER.size + row * ROW.size)
+
+    def timings(self, day):
+        """Same shape as Aladhan's data['timings'] (e.g. {"Fajr": "05:12", ...}), Imsak/Midnight/Lastthird included."""
+        return {name: f"{m // 60:02d}:{m % 60:02d}"
+                for name, m in zip(prayer_engine.PRAYER_NAMES + prayer_engine.NIGHT_NAMES, self.minutes(day))}
+
+def load(path=TIMETABLE_FILE):
+    """Returns a Timetable, or None if the file is missing or unreadable."""
+    try:
+        return Timetable(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: timetable.py LAT LON [YEAR] [METHOD] [ASR] [HIGH_LAT_RULE] [ZONE] [OUTPUT]
+    # e.g. timetable.py 69.65 18.96 2025 MWL Standard AngleBased Europe/Oslo ~/.cache/thawrah_tromso.bin
+    lat, lon = float(sys.argv[1]), float(sys.argv[2])
+    year = int(sys.argv[3]) if len(sys.argv) > 3 else Date.today().year
+    method = sys.argv[4] if len(sys.argv) > 4 else "MWL"
+    asr = sys.argv[5] if len(sys.argv) > 5 else "Standard"
+    high_lat = sys.argv[6] if len(sys.argv) > 6 else "None"
+    zone = sys.argv[7] if len(sys.argv) > 7 else None
+    out = os.path.expanduser(sys.argv[8]) if len(sys.argv) > 8 else TIMETABLE_FILE
+    build(out, lat, lon, year, method, asr, high_lat, zone)
+    print(f"✅ Wrote {year} timetable ({os.path.getsize(out)} bytes) to {out}")